@@ -65,13 +65,7 @@ def _load_yaml_prefixes(path: Path) -> Tuple[str, ...]:
         return default_prefixes
 
 # ────────────────────────────────────────────────────────────────────────────
-# 1. Generic helpers
-# ────────────────────────────────────────────────────────────────────────────
-def _filter_country(df: pd.DataFrame, country: str) -> pd.DataFrame:
-    return df[df["vendor_country"] == country].copy()
-
-# ────────────────────────────────────────────────────────────────────────────
-# 2. Core calculators
+# 1. Core calculators
 # ────────────────────────────────────────────────────────────────────────────
 def _get_vendor_spend(repo: PurchaseRepository,
                       queries: PurchaseQueries,
@@ -80,15 +74,11 @@ def _get_vendor_spend(repo: PurchaseRepository,
                       end_date: pd.Timestamp,
                       *,
                       cfg: Dict) -> pd.DataFrame:
-    df_all = repo.all()
-    china = _filter_country(df_all, cfg["country"])
-    past_year = china.query("@start_date <= order_date <= @end_date")
+    china = repo.q().country(cfg["country"]).group("vendor_name")
 
-    # Use analytics for grouping and summing
-    open_sp = analytics.group_value(by="vendor_name", kind="open", frame=china)
-    open_sp = open_sp.rename(columns={"open": "all_open_spend"})
-    
-    delivered = analytics.group_value(by="vendor_name", kind="delivered", frame=past_year)
+    open_sp = china.sum("open").rename(columns={"open": "all_open_spend"})
+
+    delivered = china.period(start_date=start_date, end_date=end_date).sum("delivered")
     delivered = delivered.rename(columns={"delivered": "delivered_spend_past_year"})
 
     out = open_sp.merge(delivered, how="outer").fillna(0)
@@ -107,15 +97,11 @@ def _get_vendor_item_spend(repo: PurchaseRepository,
                            end_date: pd.Timestamp,
                            *,
                            cfg: Dict) -> pd.DataFrame:
-    df_all = repo.all()
-    china_items = _filter_country(queries.filter_by_type("Item"), cfg["country"])
-    past_year = china_items.query("@start_date <= order_date <= @end_date")
+    china_items = repo.q().country(cfg["country"]).type("Item").group("vendor_name", "item_no")
 
-    # Use analytics for grouping and summing
-    open_sp = analytics.group_value(by=["vendor_name", "item_no"], kind="open", frame=china_items)
-    open_sp = open_sp.rename(columns={"open": "all_open_spend"})
-    
-    deliv_sp = analytics.group_value(by=["vendor_name", "item_no"], kind="delivered", frame=past_year)
+    open_sp = china_items.sum("open").rename(columns={"open": "all_open_spend"})
+
+    deliv_sp = china_items.period(start_date=start_date, end_date=end_date).sum("delivered")
     deliv_sp = deliv_sp.rename(columns={"delivered": "delivered_spend_past_year"})
     
     df = open_sp.merge(deliv_sp, how="outer").fillna(0)
@@ -186,7 +172,7 @@ def _get_vendor_item_spend(repo: PurchaseRepository,
     return df.reset_index(drop=True)
 
 # ────────────────────────────────────────────────────────────────────────────
-# 3. Vendor‐info roll‐up
+# 2. Vendor‐info roll‐up
 # ────────────────────────────────────────────────────────────────────────────
 def _build_vendor_action_plan(by_item: pd.DataFrame, cfg: Dict) -> pd.DataFrame:
     group = by_item.groupby("vendor_name")
@@ -227,7 +213,7 @@ def _build_vendor_action_plan(by_item: pd.DataFrame, cfg: Dict) -> pd.DataFrame:
     return summarize
 
 # ────────────────────────────────────────────────────────────────────────────
-# 4. Public façade with pivoted Alternative Vendor Options
+# 3. Public façade with pivoted Alternative Vendor Options
 # ────────────────────────────────────────────────────────────────────────────
 def analyse_china_exposure(purchase_df: pd.DataFrame,
                            item_df: pd.DataFrame,
@@ -325,7 +311,7 @@ def analyse_china_exposure(purchase_df: pd.DataFrame,
     }
 
 # ────────────────────────────────────────────────────────────────────────────
-# 5. Excel exporter
+# 4. Excel exporter
 # ────────────────────────────────────────────────────────────────────────────
 def _export_to_excel(tables: Dict[str, pd.DataFrame], output_dir: str = "output") -> Path:
     os.makedirs(output_dir, exist_ok=True)
@@ -337,7 +323,7 @@ def _export_to_excel(tables: Dict[str, pd.DataFrame], output_dir: str = "output"
     return outfile
 
 # ────────────────────────────────────────────────────────────────────────────
-# 6. CLI entry‑point
+# 5. CLI entry‑point
 # ────────────────────────────────────────────────────────────────────────────
 def get_all_purchase_data():
     """Returns a DataFrame containing all purchase data using SQL query."""
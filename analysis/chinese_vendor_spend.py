@@ -1,9 +1,8 @@
 import pandas as pd
 import os
-from purchase.purchase_repository import PurchaseRepository
-from purchase.purchase_all_data import get_all_purchase_data
+from purchase.repository import PurchaseRepository
+from purchase.queries import PurchaseQueries
 from utils.time_utils import TimeUtils
-from item.item_data import get_all_item_data
 
 def get_chinese_vendor_spend(purchase_data):
     """
@@ -156,54 +155,54 @@ def get_chinese_vendor_item_spend(purchase_data, item_data):
         print(f"Error calculating Chinese vendor-item spend: {e}")
         return pd.DataFrame()
 
-def get_alternative_vendor_options(item_result, repo):
+def get_alternative_vendor_options(item_result, queries):
     """Generate a DataFrame with alternative vendor options for items with vendors from other countries.
     
     Args:
         item_result (pd.DataFrame): DataFrame containing item-level spend data from Chinese vendors.
-        repo (PurchaseRepository): Repository instance to access purchase data.
+        queries (PurchaseQueries): Query helper over the purchase repository (batch look-ups).
     
     Returns:
         pd.DataFrame: DataFrame with alternative vendor details.
     """
-    alt_items_df = item_result[item_result['alternative_vendor'] == 'Yes'].copy()
-    alt_vendor_list = []
-    for _, row in alt_items_df.iterrows():
-        item_no = row['item_no']
-        original_vendor = row['vendor_name']
-        original_price = row['last_unit_price']
-        assigned_user_id = row['assigned_user_id'] if 'assigned_user_id' in row else 'Unassigned'
-        cost_center = row['cost_center'] if 'cost_center' in row else 'Unassigned'
-        alt_vendors = repo.get_vendors_for_item_excluding_countries(item_no, exclude_countries='CN')
-        for _, alt_row in alt_vendors.iterrows():
-            alt_vendor = alt_row['vendor_name']
-            alt_country = alt_row['vendor_country'] if 'vendor_country' in alt_row else 'Unknown'
-            recent_cost = repo.get_most_recent_purchase_data(item_no=item_no, vendor_name=alt_vendor, fields=['item_no', 'vendor_name', 'order_date', 'unit_cost'], group_by='both')
-            if not recent_cost.empty:
-                alt_price = recent_cost['unit_cost'].iloc[0]
-                alt_date = recent_cost['order_date'].iloc[0]
-                percent_diff = ((alt_price - original_price) / original_price) if original_price != 0 else None
-                alt_vendor_list.append({
-                    'item': item_no,
-                    'description': row['description'],
-                    'current_vendor': original_vendor,
-                    'current_vendor_country': 'CN',
-                    'open_spend': row['all_open_spend'],
-                    'delivered_spend_past_year': row['delivered_spend_past_year'],
-                    'last_order_date': row['last_purchase_date'],
-                    'most_recent_unit_price': original_price,
-                    'alternative_vendor': alt_vendor,
-                    'alternative_vendor_country': alt_country,
-                    'alternative_last_order_date': alt_date,
-                    'alternative_unit_price': alt_price,
-                    'percent_difference': percent_diff,
-                    'assigned_user_id': assigned_user_id,
-                    'cost_center': cost_center
-                })
-    return pd.DataFrame(alt_vendor_list)
+    alt_items_df = item_result[item_result['alternative_vendor'] == 'Yes']
+
+    # Non-CN vendors of every candidate item, then their latest price – two batch look-ups
+    alt_vendors = queries.get_vendors_for_items_excluding_countries(alt_items_df['item_no'], exclude_countries='CN')
+    recent_costs = queries.get_most_recent_purchase_data_for_pairs(
+        alt_vendors, fields=['item_no', 'vendor_name', 'order_date', 'unit_cost'])
+    alt = (alt_vendors.merge(recent_costs, on=['item_no', 'vendor_name'], how='inner')
+                      .rename(columns={'vendor_name': 'alt_vendor_name',
+                                       'vendor_country': 'alt_vendor_country',
+                                       'order_date': 'alt_order_date',
+                                       'unit_cost': 'alt_unit_cost'}))
+    options = alt_items_df.merge(alt, on='item_no', how='inner')
+
+    original_price = options['last_unit_price']
+    return pd.DataFrame({
+        'item': options['item_no'],
+        'description': options['description'],
+        'current_vendor': options['vendor_name'],
+        'current_vendor_country': 'CN',
+        'open_spend': options['all_open_spend'],
+        'delivered_spend_past_year': options['delivered_spend_past_year'],
+        'last_order_date': options['last_purchase_date'],
+        'most_recent_unit_price': original_price,
+        'alternative_vendor': options['alt_vendor_name'],
+        'alternative_vendor_country': options['alt_vendor_country'],
+        'alternative_last_order_date': options['alt_order_date'],
+        'alternative_unit_price': options['alt_unit_cost'],
+        'percent_difference': ((options['alt_unit_cost'] - original_price) / original_price)
+                              .where(original_price != 0),
+        'assigned_user_id': options['assigned_user_id'] if 'assigned_user_id' in options else 'Unassigned',
+        'cost_center': options['cost_center'] if 'cost_center' in options else 'Unassigned',
+    })
 
 if __name__ == "__main__":
-    purchase_data = get_all_purchase_data()
+    from purchase.parquet_repository import ParquetPurchaseRepository
+    from item.item_data import get_all_item_data
+
+    purchase_data = ParquetPurchaseRepository().all()
     item_data = get_all_item_data()
     vendor_result = get_chinese_vendor_spend(purchase_data)
     item_result = get_chinese_vendor_item_spend(purchase_data, item_data)
@@ -226,8 +225,8 @@ if __name__ == "__main__":
                                        'open_spend_tariff_exclusion_pct']]
         
         # Generate alternative vendor options
-        repo = PurchaseRepository(purchase_data)
-        alt_vendor_df = get_alternative_vendor_options(item_result, repo)
+        queries = PurchaseQueries(PurchaseRepository(purchase_data))
+        alt_vendor_df = get_alternative_vendor_options(item_result, queries)
         
         # Count unique items per vendor
         items_per_vendor = item_result.groupby('vendor_name')['item_no'].nunique().reset_index()
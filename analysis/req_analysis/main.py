@@ -86,10 +86,24 @@ def _build_purchase_analytics() -> PurchaseAnalytics:
 def _compute_cost_lookups(
     analytics: PurchaseAnalytics, vendor_df: pd.DataFrame
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    item_avg = analytics.avg_unit_cost_per_item_last_year() \
-        .rename(columns={"avg_unit_cost": "avg_unit_cost_last_year"})
+    # Both benchmarks from one pass over the purchase history
+    costs = analytics.weighted_avg_cost_table(
+        windows={"1y": 365, "2y": 730},
+        groupings={"item": ("item_no",),
+                   "vendor_item": ("buy_from_vendor_no", "vendor_name", "item_no")},
+    )
+    item_avg = (
+        costs.dropna(subset=["avg_1y_item"])
+             .drop_duplicates("item_no")[["item_no", "avg_1y_item"]]
+             .rename(columns={"avg_1y_item": "avg_unit_cost_last_year"})
+             .reset_index(drop=True)
+    )
 
-    vendor_item_avg = analytics.avg_unit_cost_vendor_item_last_2yrs()
+    vendor_item_avg = (
+        costs.dropna(subset=["avg_2y_vendor_item"])
+             .rename(columns={"avg_2y_vendor_item": "avg_unit_cost"})
+             .reset_index(drop=True)
+    )
     idx = vendor_item_avg.groupby("item_no")["avg_unit_cost"].idxmin()
     best_vendor = (
         vendor_item_avg.loc[idx]
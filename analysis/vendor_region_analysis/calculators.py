@@ -11,7 +11,6 @@ from purchase.repository import PurchaseRepository
 from purchase.analytics import PurchaseAnalytics
 from purchase.queries import PurchaseQueries
 from analysis.vendor_region_analysis.config import load_yaml_prefixes
-from analysis.vendor_region_analysis.utils import filter_country
 
 def get_vendor_spend(repo: PurchaseRepository,
                      analytics: PurchaseAnalytics,
@@ -33,15 +32,14 @@ def get_vendor_spend(repo: PurchaseRepository,
     Returns:
         DataFrame with vendor spend metrics
     """
-    df_all = repo.all()
-    target_country = filter_country(df_all, cfg["country"])
-    past_year = target_country.query("@start_date <= order_date <= @end_date")
+    cube = repo.spend_cube()
 
-    # Using the new analytics module to get values
-    open_spend = analytics.group_value(by="vendor_name", kind="open", frame=target_country)
+    # Vendor-level roll-ups from the repository's spend cube
+    open_spend = cube.rollup("vendor_name", "open", vendor_country=cfg["country"])
     open_spend = open_spend.rename(columns={"open": "all_open_spend"})
     
-    delivered_spend = analytics.group_value(by="vendor_name", kind="delivered", frame=past_year)
+    delivered_spend = cube.rollup("vendor_name", "delivered", vendor_country=cfg["country"],
+                                  start_date=start_date, end_date=end_date)
     delivered_spend = delivered_spend.rename(columns={"delivered": "delivered_spend_past_year"})
 
     out = open_spend.merge(delivered_spend, how="outer").fillna(0)
@@ -75,16 +73,16 @@ def get_vendor_item_spend(repo: PurchaseRepository,
         DataFrame with vendor item spend analysis
     """
     df_all = repo.all()
-    # Use queries for filtering by type
-    items_only = queries.filter_by_type("Item")
-    country_items = filter_country(items_only, cfg["country"])
-    past_year = country_items.query("@start_date <= order_date <= @end_date")
+    cube = repo.spend_cube()
 
-    # Using new analytics module for grouped values
-    open_spend = analytics.group_value(by=["vendor_name", "item_no"], kind="open", frame=country_items)
+    # Vendor × item roll-ups of Item lines from the repository's spend cube
+    open_spend = cube.rollup(["vendor_name", "item_no"], "open",
+                             type="Item", vendor_country=cfg["country"])
     open_spend = open_spend.rename(columns={"open": "all_open_spend"})
     
-    delivered_spend = analytics.group_value(by=["vendor_name", "item_no"], kind="delivered", frame=past_year)
+    delivered_spend = cube.rollup(["vendor_name", "item_no"], "delivered",
+                                  type="Item", vendor_country=cfg["country"],
+                                  start_date=start_date, end_date=end_date)
     delivered_spend = delivered_spend.rename(columns={"delivered": "delivered_spend_past_year"})
     
     df = open_spend.merge(delivered_spend, how="outer").fillna(0)
@@ -3,43 +3,62 @@
 Cycle-tolerant, DAG-based multi-level BOM explosion (fast version).
 
 • Builds the entire BOM graph once (vectorised, deduped)
-• Breaks cycles by snipping the *lowest-qty* edge in each loop (logged)
+• Breaks cycles inside each strongly connected component by snipping the
+  *lowest-qty* edge of each loop found (logged)
 • Explodes only those parents whose purchase_output contains 'Output'
 • Returns a flat DataFrame:  order | parent_item | level | parent_index |
                               component_item | qty_per | total_qty
+• Shared sub-assemblies are exploded once and reused across parents via the
+  graph's memoized ExplosionCache (see bom/explosion_cache.py)
+• `explode_output_totals` returns only the per-(parent, component) totals, computed
+  for all parents at once with sparse-matrix products (see bom/bom_matrix.py)
+• `write_output_boms` explodes in a process pool and streams ordered row groups
+  into Parquet (the stand-alone entry point)
+• `get_bom_graph` caches the built graph per process for explosion and where-used
+  (see bom/where_used.py)
+• `load_bom_matrix` keeps an integer-coded copy on disk (memory-mapped on load) and
+  patches it from a diff of changed BOM lines instead of rebuilding the graph
+• `get_bom_matrix` hands that copy to totals, where-used, cost rollup, MRP and country
+  content while it is fresh, so they skip the graph build altogether
 """
 
 from __future__ import annotations
 
 import os
 import sys
-from functools import lru_cache
-from typing import Dict, List
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 import networkx as nx
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # ─── Project helpers ──────────────────────────────────────────────────────────
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from bom.bom_data       import get_all_bom_data     # production_bom_no, component_no, total
-from item.item_data     import get_all_item_data    # item_no, purchase_output …
-from utils.config_utils import configure_logging, set_pandas_display_options
+from bom.bom_matrix     import BomMatrix
+from bom.explosion_cache import ExplosionCache
+from utils.config_utils import PROJECT_ROOT, configure_logging, set_pandas_display_options
 
 logger = configure_logging()
 
+BOM_GRAPH_DIR = Path(PROJECT_ROOT) / "data" / "cache" / "bom_graph"
+
+# Seconds a persisted BOM matrix is used as-is after it was last synced with the BOM lines
+BOM_MATRIX_MAX_AGE = 24 * 3600
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 1. FAST, DEDUPED GRAPH BUILD
 # ──────────────────────────────────────────────────────────────────────────────
-def build_bom_graph(bom_df: pd.DataFrame, tolerate_cycles: bool = True) -> nx.DiGraph:
-    """
-    Build a directed BOM graph from **deduped** bom_df.
-
-    If cycles exist and `tolerate_cycles` is True, removes the single edge with the
-    smallest qty_per in each cycle and logs removals.  Raises ValueError otherwise.
-    """
-    # ── 1A.  Keep only positive-qty rows and SUM duplicates
-    edges = (
+def bom_edges(bom_df: pd.DataFrame) -> pd.DataFrame:
+    """Positive-qty BOM lines with duplicates summed:  parent | child | qty_per."""
+    return (
         bom_df.loc[bom_df["total"] > 0,
                    ["production_bom_no", "component_no", "total"]]
                 .groupby(["production_bom_no", "component_no"], as_index=False)
@@ -49,6 +68,18 @@ def build_bom_graph(bom_df: pd.DataFrame, tolerate_cycles: bool = True) -> nx.Di
                                  "total": "qty_per"})
     )
 
+
+def build_bom_graph(bom_df: pd.DataFrame, tolerate_cycles: bool = True) -> nx.DiGraph:
+    """
+    Build a directed BOM graph from **deduped** bom_df.
+
+    If cycles exist and `tolerate_cycles` is True, breaks every non-trivial strongly
+    connected component by removing the smallest-qty_per edge of each cycle found in it
+    and logs removals.  Raises ValueError otherwise.
+    """
+    # ── 1A.  Keep only positive-qty rows and SUM duplicates
+    edges = bom_edges(bom_df)
+
     # ── 1B.  Vectorised build
     g: nx.DiGraph = nx.from_pandas_edgelist(
         edges,
@@ -63,24 +94,22 @@ def build_bom_graph(bom_df: pd.DataFrame, tolerate_cycles: bool = True) -> nx.Di
                     g.number_of_nodes(), g.number_of_edges())
         return g
 
-    # ── 1C.  Cycle handling
-    cycles = list(nx.simple_cycles(g))
-    msg = f"Detected {len(cycles)} BOM cycle(s)"
+    # ── 1C.  Cycle handling – only strongly connected components can hold cycles
+    self_loops = set(nx.nodes_with_selfloops(g))
+    cyclic_sccs = [scc for scc in nx.strongly_connected_components(g)
+                   if len(scc) > 1 or not scc.isdisjoint(self_loops)]
+    msg = f"Detected {len(cyclic_sccs)} cyclic BOM component(s)"
     if not tolerate_cycles:
-        raise ValueError(f"{msg}: {cycles}")
+        raise ValueError(f"{msg}: {[sorted(scc) for scc in cyclic_sccs]}")
 
     removed_edges: list[tuple[str, str]] = []
-    for cyc in cycles:
-        # Build (tail, head) list for this cycle
-        arc_pairs = list(zip(cyc, cyc[1:] + cyc[:1]))
-        # Select the arc with the smallest qty_per (least impact)
-        tail, head = min(arc_pairs, key=lambda t: g[t[0]][t[1]]["qty_per"])
-        g.remove_edge(tail, head)
-        removed_edges.append((tail, head))
+    for scc in cyclic_sccs:
+        removed_edges.extend(_break_component_cycles(g, scc))
 
     # Verify cleanup
     if not nx.is_directed_acyclic_graph(g):
         raise ValueError("Cycle removal failed — graph still cyclic.")
+    g.graph["removed_edges"] = removed_edges
 
     # Persist removed arcs for data-governance
     if removed_edges:
@@ -96,85 +125,400 @@ def build_bom_graph(bom_df: pd.DataFrame, tolerate_cycles: bool = True) -> nx.Di
     return g
 
 
+def _break_component_cycles(g: nx.DiGraph, scc: set) -> list[tuple[str, str]]:
+    """
+    Greedy minimum-qty feedback-arc set for one strongly connected component.
+
+    Repeatedly finds a cycle inside the component (one DFS) and removes its
+    smallest-qty_per arc from `g`.  Each pass removes an edge, so the loop is bounded by
+    the component's edge count and the cost is O(E·(V+E)) – no enumeration of every
+    elementary cycle.
+    """
+    sub = g.subgraph(scc).copy()
+    removed: list[tuple[str, str]] = []
+    for _ in range(sub.number_of_edges()):
+        try:
+            cycle = nx.find_cycle(sub)
+        except nx.NetworkXNoCycle:
+            break
+        # Select the arc with the smallest qty_per (least impact)
+        tail, head = min(cycle, key=lambda t: sub[t[0]][t[1]]["qty_per"])
+        sub.remove_edge(tail, head)
+        g.remove_edge(tail, head)
+        removed.append((tail, head))
+    return removed
+
+
 # ──────────────────────────────────────────────────────────────────────────────
-# 2.  EXPLOSION UTILITIES (DESCENDANT-CACHED)
+# 1D. SHARED, CACHED GRAPH
 # ──────────────────────────────────────────────────────────────────────────────
-@lru_cache(maxsize=None)
-def successors_cached(g: nx.DiGraph, node: str) -> List[str]:
-    """Tiny helper with LRU-cache to avoid repeated successor look-ups."""
-    return list(g.successors(node))
+_graph_cache: Dict[str, nx.DiGraph] = {}
 
 
-def explode_parent(g: nx.DiGraph, root: str, root_qty: float = 1.0) -> List[Dict]:
+def get_bom_graph(bom_df: Optional[pd.DataFrame] = None, refresh: bool = False) -> nx.DiGraph:
     """
-    Iterative depth-first explosion of a single top-level parent.
+    Cycle-free BOM graph built once per process and shared by explosion and where-used.
 
-    Returns list[dict] with keys:
-        parent_item | level | parent_index | component_item | qty_per | total_qty
+    Args:
+        bom_df: BOM rows to build from; passing a different frame than the cached graph
+                was built from rebuilds it.  Defaults to `get_all_bom_data()` on first use.
+        refresh: Rebuild even if a graph is cached (e.g. after editing `bom_df` in place).
+    """
+    cached = "graph" in _graph_cache and not refresh
+    if cached and (bom_df is None or bom_df is _graph_cache["source"]):
+        return _graph_cache["graph"]
+    if bom_df is None:
+        bom_df = get_all_bom_data()
+        if bom_df is None:
+            raise ValueError("BOM data could not be loaded.")
+    _graph_cache["graph"] = build_bom_graph(bom_df, tolerate_cycles=True)
+    _graph_cache["source"] = bom_df
+    return _graph_cache["graph"]
+
+
+def bom_matrix(g: nx.DiGraph) -> BomMatrix:
+    """
+    Sparse BomMatrix of `g`, kept on the graph so later calls reuse it.
+
+    Drop `g.graph["bom_matrix"]` after editing `g` to rebuild it.
+    """
+    matrix = g.graph.get("bom_matrix")
+    if matrix is None:
+        matrix = g.graph["bom_matrix"] = BomMatrix.from_graph(g)
+    return matrix
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1E. PERSISTED, INTEGER-CODED GRAPH
+# ──────────────────────────────────────────────────────────────────────────────
+def bom_line_diff(old_edges: pd.DataFrame, new_edges: pd.DataFrame) -> pd.DataFrame:
+    """
+    Changed BOM lines between two `bom_edges` frames:  parent | child | qty_per,
+    where qty_per is the new total (0 = line deleted).
+    """
+    merged = old_edges.merge(new_edges, on=["parent", "child"], how="outer",
+                             suffixes=("_old", ""))
+    merged["qty_per"] = merged["qty_per"].fillna(0.0)
+    changed = ~np.isclose(merged["qty_per"], merged["qty_per_old"].fillna(0.0))
+    return merged.loc[changed, ["parent", "child", "qty_per"]].reset_index(drop=True)
+
+
+def _save_bom_matrix(matrix: BomMatrix, removed_edges: list, path: Path) -> None:
+    matrix.save(str(path))
+    pd.DataFrame(removed_edges, columns=["tail", "head"]).to_csv(path / "removed_edges.csv", index=False)
+    _mark_synced(path)
+
+
+def _mark_synced(path: Path) -> None:
+    """Records that the persisted matrix matches the BOM lines as of now."""
+    (path / "synced").touch()
+
+
+def _is_fresh(path: Path, max_age: float) -> bool:
+    marker = path / "synced"
+    return (BomMatrix.exists(str(path)) and marker.exists()
+            and time.time() - marker.stat().st_mtime < max_age)
+
+
+def load_bom_matrix(bom_df: Optional[pd.DataFrame] = None, path: Path = BOM_GRAPH_DIR) -> BomMatrix:
+    """
+    Integer-coded BOM persisted under `path`, memory-mapped on load.
+
+    Without `bom_df` the stored matrix is returned as-is (built from `get_bom_graph` the
+    first time).  With `bom_df` the stored lines are diffed against it and only the
+    changed lines are applied (`BomMatrix.apply_diff`), keeping codes, low-level codes and
+    heights current without a rebuild.  Lines dropped earlier to break cycles stay dropped;
+    a diff that closes a new cycle falls back to a full rebuild.
     """
-    records: List[Dict] = []
-    stack: list[tuple[str, float, int, str]] = [(root, root_qty, 0, root)]
+    path = Path(path)
+    if not BomMatrix.exists(str(path)):
+        g = get_bom_graph(bom_df)
+        matrix = bom_matrix(g)
+        _save_bom_matrix(matrix, g.graph.get("removed_edges", []), path)
+        logger.info("Persisted BOM matrix: %d items, %d lines → %s", len(matrix), matrix.qty.nnz, path)
+        return matrix
+
+    matrix = BomMatrix.load(str(path))
+    if bom_df is None:
+        return matrix
+
+    removed = pd.read_csv(path / "removed_edges.csv", dtype=str)
+    edges = bom_edges(bom_df)
+    snipped = edges.set_index(["parent", "child"]).index.isin(
+        removed.set_index(["tail", "head"]).index)
+    diff = bom_line_diff(matrix.edges(), edges[~snipped])
+    if diff.empty:
+        _mark_synced(path)
+        return matrix
+    try:
+        matrix.apply_diff(diff)
+        removed_edges = list(removed.itertuples(index=False, name=None))
+    except ValueError:
+        logger.warning("BOM diff closes a new cycle — rebuilding the graph.")
+        g = get_bom_graph(bom_df)
+        matrix, removed_edges = bom_matrix(g), g.graph.get("removed_edges", [])
+    _save_bom_matrix(matrix, removed_edges, path)
+    logger.info("Applied %d changed BOM line(s) to the persisted matrix.", len(diff))
+    return matrix
+
+
+def get_bom_matrix(bom_df: Optional[pd.DataFrame] = None, refresh: bool = False,
+                   path: Optional[Path] = None, max_age: float = BOM_MATRIX_MAX_AGE) -> BomMatrix:
+    """
+    BomMatrix shared by totals, where-used, cost rollup, MRP and country content.
+
+    • a graph already cached in this process (for `bom_df`) → its `bom_matrix`
+    • otherwise the persisted matrix (`load_bom_matrix`), memory-mapped, used as-is while
+      it was synced with the BOM lines less than `max_age` seconds ago; when it is stale,
+      `refresh` is set or `bom_df` is given, the current lines are diffed into it first
+
+    Args:
+        bom_df: BOM rows; defaults to `get_all_bom_data()` when the stored copy needs a sync.
+        refresh: Sync with the BOM lines even if the stored copy is fresh.
+        path: Directory of the persisted matrix. Defaults to BOM_GRAPH_DIR.
+    """
+    path = Path(path or BOM_GRAPH_DIR)
+    if not refresh:
+        if "graph" in _graph_cache and (bom_df is None or bom_df is _graph_cache["source"]):
+            return bom_matrix(_graph_cache["graph"])
+        if "matrix" in _graph_cache and (bom_df is None or bom_df is _graph_cache["matrix_source"]):
+            return _graph_cache["matrix"]
+
+    if bom_df is None and (refresh or not _is_fresh(path, max_age)):
+        bom_df = get_all_bom_data()
+        if bom_df is None:
+            raise ValueError("BOM data could not be loaded.")
+    matrix = load_bom_matrix(bom_df, path)
+    _graph_cache["matrix"], _graph_cache["matrix_source"] = matrix, bom_df
+    return matrix
+
 
-    while stack:
-        node, req_qty, level, p_index = stack.pop()
-        kids = successors_cached(g, node)
+# ──────────────────────────────────────────────────────────────────────────────
+# 2.  EXPLOSION UTILITIES (DESCENDANT-CACHED)
+# ──────────────────────────────────────────────────────────────────────────────
+def explosion_cache(g: nx.DiGraph) -> ExplosionCache:
+    """
+    Memoized sub-assembly explosions for `g`, kept on the graph so later calls reuse them.
 
-        # Root leaf (FG with no components) – skip; not useful downstream
-        if not kids:
-            # qty_per is 1.0 only for self-leaf; otherwise real edge qty
-            edge_qty = 1.0 if node == p_index else g[p_index][node]["qty_per"]
-            records.append({
-                "parent_item":    root,
-                "level":          level,
-                "parent_index":   p_index,
-                "component_item": node,
-                "qty_per":        edge_qty,
-                "total_qty":      req_qty,
-            })
-            continue
+    After editing a node's BOM lines in `g`, call `explosion_cache(g).invalidate([node])`
+    (or `.sync()` to detect changed nodes) before exploding again.
+    """
+    cache = g.graph.get("explosion_cache")
+    if cache is None:
+        cache = ExplosionCache(
+            lambda node: [(child, g[node][child]["qty_per"]) for child in g.successors(node)],
+            leaves_only=True,
+            reverse_children=True,      # same visit order as the stack walk
+        )
+        g.graph["explosion_cache"] = cache
+    return cache
+
+
+def _explode_arrays(root: str, root_qty: float, cache: ExplosionCache) -> Dict[str, np.ndarray]:
+    """Leaf rows of one parent as column arrays (level 1 = direct child)."""
+    table = cache.table(root)
+    if not len(table):
+        # Root leaf (FG with no components) – recorded as its own component
+        return {
+            "parent_item":    np.array([root], dtype=object),
+            "level":          np.zeros(1, dtype=np.int64),
+            "parent_index":   np.array([root], dtype=object),
+            "component_item": np.array([root], dtype=object),
+            "qty_per":        np.ones(1),
+            "total_qty":      np.array([root_qty], dtype=float),
+        }
+    return {
+        "parent_item":    np.full(len(table), root, dtype=object),
+        "level":          table.level.astype(np.int64) + 1,
+        "parent_index":   cache.decode(table.parent),
+        "component_item": cache.decode(table.component),
+        "qty_per":        table.qty_per,
+        "total_qty":      table.rel_qty * root_qty,
+    }
+
+
+def explode_parent(g: nx.DiGraph, root: str, root_qty: float = 1.0,
+                   cache: Optional[ExplosionCache] = None) -> List[Dict]:
+    """
+    Depth-first explosion of a single top-level parent.
 
-        for child in kids:
-            edge_qty = g[node][child]["qty_per"]
-            stack.append((child, req_qty * edge_qty, level + 1, node))
+    Sub-assemblies are taken from `cache` (default: the graph's explosion cache), so a
+    component shared by many parents is walked only once.
 
-    return records
+    Returns list[dict] with keys:
+        parent_item | level | parent_index | component_item | qty_per | total_qty
+    """
+    cols = _explode_arrays(root, root_qty, cache if cache is not None else explosion_cache(g))
+    return pd.DataFrame(cols).to_dict("records")
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 3.  EXPLODE “OUTPUT” PARENTS ONLY
 # ──────────────────────────────────────────────────────────────────────────────
-def explode_output_boms(bom_df: pd.DataFrame, item_df: pd.DataFrame) -> pd.DataFrame:
-    g = build_bom_graph(bom_df, tolerate_cycles=True)
-
-    output_parents = (
+def get_output_parents(item_df: pd.DataFrame) -> List[str]:
+    """Item numbers whose purchase_output flag contains 'Output'."""
+    return (
         item_df.loc[item_df.purchase_output.str.contains("Output", na=False), "item_no"]
                .unique()
                .tolist()
     )
 
+
+def explode_output_boms(bom_df: Optional[pd.DataFrame], item_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Leaf explosion of every Output parent on the cached BOM graph (see `get_bom_graph`;
+    `bom_df` None = the process-wide graph).
+    """
+    g = get_bom_graph(bom_df)
+
+    output_parents = get_output_parents(item_df)
+
     logger.info("Exploding %d top-level parents flagged as Output …", len(output_parents))
 
-    all_rows: List[Dict] = []
-    for parent in output_parents:
-        if parent in g:                         # ignore orphan codes
-            all_rows.extend(explode_parent(g, parent, 1.0))
+    cache = explosion_cache(g)
+    parts = [_explode_arrays(parent, 1.0, cache)
+             for parent in output_parents if parent in g]    # ignore orphan codes
 
-    if not all_rows:
-        cols = ["order", "parent_item", "level",
-                "parent_index", "component_item", "qty_per", "total_qty"]
+    cols = ["order", "parent_item", "level",
+            "parent_index", "component_item", "qty_per", "total_qty"]
+    if not parts:
         return pd.DataFrame(columns=cols)
 
-    df = pd.DataFrame(all_rows)
+    df = pd.DataFrame({col: np.concatenate([part[col] for part in parts])
+                       for col in cols[1:]})
     df.insert(0, "order", range(1, len(df) + 1))
     return (df
             .sort_values(["parent_item", "level", "component_item"])
             .reset_index(drop=True))
 
 
+def explode_output_totals(bom_df: Optional[pd.DataFrame], item_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Total leaf-component quantity per Output parent, for all parents in one pass.
+
+    Same totals as summing `explode_output_boms` by (parent_item, component_item), but
+    computed with sparse-matrix products in topological order instead of per-parent walks.
+    The matrix comes from `get_bom_matrix`, so a fresh persisted copy skips the graph build.
+
+    Returns:
+        DataFrame  parent_item | component_item | total_qty
+    """
+    matrix = get_bom_matrix(bom_df)
+    output_parents = get_output_parents(item_df)
+
+    logger.info("Computing sparse totals for %d top-level parents flagged as Output …",
+                len(output_parents))
+    return matrix.exploded_totals(output_parents)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 4.  PARALLEL, STREAMING PARQUET WRITER
+# ──────────────────────────────────────────────────────────────────────────────
+EXPLODED_SCHEMA = pa.schema([
+    ("order",          pa.int64()),
+    ("parent_item",    pa.string()),
+    ("level",          pa.int64()),
+    ("parent_index",   pa.string()),
+    ("component_item", pa.string()),
+    ("qty_per",        pa.float64()),
+    ("total_qty",      pa.float64()),
+])
+
+PARENTS_PER_CHUNK = 250          # parents per worker task (≈ one Parquet row group)
+
+_worker_cache: Dict[str, ExplosionCache] = {}
+
+
+def _init_explosion_worker(edges: Sequence[tuple]) -> None:
+    """Pool initializer: rebuild successors (in graph order) and a private explosion cache."""
+    successors: Dict[str, list] = {}
+    for parent, child, qty_per in edges:
+        successors.setdefault(parent, []).append((child, qty_per))
+    _worker_cache["cache"] = ExplosionCache(lambda node: successors.get(node, ()),
+                                            leaves_only=True, reverse_children=True)
+
+
+def _explode_chunk(parents: Sequence[str], first_order: Sequence[int]) -> pa.Table:
+    """
+    Explode a run of (sorted) parents into one Arrow table ordered by
+    (parent_item, level, component_item).  `first_order[i]` is the global `order` of the
+    first row of `parents[i]`, so the column matches `explode_output_boms`.
+    """
+    cache = _worker_cache["cache"]
+    parts = []
+    for parent, start in zip(parents, first_order):
+        cols = _explode_arrays(parent, 1.0, cache)
+        frame = pd.DataFrame(cols)
+        frame.insert(0, "order", np.arange(start, start + len(frame), dtype=np.int64))
+        parts.append(frame.sort_values(["level", "component_item"], kind="mergesort"))
+    chunk = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=EXPLODED_SCHEMA.names)
+    return pa.Table.from_pandas(chunk, schema=EXPLODED_SCHEMA, preserve_index=False)
+
+
+def write_output_boms(bom_df: Optional[pd.DataFrame], item_df: pd.DataFrame, out_path: str,
+                      max_workers: Optional[int] = None,
+                      parents_per_chunk: int = PARENTS_PER_CHUNK) -> int:
+    """
+    Explode every Output parent straight into a Parquet file, in parallel.
+
+    Parents are sorted and cut into chunks; each pool worker explodes one chunk into a
+    columnar Arrow batch already ordered by (parent_item, level, component_item).  Batches
+    are written as row groups in chunk order while later chunks are still running, with
+    at most 2 × max_workers chunks in flight, so peak memory is bounded by the window
+    rather than the whole explosion.  Rows and `order` match `explode_output_boms`.
+
+    Returns:
+        int: Number of rows written.
+    """
+    g = get_bom_graph(bom_df)
+    output_parents = [p for p in get_output_parents(item_df) if p in g]   # ignore orphan codes
+
+    # Global `order` = position in the per-parent explosion sequence (item_df order)
+    matrix = bom_matrix(g)
+    row_counts = matrix.leaf_path_counts()[matrix.codes(output_parents)]
+    first_order = dict(zip(output_parents, np.cumsum(row_counts) - row_counts + 1))
+
+    parents = sorted(output_parents)
+    chunks = [parents[i:i + parents_per_chunk] for i in range(0, len(parents), parents_per_chunk)]
+    max_workers = max_workers or os.cpu_count() or 1
+    edges = list(g.edges(data="qty_per"))
+
+    logger.info("Streaming %d Output parents in %d chunk(s) on %d worker(s) → %s",
+                len(parents), len(chunks), max_workers, out_path)
+
+    written = 0
+    with pq.ParquetWriter(out_path, EXPLODED_SCHEMA) as writer:
+        def write(table: pa.Table) -> None:
+            nonlocal written
+            if table.num_rows:
+                writer.write_table(table)
+                written += table.num_rows
+
+        if max_workers == 1 or len(chunks) <= 1:
+            _init_explosion_worker(edges)
+            for chunk in chunks:
+                write(_explode_chunk(chunk, [first_order[p] for p in chunk]))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_explosion_worker,
+                                     initargs=(edges,)) as pool:
+                pending: deque = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_explode_chunk, chunk, [first_order[p] for p in chunk]))
+                    if len(pending) >= 2 * max_workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+
+    logger.info("Exploded BOM: %d rows written → %s", written, out_path)
+    return written
+
+
 # ──────────────────────────────────────────────────────────────────────────────
-# 4.  MAIN (stand-alone use)
+# 5.  MAIN (stand-alone use)
 # ──────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    from item.item_data import get_all_item_data    # item_no, purchase_output …
+
     set_pandas_display_options()
 
     bom_df  = get_all_bom_data()
@@ -184,12 +528,11 @@ if __name__ == "__main__":
         logger.error("Missing BOM or Item data — aborting.")
         sys.exit(1)
 
-    exploded = explode_output_boms(bom_df, item_df)
+    out_path = os.path.join(os.path.dirname(__file__), "exploded_bom_output.parquet")
+    rows = write_output_boms(bom_df, item_df, out_path)
 
+    exploded = pq.ParquetFile(out_path)
+    preview = exploded.read_row_group(0).to_pandas() if exploded.num_row_groups else pd.DataFrame()
     print("\nExploded BOM preview:")
-    print(exploded.head(15).to_string(index=False))
-    print("\nRows:", len(exploded), " | Columns:", list(exploded.columns))
-
-    out_path = os.path.join(os.path.dirname(__file__), "exploded_bom_output.parquet")
-    exploded.to_parquet(out_path, index=False)
-    logger.info("Exploded BOM saved → %s", out_path)
+    print(preview.head(15).to_string(index=False))
+    print("\nRows:", rows, " | Columns:", exploded.schema_arrow.names)
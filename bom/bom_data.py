@@ -19,6 +19,7 @@ logger = configure_logging()
 
 # Get the SQL query from the bom.sql file
 bom_query = read_sql_file('sql/bom/bom.sql')
+bom_country_query = read_sql_file('sql/bom/bom_country.sql')
 
 def get_all_bom_data():
     """Returns a DataFrame containing all BOM data."""
@@ -28,6 +29,14 @@ def get_all_bom_data():
         return None
     return load_and_process_data(query=bom_query, engine=engine, logger=logger)
 
+def get_bom_country_data():
+    """Returns BOM lines with each component's last purchase country (HK → CN)."""
+    engine = get_database_engine()
+    if not engine:
+        logger.error("Could not get database engine.")
+        return None
+    return load_and_process_data(query=bom_country_query, engine=engine, logger=logger)
+
 if __name__ == "__main__":
     set_pandas_display_options()
     bom_df = get_all_bom_data()
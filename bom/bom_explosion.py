@@ -1,5 +1,12 @@
+import os
+import sys
+
+# Add project root to path first
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
 import pandas as pd
-from collections import defaultdict
+from bom.explosion_cache import ExplosionCache, SubTable
 
 
 class BomExplosion:
@@ -22,51 +29,162 @@ class BomExplosion:
         self.bom_data = bom_data.copy()
         self.bom_data['total'] = pd.to_numeric(self.bom_data['total'], errors='coerce').fillna(0.0)
 
-        # Create BOM dictionary for efficient lookup
-        self.bom_dict = defaultdict(list)
-        for _, row in self.bom_data.iterrows():
-            parent = row['parent_index']
-            child = row['child_index']
-            qty = row['total']
-            if pd.notna(qty):
-                self.bom_dict[parent].append((child, qty))
+        # Integer-code every index and build CSR adjacency (positive-qty lines, BOM order)
+        n_lines = len(self.bom_data)
+        codes, items = pd.factorize(
+            pd.concat([self.bom_data['parent_index'], self.bom_data['child_index']], ignore_index=True))
+        self._items = items
+        self._codes = {item: code for code, item in enumerate(items)}
+        self._set_adjacency(codes[:n_lines], codes[n_lines:], self.bom_data['total'].to_numpy(dtype=float))
 
         self.top_level_indices = top_level_indices
         self.hierarchy = []
 
+        # Memoized sub-assembly tables (keyed by the same integer codes), reused across calls
+        self.explosion_cache = ExplosionCache(self._positive_children, nodes=range(len(items)))
+
+    # ── Adjacency ────────────────────────────────────────────────────────
+    def _set_adjacency(self, parents, children, qty):
+        """Builds CSR offsets / children / qty from line arrays, keeping line order per parent."""
+        keep = (parents >= 0) & (children >= 0) & (qty > 0)
+        parents, children, qty = parents[keep], children[keep], qty[keep]
+        order = np.argsort(parents, kind='stable')
+        n = len(self._items)
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(parents, minlength=n))])
+        self._children = children[order]
+        self._qty = qty[order]
+        self._reaches_cycle = self._find_cycle_reaching_nodes()
+
+    def _line_parents(self):
+        return np.repeat(np.arange(len(self._offsets) - 1), np.diff(self._offsets))
+
+    def _positive_children(self, code):
+        start, stop = self._offsets[code], self._offsets[code + 1]
+        return list(zip(self._children[start:stop].tolist(), self._qty[start:stop].tolist()))
+
+    @property
+    def bom_dict(self):
+        """Positive-qty BOM lines as {parent_index: [(child_index, qty_per), ...]}."""
+        bom_dict = {}
+        for parent, child, qty in zip(self._items[self._line_parents()],
+                                      self._items[self._children], self._qty.tolist()):
+            bom_dict.setdefault(parent, []).append((child, qty))
+        return bom_dict
+
+    def _find_cycle_reaching_nodes(self):
+        """
+        Boolean mask of codes from which a BOM cycle can be reached.
+
+        Peels, one frontier at a time, nodes whose children are all peeled already; whatever
+        remains lies on or above a cycle, and only those nodes need the on-path check.
+        """
+        line_parents = self._line_parents()
+        remaining = np.diff(self._offsets)
+        peeled = np.zeros(len(remaining), dtype=bool)
+        frontier = remaining == 0
+        while frontier.any():
+            peeled |= frontier
+            remaining = remaining - np.bincount(line_parents[frontier[self._children]],
+                                                minlength=len(remaining))
+            frontier = (remaining == 0) & ~peeled
+        return ~peeled
+
+    def set_bom_lines(self, parent_index, children):
+        """
+        Replaces the BOM lines of `parent_index` and invalidates the cached explosions
+        of it and every parent that embeds it.
+
+        Args:
+            parent_index: Parent item index.
+            children (list): (child_index, qty_per) pairs in BOM order.
+        """
+        for item in [parent_index] + [child for child, _ in children]:
+            if item not in self._codes:
+                self._codes[item] = len(self._items)
+                self._items = self._items.append(pd.Index([item]))
+                self.explosion_cache.code(self._codes[item])
+
+        parent = self._codes[parent_index]
+        line_parents = self._line_parents()
+        others = line_parents != parent
+        new_children = np.array([self._codes[child] for child, _ in children], dtype=np.int64)
+        new_qty = pd.to_numeric(pd.Series([qty for _, qty in children], dtype=object),
+                                errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        self._set_adjacency(
+            np.concatenate([line_parents[others], np.full(len(children), parent, dtype=np.int64)]),
+            np.concatenate([self._children[others], new_children]),
+            np.concatenate([self._qty[others], new_qty]),
+        )
+        self.explosion_cache.invalidate([parent])
+
+    # ── Explosion ────────────────────────────────────────────────────────
     def build_indented_bom(self, main_number, top_level_index):
         """
         Build the BOM hierarchy iteratively for a single top-level item.
 
+        Sub-assemblies that cannot reach a BOM cycle are spliced in from the explosion
+        cache.  Nodes on or above a cycle are walked depth-first with an on-path bitmap
+        (set on entry, cleared by an exit marker) so circular references are skipped
+        without copying a path set per stack entry.
+
         Args:
             main_number: Production index (typically the same as top_level_index).
             top_level_index: Top-level item index to explode.
         """
-        stack = []
-        children = self.bom_dict.get(top_level_index, [])
-        for child, qty_per in reversed(children):
-            if qty_per > 0:
-                total_qty = qty_per * 1.0  # Top-level quantity multiplier is 1.0
-                stack.append((child, top_level_index, 0, qty_per, total_qty, {top_level_index}))
+        cache = self.explosion_cache
+        top = self._codes.get(top_level_index)
+        if top is None:
+            return
+        if not self._reaches_cycle[top]:
+            self.hierarchy.append(self._to_frame(main_number, cache.table(top)))
+            return
+
+        parts, rows = [], []
+
+        def flush():
+            if rows:
+                level, parent, child, qty_per, total_qty = map(np.array, zip(*rows))
+                parts.append(SubTable(level.astype(np.int32), parent.astype(np.int64),
+                                      child.astype(np.int64), qty_per.astype(float),
+                                      total_qty.astype(float)))
+                rows.clear()
+
+        on_path = np.zeros(len(self._items), dtype=bool)
+        on_path[top] = True
+        # Entries: (child, parent, level, qty_per, total_qty); child == -1 - node is an exit marker
+        stack = [(child, top, 0, qty_per, qty_per * 1.0)   # Top-level quantity multiplier is 1.0
+                 for child, qty_per in reversed(self._positive_children(top))]
 
         while stack:
-            current_index, parent_index, level, qty_per, total_qty, path = stack.pop()
-            if current_index in path:
+            current, parent, level, qty_per, total_qty = stack.pop()
+            if current < 0:
+                on_path[-1 - current] = False
+                continue
+            if on_path[current]:
                 continue  # Skip circular references to prevent infinite loops
-            new_path = path.copy()
-            new_path.add(current_index)
-            self.hierarchy.append({
-                'production_index': main_number,
-                'level': level,
-                'parent_index': parent_index,
-                'child_index': current_index,
-                'qty_per': qty_per,
-                'total_quantity': total_qty
-            })
-            for child, child_qty_per in reversed(self.bom_dict.get(current_index, [])):
-                if child_qty_per > 0:
-                    child_total_qty = child_qty_per * total_qty
-                    stack.append((child, current_index, level + 1, child_qty_per, child_total_qty, new_path))
+            rows.append((level, parent, current, qty_per, total_qty))
+            if not self._reaches_cycle[current]:
+                sub = cache.table(current)
+                if len(sub):
+                    flush()
+                    parts.append(sub.shifted(level + 1, total_qty))
+                continue
+            on_path[current] = True
+            stack.append((-1 - current, 0, 0, 0.0, 0.0))
+            stack.extend((child, current, level + 1, child_qty_per, child_qty_per * total_qty)
+                         for child, child_qty_per in reversed(self._positive_children(current)))
+        flush()
+        self.hierarchy.append(self._to_frame(main_number, SubTable.concat(parts)))
+
+    def _to_frame(self, main_number, table):
+        return pd.DataFrame({
+            'production_index': np.full(len(table), main_number, dtype=object),
+            'level': table.level.astype(np.int64),
+            'parent_index': self._items.take(table.parent),
+            'child_index': self._items.take(table.component),
+            'qty_per': table.qty_per,
+            'total_quantity': table.rel_qty,
+        })
 
     def create_bom_hierarchy(self):
         """
@@ -78,8 +196,10 @@ class BomExplosion:
         self.hierarchy = []
         for index in self.top_level_indices:
             self.build_indented_bom(index, index)
-        df = pd.DataFrame(self.hierarchy)
-        if df.empty:
+        frames = [frame for frame in self.hierarchy if len(frame)]
+        if frames:
+            df = pd.concat(frames, ignore_index=True).infer_objects()
+        else:
             df = pd.DataFrame(columns=['production_index', 'level', 'parent_index', 'child_index', 'qty_per', 'total_quantity'])
         df.insert(0, 'order', range(1, len(df) + 1))
-        return df
\ No newline at end of file
+        return df
@@ -0,0 +1,352 @@
+# File: bom/bom_matrix.py
+"""
+Integer-coded, sparse-matrix view of the (acyclic) BOM graph.
+
+• Every item gets an integer code; `qty` is a CSR matrix with qty[parent, child] = qty_per
+• Low-level codes (longest path from a top-level item) and heights (longest path down
+  to a purchased leaf) are found by peeling the DAG frontier with sparse mat-vec products
+• Total component quantities for *all* parents at once are propagated bottom-up, one
+  height level at a time:   T[level] = A[level] + A[level] @ T
+  so every sub-assembly is expanded exactly once, however many parents share it.
+• The CSR arrays, item dictionary and levels persist as .npy files and load memory-mapped
+  (`save` / `load`); `apply_diff` updates changed BOM lines in place, re-levelling only
+  the nodes below (llc) and above (height) the changed lines.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy import sparse
+
+
+class BomMatrix:
+    """Integer-coded BOM with topological levels and multi-level quantity propagation."""
+
+    ARRAYS = ("items", "indptr", "indices", "data", "llc", "height")
+
+    def __init__(self, items: np.ndarray, qty: sparse.csr_matrix,
+                 llc: Optional[np.ndarray] = None, height: Optional[np.ndarray] = None):
+        self.items = np.asarray(items, dtype=object)
+        self.index: Dict[str, int] = {item: code for code, item in enumerate(self.items)}
+        self.qty = sparse.csr_matrix(qty, dtype=float)
+        self.qty.sum_duplicates()
+        self.qty.sort_indices()
+        # Levels are recomputed unless supplied (e.g. by `load`)
+        self.llc = llc if llc is not None else self._peel_levels(self.qty.T.tocsr())   # 0 = top-level parent
+        self.height = height if height is not None else self._peel_levels(self.qty)    # 0 = leaf component
+        self._clear_derived()
+
+    def _clear_derived(self) -> None:
+        self._totals: sparse.csr_matrix | None = None
+        self._pattern: sparse.csr_matrix | None = None
+        self._reverse: sparse.csr_matrix | None = None
+
+    # ── Construction ─────────────────────────────────────────────────────
+    @classmethod
+    def from_edges(cls, edges: pd.DataFrame, parent: str = "parent",
+                   child: str = "child", qty: str = "qty_per") -> "BomMatrix":
+        """Build from an edge list (duplicate parent/child pairs are summed)."""
+        codes, items = pd.factorize(pd.concat([edges[parent], edges[child]], ignore_index=True))
+        n_edges = len(edges)
+        matrix = sparse.csr_matrix(
+            (edges[qty].to_numpy(dtype=float), (codes[:n_edges], codes[n_edges:])),
+            shape=(len(items), len(items)),
+        )
+        return cls(np.asarray(items, dtype=object), matrix)
+
+    @classmethod
+    def from_graph(cls, g: nx.DiGraph) -> "BomMatrix":
+        """Build from the networkx DiGraph produced by `build_bom_graph`."""
+        items = np.array(list(g.nodes), dtype=object)
+        index = {item: code for code, item in enumerate(items)}
+        edges = list(g.edges(data="qty_per"))
+        rows = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+        cols = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+        data = np.fromiter((q for _, _, q in edges), dtype=float, count=len(edges))
+        return cls(items, sparse.csr_matrix((data, (rows, cols)), shape=(len(items), len(items))))
+
+    # ── Persistence ──────────────────────────────────────────────────────
+    def save(self, path: str) -> None:
+        """
+        Writes the CSR arrays, item dictionary and levels as .npy files under `path`.
+
+        Each file is written to a temporary name and swapped in, so processes that still
+        have the previous arrays memory-mapped keep reading a consistent copy.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "items": self.items.astype(str),        # fixed-width unicode: mmap-able, no pickle
+            "indptr": self.qty.indptr,
+            "indices": self.qty.indices,
+            "data": self.qty.data,
+            "llc": self.llc,
+            "height": self.height,
+        }
+        for name, values in arrays.items():
+            target = os.path.join(path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as fh:
+                np.save(fh, np.asarray(values))
+            os.replace(target + ".tmp", target)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "BomMatrix":
+        """
+        Loads a matrix written by `save`, memory-mapped (read-only) by default.
+
+        Levels are read back rather than recomputed, so loading costs only the item
+        dictionary.  `apply_diff` swaps in fresh in-memory arrays, leaving the maps untouched.
+        """
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                  for name in cls.ARRAYS}
+        n = len(arrays["items"])
+        qty = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=(n, n))
+        return cls(arrays["items"], qty, llc=arrays["llc"], height=arrays["height"])
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return all(os.path.exists(os.path.join(path, f"{name}.npy")) for name in BomMatrix.ARRAYS)
+
+    @staticmethod
+    def _peel_levels(adjacency: sparse.csr_matrix) -> np.ndarray:
+        """
+        Longest-path level of every node, peeling nodes with no remaining out-edges.
+
+        With `adjacency` = parent→child this gives heights; with its transpose, low-level codes.
+        """
+        n = adjacency.shape[0]
+        pattern = (adjacency != 0).astype(np.int64).tocsr()
+        remaining = np.diff(pattern.indptr).astype(np.int64)
+        level = np.full(n, -1, dtype=np.int64)
+        frontier = remaining == 0
+        depth = 0
+        while frontier.any():
+            level[frontier] = depth
+            remaining -= pattern @ frontier.astype(np.int64)
+            remaining[level >= 0] = -1
+            frontier = remaining == 0
+            depth += 1
+        if (level < 0).any():
+            raise ValueError("BOM graph is cyclic — break cycles before building a BomMatrix.")
+        return level
+
+    @staticmethod
+    def _relevel(level: np.ndarray, inputs: sparse.csr_matrix, dependents: sparse.csr_matrix,
+                 seeds: np.ndarray) -> np.ndarray:
+        """
+        Recomputes longest-path levels for `seeds` and everything depending on them.
+
+        level[v] = 1 + max(level[inputs of v]) (0 without inputs).  With inputs = parents
+        (reverse CSR) this maintains low-level codes below changed lines; with inputs =
+        children (qty) it maintains heights above them.  Only the dependent closure is
+        peeled – nodes outside it keep their level.  Raises ValueError on a cycle.
+        """
+        n = len(level)
+        closure = np.zeros(n, dtype=bool)
+        frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+        closure[frontier] = True
+        while len(frontier):
+            reached = np.unique(dependents[frontier].indices)
+            frontier = reached[~closure[reached]]
+            closure[frontier] = True
+
+        nodes = np.flatnonzero(closure)
+        block = inputs[nodes]
+        owner = np.repeat(nodes, np.diff(block.indptr))
+        pending = np.bincount(owner[closure[block.indices]], minlength=n)
+
+        level = np.array(level, dtype=np.int64)
+        ready = nodes[pending[nodes] == 0]
+        settled = 0
+        while len(ready):
+            block = inputs[ready]
+            has_inputs = np.diff(block.indptr) > 0
+            top = np.full(len(ready), -1, dtype=np.int64)
+            if block.nnz:
+                top[has_inputs] = np.maximum.reduceat(level[block.indices],
+                                                      block.indptr[:-1][has_inputs])
+            level[ready] = top + 1
+            settled += len(ready)
+            pending[ready] = -1
+            reached = dependents[ready].indices
+            reached = reached[closure[reached]]
+            pending -= np.bincount(reached, minlength=n)
+            ready = np.unique(reached[pending[reached] == 0])
+        if settled < len(nodes):
+            raise ValueError("BOM diff would create a cycle — rebuild the graph to break it.")
+        return level
+
+    # ── In-place updates ─────────────────────────────────────────────────
+    def edges(self) -> pd.DataFrame:
+        """Current BOM lines: parent | child | qty_per."""
+        coo = self.qty.tocoo()
+        return pd.DataFrame({"parent": self.items[coo.row],
+                             "child": self.items[coo.col],
+                             "qty_per": coo.data})
+
+    def apply_diff(self, diff: pd.DataFrame, parent: str = "parent",
+                   child: str = "child", qty: str = "qty_per") -> None:
+        """
+        Applies changed BOM lines without rebuilding the matrix or re-peeling every level.
+
+        Each diff row sets the total qty_per of one (parent, child) pair; a qty of 0 / NaN
+        deletes the line.  New items are appended with new codes (existing codes never
+        change).  Low-level codes are recomputed for the changed children and everything
+        below them, heights for the changed parents and everything above them; derived
+        caches (totals, pattern, reverse) are dropped.
+
+        Raises:
+            ValueError: the diff would close a cycle (the matrix is left unchanged).
+        """
+        if diff.empty:
+            return
+        diff = diff.groupby([parent, child], as_index=False, sort=False)[qty].sum(min_count=1)
+        new_items = [item for item in pd.unique(pd.concat([diff[parent], diff[child]]))
+                     if item not in self.index]
+        items = np.concatenate([self.items, np.asarray(new_items, dtype=object)])
+        index = dict(self.index)
+        index.update((item, code) for code, item in enumerate(new_items, start=len(self.items)))
+        n = len(items)
+
+        rows = np.fromiter((index[p] for p in diff[parent]), dtype=np.int64, count=len(diff))
+        cols = np.fromiter((index[c] for c in diff[child]), dtype=np.int64, count=len(diff))
+        values = np.nan_to_num(pd.to_numeric(diff[qty], errors="coerce").to_numpy(dtype=float))
+
+        # Splice: drop the changed pairs from the old lines, then add the surviving new values
+        old = self.qty.tocoo()
+        keep = ~np.isin(old.row.astype(np.int64) * n + old.col, rows * n + cols)
+        positive = values > 0
+        qty_matrix = sparse.csr_matrix(
+            (np.concatenate([old.data[keep], values[positive]]),
+             (np.concatenate([old.row[keep], rows[positive]]),
+              np.concatenate([old.col[keep], cols[positive]]))),
+            shape=(n, n))
+        qty_matrix.sum_duplicates()
+        qty_matrix.sort_indices()
+        reverse = qty_matrix.T.tocsr()
+
+        added = np.arange(len(self.items), n)
+        llc = self._relevel(np.concatenate([self.llc, np.zeros(len(added), dtype=np.int64)]),
+                            reverse, qty_matrix, np.concatenate([cols, added]))
+        height = self._relevel(np.concatenate([self.height, np.zeros(len(added), dtype=np.int64)]),
+                               qty_matrix, reverse, np.concatenate([rows, added]))
+
+        self.items, self.index, self.qty = items, index, qty_matrix
+        self.llc, self.height = llc, height
+        self._clear_derived()
+        self._reverse = reverse
+
+    def topological_order(self) -> np.ndarray:
+        """Codes ordered parents-before-children (by low-level code)."""
+        return np.argsort(self.llc, kind="stable")
+
+    # ── Look-ups ─────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def codes(self, items: Iterable[str]) -> np.ndarray:
+        """Integer codes of `items`, silently skipping items not in the BOM."""
+        return np.fromiter((self.index[i] for i in items if i in self.index), dtype=np.int64)
+
+    @property
+    def is_leaf(self) -> np.ndarray:
+        return np.diff(self.qty.indptr) == 0
+
+    @property
+    def pattern(self) -> sparse.csr_matrix:
+        """0/1 parent→child adjacency (cached)."""
+        if self._pattern is None:
+            self._pattern = (self.qty != 0).astype(np.int64).tocsr()
+        return self._pattern
+
+    def ancestors(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of every node above `codes` (their ancestor closure; seeds excluded
+        unless they are also above another seed).  Walks the reverse (child→parent) CSR
+        one BOM level at a time, touching only the edges into the closure.
+        """
+        if self._reverse is None:
+            self._reverse = self.qty.T.tocsr()
+        closure = np.zeros(len(self), dtype=bool)
+        frontier = np.unique(np.asarray(codes, dtype=np.int64))
+        while len(frontier):
+            parents = np.unique(self._reverse[frontier].indices)
+            frontier = parents[~closure[parents]]
+            closure[frontier] = True
+        return closure
+
+    # ── Multi-level propagation ──────────────────────────────────────────
+    def total_quantities(self) -> sparse.csr_matrix:
+        """
+        T[p, c] = total quantity of c per one unit of p, summed over every BOM path.
+
+        Computed once (cached) in topological order from the leaves up.
+        """
+        if self._totals is not None:
+            return self._totals
+
+        n = len(self)
+        totals = sparse.csr_matrix((n, n), dtype=float)
+        for h in range(1, int(self.height.max(initial=0)) + 1):
+            rows = np.flatnonzero(self.height == h)
+            block = self.qty[rows]
+            block = block + block @ totals
+            scatter = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, np.arange(len(rows)))), shape=(n, len(rows)))
+            totals = (totals + scatter @ block).tocsr()
+
+        totals.eliminate_zeros()
+        self._totals = totals
+        return totals
+
+    def leaf_path_counts(self) -> np.ndarray:
+        """
+        Number of distinct paths from each node down to a leaf (1 for a leaf itself).
+
+        This is exactly how many rows `explode_parent` emits for the node, so it sizes
+        explosion output without exploding anything.
+        """
+        counts = np.ones(len(self), dtype=np.int64)
+        for h in range(1, int(self.height.max(initial=0)) + 1):
+            rows = np.flatnonzero(self.height == h)
+            counts[rows] = self.pattern[rows] @ counts
+        return counts
+
+    def exploded_totals(self, parents: Iterable[str], leaves_only: bool = True) -> pd.DataFrame:
+        """
+        Flattened total quantity per (parent, component) for every parent in `parents`.
+
+        Mirrors `explode_parent`: with `leaves_only` only leaf components are returned, and a
+        parent with no components is its own (self-leaf) component with total_qty 1.0.
+
+        Returns:
+            DataFrame  parent_item | component_item | total_qty
+        """
+        rows = np.unique(self.codes(parents))
+        block = self.total_quantities()[rows]
+        if leaves_only:
+            block = block @ sparse.diags(self.is_leaf.astype(float))
+        block = block.tocoo()
+
+        parent_codes = rows[block.row]
+        component_codes = block.col
+        total_qty = block.data
+        if leaves_only:
+            self_leaves = rows[self.is_leaf[rows]]
+            parent_codes = np.concatenate([parent_codes, self_leaves])
+            component_codes = np.concatenate([component_codes, self_leaves])
+            total_qty = np.concatenate([total_qty, np.ones(len(self_leaves))])
+
+        keep = total_qty != 0
+        return (pd.DataFrame({
+                    "parent_item": self.items[parent_codes[keep]],
+                    "component_item": self.items[component_codes[keep]],
+                    "total_qty": total_qty[keep],
+                })
+                .sort_values(["parent_item", "component_item"])
+                .reset_index(drop=True))
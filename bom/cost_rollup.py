@@ -0,0 +1,239 @@
+# File: bom/cost_rollup.py
+"""
+Multi-level material cost rollup over the (cycle-free) BOM.
+
+• Leaf components carry their own cost per basis:
+      standard – item master `unit_cost`
+      last     – item master `last_unit_cost` (last purchase price)
+      purchase – weighted-average purchase cost from PurchaseAnalytics (optional)
+• Assemblies are rolled bottom-up, one height level at a time, over the sparse
+  BomMatrix – every basis and every assembly in the same products:
+      rolled[level] = A[level] @ rolled
+• When a few leaf prices move, `reprice` re-rolls only their ancestor closure (still in
+  height order) and returns the cost delta per finished good
+• The per-level breakdown splits each assembly's rolled cost by the depth at which the
+  purchased cost enters:  by_level[:, k] = A @ by_level[:, k-1]  (k = 1 … height)
+
+Returns a frame: item_no | llc | height | is_leaf | <basis> | rolled_<basis> | missing_<basis>
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+# ─── Project helpers ──────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bom.bom_dag_explosion import get_bom_matrix, get_output_parents
+from bom.bom_matrix        import BomMatrix
+from utils.config_utils    import configure_logging
+
+logger = configure_logging()
+
+# Cost basis name → item master column
+ITEM_COST_COLUMNS: Dict[str, str] = {"standard": "unit_cost", "last": "last_unit_cost"}
+
+
+class CostRollup:
+    """
+    Rolled material cost of every BOM node for one or more cost bases.
+
+    Args:
+        matrix: BomMatrix of the cycle-free BOM graph.
+        costs:  Leaf costs indexed by item_no, one column per basis. Items missing from
+                `costs` (or NaN) count as zero and are flagged in `missing_<basis>`.
+    """
+
+    def __init__(self, matrix: BomMatrix, costs: pd.DataFrame):
+        self.matrix = matrix
+        self.bases = list(costs.columns)
+        aligned = costs[~costs.index.duplicated(keep="last")].reindex(matrix.items)
+        self.leaf_costs = np.array(aligned.to_numpy(dtype=float))         # n × bases, writable
+        self._missing_leaf = np.isnan(self.leaf_costs) & matrix.is_leaf[:, None]
+        self._levels = [np.flatnonzero(matrix.height == h)
+                        for h in range(1, int(matrix.height.max(initial=0)) + 1)]
+        self.rolled = self._roll(np.nan_to_num(self.leaf_costs) * matrix.is_leaf[:, None])
+        self.missing = self._roll(self._missing_leaf.astype(float)) > 0
+
+    # ── Construction ─────────────────────────────────────────────────────
+    @classmethod
+    def from_item_master(cls, matrix: BomMatrix, item_df: pd.DataFrame,
+                         columns: Mapping[str, str] = ITEM_COST_COLUMNS) -> "CostRollup":
+        """Standard (`unit_cost`) and last-purchase (`last_unit_cost`) bases from the item master."""
+        present = {basis: col for basis, col in columns.items() if col in item_df.columns}
+        if not present:
+            raise KeyError(f"Item master has none of the cost columns: {sorted(columns.values())}")
+        costs = (item_df.set_index("item_no")[list(present.values())]
+                        .apply(pd.to_numeric, errors="coerce")
+                        .rename(columns={col: basis for basis, col in present.items()}))
+        return cls(matrix, costs)
+
+    @classmethod
+    def from_purchase_analytics(cls, matrix: BomMatrix, analytics,
+                                item_df: Optional[pd.DataFrame] = None,
+                                lookback_days: int = 365) -> "CostRollup":
+        """
+        'purchase' basis = weighted-average unit cost over `lookback_days` (PurchaseAnalytics),
+        alongside the item master bases when `item_df` is given.
+        """
+        avg = analytics.weighted_avg_unit_cost(by="item_no", lookback_days=lookback_days)
+        costs = avg.set_index("item_no")[["avg_unit_cost"]].rename(columns={"avg_unit_cost": "purchase"})
+        if item_df is not None:
+            master = cls.from_item_master(matrix, item_df)
+            costs = pd.DataFrame(master.leaf_costs, index=matrix.items,
+                                 columns=master.bases).join(costs, how="left")
+        return cls(matrix, costs)
+
+    # ── Propagation ──────────────────────────────────────────────────────
+    def _roll(self, values: np.ndarray) -> np.ndarray:
+        """Bottom-up rollup of leaf `values` (n × k): one sparse product per height level."""
+        rolled = values.copy()
+        qty = self.matrix.qty
+        for rows in self._levels:
+            rolled[rows] = qty[rows] @ rolled
+        return rolled
+
+    # ── Incremental repricing ────────────────────────────────────────────
+    def reprice(self, changes, basis: Optional[str] = None,
+                finished_goods: Optional[Iterable[str]] = None,
+                commit: bool = True) -> pd.DataFrame:
+        """
+        Applies new leaf costs and re-rolls only the ancestor closure of the changed items.
+
+        Args:
+            changes: {item_no: cost} / Series for one `basis`, or a DataFrame indexed by
+                     item_no with one column per basis to change.
+            basis: Basis for dict / Series changes. Defaults to the first basis.
+            finished_goods: Items to report deltas for. Defaults to top-level items (llc 0).
+            commit: Keep the new costs (False = what-if only).
+
+        Returns:
+            DataFrame  item_no | basis | old_cost | new_cost | delta   (affected finished
+                       goods only, sorted by item_no, basis)
+        """
+        m = self.matrix
+        if not isinstance(changes, pd.DataFrame):
+            changes = pd.Series(changes, dtype=float).to_frame(basis or self.bases[0])
+        unknown = set(changes.columns) - set(self.bases)
+        if unknown:
+            raise KeyError(f"Unknown cost basis: {', '.join(sorted(unknown))}")
+
+        changes = changes[[item in m.index for item in changes.index]]
+        codes = m.codes(changes.index)
+        cols = [self.bases.index(b) for b in changes.columns]
+
+        leaf_costs = self.leaf_costs if commit else self.leaf_costs.copy()
+        rolled = self.rolled if commit else self.rolled.copy()
+        missing = self.missing if commit else self.missing.copy()
+
+        leaf_costs[np.ix_(codes, cols)] = changes.to_numpy(dtype=float)
+        is_leaf = m.is_leaf[codes]
+        rolled[np.ix_(codes[is_leaf], cols)] = np.nan_to_num(leaf_costs[np.ix_(codes[is_leaf], cols)])
+        missing[np.ix_(codes[is_leaf], cols)] = np.isnan(leaf_costs[np.ix_(codes[is_leaf], cols)])
+
+        closure = m.ancestors(codes[is_leaf])
+        affected = np.flatnonzero(closure)
+        before = rolled[np.ix_(affected, cols)]                    # fancy indexing copies
+        # Re-roll the closure only, lowest height first
+        by_height = affected[np.argsort(m.height[affected], kind="stable")]
+        splits = np.flatnonzero(np.diff(m.height[by_height])) + 1
+        for rows in np.split(by_height, splits):
+            if len(rows):
+                rolled[np.ix_(rows, cols)] = (m.qty[rows] @ rolled)[:, cols]
+                missing[np.ix_(rows, cols)] = (m.pattern[rows] @ missing)[:, cols] > 0
+
+        if finished_goods is None:
+            report = m.llc[affected] == 0
+        else:
+            report = np.isin(affected, m.codes(finished_goods))
+        deltas = pd.DataFrame({
+            "item_no": np.repeat(m.items[affected[report]], len(cols)),
+            "basis": np.tile(np.asarray(changes.columns, dtype=object), report.sum()),
+            "old_cost": before[report].ravel(),
+            "new_cost": rolled[np.ix_(affected[report], cols)].ravel(),
+        })
+        deltas["delta"] = deltas["new_cost"] - deltas["old_cost"]
+        logger.info("Repriced %d item(s): %d ancestor(s) re-rolled, %d finished good(s) affected.",
+                    len(codes), len(affected), report.sum())
+        return deltas.sort_values(["item_no", "basis"]).reset_index(drop=True)
+
+    def tariff_what_if(self, items: Iterable[str], rate: float, basis: str = "last",
+                       finished_goods: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Cost deltas if `items` cost (1 + rate) × their current `basis` cost – not committed."""
+        m = self.matrix
+        codes = np.unique(m.codes(items))
+        current = self.leaf_costs[codes, self.bases.index(basis)]
+        changes = pd.Series(current * (1.0 + rate), index=m.items[codes])
+        return self.reprice(changes, basis=basis, finished_goods=finished_goods, commit=False)
+
+    # ── Results ──────────────────────────────────────────────────────────
+    def rollup(self, items: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Rolled cost per item (all BOM nodes by default).
+
+        Returns:
+            DataFrame  item_no | llc | height | is_leaf | <basis> | rolled_<basis> | missing_<basis>
+        """
+        m = self.matrix
+        codes = np.arange(len(m)) if items is None else np.unique(m.codes(items))
+        frame = pd.DataFrame({
+            "item_no": m.items[codes],
+            "llc": m.llc[codes],
+            "height": m.height[codes],
+            "is_leaf": m.is_leaf[codes],
+        })
+        for j, basis in enumerate(self.bases):
+            frame[basis] = self.leaf_costs[codes, j]
+            frame[f"rolled_{basis}"] = self.rolled[codes, j]
+            frame[f"missing_{basis}"] = self.missing[codes, j]
+        return frame.sort_values("item_no").reset_index(drop=True)
+
+    def by_level(self, basis: str = "standard",
+                 items: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Rolled cost split by the BOM level at which the leaf cost enters (level 1 = direct).
+
+        Returns:
+            DataFrame  item_no | level_1 | level_2 | … | total
+        """
+        m = self.matrix
+        j = self.bases.index(basis)
+        leaf_cost = np.nan_to_num(self.leaf_costs[:, j]) * m.is_leaf
+        depth = int(m.height.max(initial=0))
+
+        levels = np.zeros((len(m), depth))
+        contribution = leaf_cost
+        for k in range(depth):
+            contribution = m.qty @ contribution
+            levels[:, k] = contribution
+
+        codes = np.arange(len(m)) if items is None else np.unique(m.codes(items))
+        frame = pd.DataFrame(levels[codes], columns=[f"level_{k + 1}" for k in range(depth)])
+        frame.insert(0, "item_no", m.items[codes])
+        frame["total"] = frame.iloc[:, 1:].sum(axis=1)
+        return frame.sort_values("item_no").reset_index(drop=True)
+
+
+def rollup_output_costs(item_df: pd.DataFrame, bom_df: Optional[pd.DataFrame] = None,
+                        analytics=None) -> pd.DataFrame:
+    """
+    Rolled costs of every Output parent on the shared BOM matrix (see `get_bom_matrix`).
+
+    Args:
+        item_df: Item master (item_no, purchase_output, unit_cost, last_unit_cost).
+        bom_df: BOM rows; defaults to the process-wide / persisted matrix.
+        analytics: Optional PurchaseAnalytics adding the weighted 'purchase' basis.
+    """
+    matrix = get_bom_matrix(bom_df)
+    if analytics is not None:
+        engine = CostRollup.from_purchase_analytics(matrix, analytics, item_df=item_df)
+    else:
+        engine = CostRollup.from_item_master(matrix, item_df)
+    parents = get_output_parents(item_df)
+    logger.info("Rolled %s cost(s) for %d Output parents.", "/".join(engine.bases), len(parents))
+    return engine.rollup(parents)
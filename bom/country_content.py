@@ -0,0 +1,167 @@
+# File: bom/country_content.py
+"""
+Country-of-origin content per finished good, rolled through every BOM level.
+
+• Each purchased (leaf) component gets its last vendor country – from
+  sql/bom/bom_country.sql, falling back to the item master – with HK folded into CN
+• Leaf unit cost = item master last_unit_cost, else unit_cost
+• With T = total quantity matrix (all levels) and V[c, k] = cost[c] · [country(c) = k]:
+
+      content = T[parents] @ V            (parents × countries, one sparse product)
+
+  so every Output parent is scored in one pass; share = content / row total.
+
+Returns a wide frame: parent_item | total_cost | uncosted_components | share_<country> …
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ─── Project helpers ──────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bom.bom_dag_explosion import get_bom_matrix, get_output_parents
+from bom.bom_matrix        import BomMatrix
+from utils.config_utils    import configure_logging
+
+logger = configure_logging()
+
+COUNTRY_ALIASES = {"HK": "CN"}           # treat HK like CN everywhere
+UNKNOWN_COUNTRY = "UNKNOWN"
+
+
+def normalize_country(codes: pd.Series) -> pd.Series:
+    """Upper-cases country codes, maps HK → CN and blanks / NaN → UNKNOWN."""
+    codes = codes.astype("string").str.strip().str.upper()
+    codes = codes.replace(COUNTRY_ALIASES)
+    return codes.mask(codes.isna() | (codes == ""), UNKNOWN_COUNTRY).astype(object)
+
+
+def component_countries(item_df: Optional[pd.DataFrame] = None,
+                        bom_country_df: Optional[pd.DataFrame] = None) -> pd.Series:
+    """
+    Last purchase country per item_no: bom_country.sql first, item master as fallback.
+    """
+    sources = []
+    if bom_country_df is not None:
+        sources.append(bom_country_df.drop_duplicates("component_no", keep="last")
+                                     .set_index("component_no")["last_vendor_country"])
+    if item_df is not None and "last_vendor_country" in item_df.columns:
+        sources.append(item_df.drop_duplicates("item_no", keep="last")
+                              .set_index("item_no")["last_vendor_country"])
+    if not sources:
+        raise ValueError("Need bom_country_df or an item master with last_vendor_country.")
+
+    country = sources[0]
+    for fallback in sources[1:]:
+        country = country.combine_first(fallback)
+    return country.rename("country")
+
+
+class CountryContent:
+    """
+    Cost-weighted country-of-origin content for any set of parents.
+
+    Args:
+        matrix: BomMatrix of the cycle-free BOM graph.
+        leaf_cost: Unit cost per item_no (NaN / missing = uncosted, contributes 0).
+        country: Country per item_no (normalized here; missing = UNKNOWN).
+    """
+
+    def __init__(self, matrix: BomMatrix, leaf_cost: pd.Series, country: pd.Series):
+        self.matrix = matrix
+        cost = pd.to_numeric(leaf_cost[~leaf_cost.index.duplicated(keep="last")], errors="coerce")
+        cost = cost.reindex(matrix.items).to_numpy(dtype=float)
+        self._uncosted = (np.isnan(cost) & matrix.is_leaf).astype(float)
+        cost = np.nan_to_num(cost) * matrix.is_leaf
+
+        country = country[~country.index.duplicated(keep="last")].reindex(matrix.items)
+        codes, self.countries = pd.factorize(normalize_country(pd.Series(country.to_numpy())), sort=True)
+        n = len(matrix)
+        # V[c, k] = cost of leaf c if it comes from country k
+        self._value = sparse.csr_matrix((cost, (np.arange(n), codes)),
+                                        shape=(n, len(self.countries)))
+
+    @classmethod
+    def from_item_master(cls, matrix: BomMatrix, item_df: pd.DataFrame,
+                         bom_country_df: Optional[pd.DataFrame] = None,
+                         cost_column: str = "last_unit_cost",
+                         fallback_cost_column: str = "unit_cost") -> "CountryContent":
+        """Leaf cost from the item master (`cost_column`, else `fallback_cost_column`)."""
+        items = item_df.drop_duplicates("item_no", keep="last").set_index("item_no")
+        cost = pd.to_numeric(items[cost_column], errors="coerce")
+        if fallback_cost_column in items.columns:
+            cost = cost.fillna(pd.to_numeric(items[fallback_cost_column], errors="coerce"))
+        return cls(matrix, cost, component_countries(item_df, bom_country_df))
+
+    def _selector(self, rows: np.ndarray) -> sparse.csr_matrix:
+        """Total quantities of every leaf under `rows`; a childless parent is its own leaf."""
+        m = self.matrix
+        block = m.total_quantities()[rows]
+        self_leaf = np.flatnonzero(m.is_leaf[rows])
+        identity = sparse.csr_matrix((np.ones(len(self_leaf)), (self_leaf, rows[self_leaf])),
+                                     shape=block.shape)
+        return (block + identity).tocsr()
+
+    def content(self, parents: Iterable[str]) -> pd.DataFrame:
+        """
+        Content cost per parent and country.
+
+        Returns:
+            DataFrame  parent_item | country | content_cost | share
+        """
+        m = self.matrix
+        rows = np.unique(m.codes(parents))
+        product = (self._selector(rows) @ self._value).tocsr()
+        totals = np.asarray(product.sum(axis=1)).ravel()
+        values = product.tocoo()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = values.data / totals[values.row]
+        long = pd.DataFrame({
+            "parent_item": m.items[rows[values.row]],
+            "country": np.asarray(self.countries, dtype=object)[values.col],
+            "content_cost": values.data,
+            "share": share,
+        })
+        long = long[long["content_cost"] != 0]
+        return long.sort_values(["parent_item", "country"]).reset_index(drop=True)
+
+    def shares(self, parents: Iterable[str]) -> pd.DataFrame:
+        """
+        Cost-weighted share of content by country, one row per parent.
+
+        Returns:
+            DataFrame  parent_item | total_cost | uncosted_components | share_<country> …
+        """
+        m = self.matrix
+        rows = np.unique(m.codes(parents))
+        selector = self._selector(rows)
+        content = (selector @ self._value).toarray()
+        total = content.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(total[:, None] > 0, content / total[:, None], np.nan)
+
+        frame = pd.DataFrame(share, columns=[f"share_{c}" for c in self.countries])
+        frame.insert(0, "parent_item", m.items[rows])
+        frame.insert(1, "total_cost", total)
+        frame.insert(2, "uncosted_components",
+                     ((selector != 0).astype(np.int64) @ self._uncosted).astype(np.int64))
+        return frame.sort_values("parent_item").reset_index(drop=True)
+
+
+def output_country_content(item_df: pd.DataFrame, bom_df: Optional[pd.DataFrame] = None,
+                           bom_country_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Country shares for every Output parent on the shared BOM matrix (see `get_bom_matrix`)."""
+    matrix = get_bom_matrix(bom_df)
+    engine = CountryContent.from_item_master(matrix, item_df, bom_country_df)
+    parents = get_output_parents(item_df)
+    logger.info("Scoring country content for %d Output parents across %d countries.",
+                len(parents), len(engine.countries))
+    return engine.shares(parents)
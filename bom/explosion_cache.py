@@ -0,0 +1,220 @@
+# File: bom/explosion_cache.py
+"""
+Memoized sub-assembly explosion, shared across parents.
+
+Each node is exploded once into a compact *relative* table – NumPy arrays holding
+level (0 = direct child), parent, component, qty_per and the quantity per ONE unit of
+the node.  Exploding a parent composes its children's cached tables (shift level,
+scale quantity, concatenate) instead of re-walking shared sub-assemblies.
+
+Tables are valid for acyclic sub-graphs only; callers must not ask for a node that
+can reach a BOM cycle.  When BOM lines of a node change, `invalidate` (or `sync`)
+drops that node's table and every cached ancestor that embedded it.
+
+The cache holds at most `max_rows` table rows in total; least recently used tables are
+evicted once a build finishes and are simply rebuilt if asked for again.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Successors = Callable[[Hashable], Sequence[Tuple[Hashable, float]]]
+
+# Default bound on cached table rows (≈ 36 bytes each, so ~180 MB)
+MAX_ROWS = 5_000_000
+
+
+@dataclass(frozen=True)
+class SubTable:
+    """Relative explosion of one node (per unit of that node)."""
+    level: np.ndarray       # int32, 0 = direct child of the node
+    parent: np.ndarray      # int64 node codes
+    component: np.ndarray   # int64 node codes
+    qty_per: np.ndarray     # float64
+    rel_qty: np.ndarray     # float64, quantity per one unit of the node
+
+    def __len__(self) -> int:
+        return len(self.level)
+
+    @staticmethod
+    def concat(parts: List["SubTable"]) -> "SubTable":
+        if not parts:
+            return _EMPTY
+        return SubTable(*(np.concatenate([getattr(p, f) for p in parts])
+                          for f in ("level", "parent", "component", "qty_per", "rel_qty")))
+
+    def shifted(self, levels: int, factor: float) -> "SubTable":
+        return SubTable(self.level + levels, self.parent, self.component,
+                        self.qty_per, self.rel_qty * factor)
+
+
+_EMPTY = SubTable(np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.int64),
+                  np.empty(0, float), np.empty(0, float))
+
+
+class ExplosionCache:
+    """
+    Per-node relative explosion tables, reusable across parents and calls.
+
+    Args:
+        successors: node -> [(child, qty_per), ...] in BOM order.
+        leaves_only: emit only leaf components (bom_dag_explosion) instead of every
+            row in pre-order (BomExplosion).
+        reverse_children: visit children last-to-first, matching a stack walk that
+            pushes them in BOM order.
+        nodes: optional nodes to code up front, in order (codes 0..n-1), so callers that
+            already hold integer codes can read tables without re-mapping.
+        max_rows: upper bound on the summed rows of cached tables (None = unbounded).
+    """
+
+    def __init__(self, successors: Successors, *, leaves_only: bool = False,
+                 reverse_children: bool = False, nodes: Iterable[Hashable] = (),
+                 max_rows: Optional[int] = MAX_ROWS):
+        self._successors = successors
+        self.leaves_only = leaves_only
+        self.reverse_children = reverse_children
+        self.max_rows = max_rows
+        self.rows = 0
+        self._tables: "OrderedDict[Hashable, SubTable]" = OrderedDict()
+        self._signatures: Dict[Hashable, int] = {}
+        self._parents: Dict[Hashable, set] = {}      # reverse edges seen while building
+        self._codes: Dict[Hashable, int] = {}
+        self.nodes: List[Hashable] = []
+        for node in nodes:
+            self.code(node)
+
+    # ── Node codes ───────────────────────────────────────────────────────
+    def code(self, node: Hashable) -> int:
+        code = self._codes.get(node)
+        if code is None:
+            code = self._codes[node] = len(self.nodes)
+            self.nodes.append(node)
+        return code
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(self.nodes, dtype=object)[codes]
+
+    def _children(self, node: Hashable) -> Sequence[Tuple[Hashable, float]]:
+        kids = self._successors(node)
+        return list(reversed(kids)) if self.reverse_children else kids
+
+    @staticmethod
+    def _signature(kids: Sequence[Tuple[Hashable, float]]) -> int:
+        return hash(tuple(kids))
+
+    # ── Explosion ────────────────────────────────────────────────────────
+    def table(self, node: Hashable) -> SubTable:
+        """Relative table of `node`, building (and caching) any missing descendants first."""
+        cached = self._tables.get(node)
+        if cached is not None:
+            self._tables.move_to_end(node)
+            return cached
+
+        # Iterative post-order: children are tabled before their parents.
+        # `open_nodes` are expanded but unfinished, i.e. on the current DFS path.
+        stack: List[Tuple[Hashable, bool]] = [(node, False)]
+        open_nodes = set()
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._tables:
+                continue
+            kids = self._children(current)
+            if not expanded:
+                if current in open_nodes:
+                    raise ValueError(f"BOM cycle reachable from {node!r} via {current!r}")
+                open_nodes.add(current)
+                stack.append((current, True))
+                stack.extend((child, False) for child, _ in kids
+                             if child not in self._tables and self._successors(child))
+                continue
+            table = self._tables[current] = self._compose(current, kids)
+            self._signatures[current] = self._signature(kids)
+            self.rows += len(table)
+            open_nodes.discard(current)
+
+        # Evict only now: composing a parent needs every child table built above
+        table = self._tables[node]
+        self._evict()
+        return table
+
+    def _evict(self) -> None:
+        """Drops least recently used tables until the cache fits in max_rows."""
+        if self.max_rows is None:
+            return
+        while self._tables and self.rows > self.max_rows:
+            node, table = self._tables.popitem(last=False)
+            self._signatures.pop(node, None)
+            self.rows -= len(table)
+
+    def _compose(self, node: Hashable, kids: Sequence[Tuple[Hashable, float]]) -> SubTable:
+        parts: List[SubTable] = []
+        node_code = self.code(node)
+        for child, qty_per in kids:
+            self._parents.setdefault(child, set()).add(node)
+            sub = self._tables.get(child)
+            if sub is not None:
+                self._tables.move_to_end(child)
+            else:
+                # Untabled children had no BOM lines; remember that so `sync` notices
+                # a leaf that later turns into an assembly
+                self._signatures.setdefault(child, self._signature(()))
+            is_leaf = sub is None or not len(sub)     # childless nodes may hold an empty table
+            if is_leaf or not self.leaves_only:
+                parts.append(SubTable(np.zeros(1, np.int32),
+                                      np.array([node_code], np.int64),
+                                      np.array([self.code(child)], np.int64),
+                                      np.array([qty_per], float),
+                                      np.array([qty_per], float)))
+            if not is_leaf:
+                parts.append(sub.shifted(1, qty_per))
+        return SubTable.concat(parts)
+
+    # ── Invalidation ─────────────────────────────────────────────────────
+    def invalidate(self, nodes: Iterable[Hashable]) -> int:
+        """
+        Drop the tables of `nodes` and of every cached ancestor that embeds them.
+
+        Returns:
+            Number of tables dropped.
+        """
+        dropped = 0
+        pending = list(nodes)
+        seen = set()
+        while pending:
+            node = pending.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            self._signatures.pop(node, None)
+            table = self._tables.pop(node, None)
+            if table is not None:
+                self.rows -= len(table)
+                dropped += 1
+            pending.extend(self._parents.get(node, ()))
+        return dropped
+
+    def sync(self) -> int:
+        """
+        Invalidate every cached node – and every leaf a cached table embeds – whose BOM
+        lines no longer match the successor function.
+        """
+        changed = [node for node, sig in self._signatures.items()
+                   if self._signature(self._children(node)) != sig]
+        return self.invalidate(changed)
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self.rows = 0
+        self._signatures.clear()
+        self._parents.clear()
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._tables
+
+    def __len__(self) -> int:
+        return len(self._tables)
@@ -0,0 +1,226 @@
+# File: bom/mrp.py
+"""
+Time-phased MRP netting: open sales → BOM → on-hand & open POs → weekly shortages.
+
+• Dated demand, scheduled receipts (open PO lines) and on-hand stock are bucketed into
+  weeks (Monday start); anything dated before the first week lands in week 0
+• Items are processed one low-level code at a time, top-down, so every parent is
+  netted before any of its components.  Within a level all items and all weeks are
+  netted at once with a cumulative running maximum (lot-for-lot):
+
+      shortfall[t]  = Σ gross[≤t] − on_hand − Σ receipts[≤t]
+      cum_net[t]    = max(0, max(shortfall[≤t]))
+      planned[t]    = cum_net[t] − cum_net[t−1]
+
+• Planned orders (offset by lead time, if given) become dependent demand of the
+  level's components in one sparse product:   gross[children] += Aᵀ[:, level] @ planned
+
+Returns a long frame, one row per item/week with demand, supply or a shortage:
+    item_no | llc | week | gross_qty | receipt_qty | projected_qty | planned_qty
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ─── Project helpers ──────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bom.bom_dag_explosion import get_bom_matrix
+from bom.bom_matrix        import BomMatrix
+from utils.config_utils    import configure_logging, set_pandas_display_options
+
+logger = configure_logging()
+
+BUCKET = pd.Timedelta(weeks=1)
+
+# NAV stores a blank date as its minimum date, not NULL
+NAV_BLANK_DATE = pd.Timestamp("1753-01-01")
+
+MRP_COLUMNS = ["item_no", "llc", "week", "gross_qty", "receipt_qty", "projected_qty", "planned_qty"]
+
+
+class NetRequirements:
+    """
+    Weekly MRP netting over the cycle-free BOM.
+
+    Args:
+        matrix: BomMatrix of the BOM graph (supplies item codes, llc and quantities).
+        start: First week (normalized to its Monday). Defaults to the current week.
+        horizon_weeks: Number of weekly buckets. Defaults to cover the latest dated row.
+    """
+
+    def __init__(self, matrix: BomMatrix, start=None, horizon_weeks: Optional[int] = None):
+        self.matrix = matrix
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp.today()
+        self.start = (start - pd.Timedelta(days=start.weekday())).normalize()
+        self.horizon_weeks = horizon_weeks
+
+    # ── Input shaping ────────────────────────────────────────────────────
+    def _bucket(self, dates: pd.Series) -> np.ndarray:
+        weeks = (pd.to_datetime(dates) - self.start) // BUCKET
+        return np.clip(weeks.fillna(0).to_numpy(dtype=np.int64), 0, None)
+
+    @staticmethod
+    def _grid(codes: np.ndarray, weeks: np.ndarray, qty: np.ndarray,
+              n_items: int, n_weeks: int) -> np.ndarray:
+        """Sums dated quantities into an items × weeks grid (rows past the horizon dropped)."""
+        grid = np.zeros((n_items, n_weeks))
+        keep = weeks < n_weeks
+        np.add.at(grid, (codes[keep], weeks[keep]), qty[keep])
+        return grid
+
+    # ── Netting ──────────────────────────────────────────────────────────
+    def run(self, demand: pd.DataFrame, on_hand: Optional[pd.DataFrame] = None,
+            receipts: Optional[pd.DataFrame] = None,
+            lead_time_weeks: Optional[pd.Series] = None) -> pd.DataFrame:
+        """
+        Nets dated demand through the BOM.
+
+        Args:
+            demand: item_no | date | qty  (independent demand, e.g. open sales lines).
+            on_hand: item_no | quantity   (summed per item).
+            receipts: item_no | date | qty (scheduled receipts, e.g. open PO lines).
+            lead_time_weeks: Planned-order release offset per item_no (default 0).
+
+        Returns:
+            DataFrame  item_no | llc | week | gross_qty | receipt_qty | projected_qty | planned_qty
+        """
+        m = self.matrix
+        on_hand = on_hand if on_hand is not None else pd.DataFrame(columns=["item_no", "quantity"])
+        receipts = receipts if receipts is not None else pd.DataFrame(columns=["item_no", "date", "qty"])
+
+        # Items outside the BOM (e.g. resale parts) are netted as standalone leaves
+        extra = [item for item in pd.unique(pd.concat([demand["item_no"], on_hand["item_no"],
+                                                       receipts["item_no"]]))
+                 if item not in m.index]
+        items = np.concatenate([m.items, np.asarray(extra, dtype=object)])
+        n = len(items)
+        index = pd.Index(items)
+        llc = np.concatenate([m.llc, np.zeros(len(extra), dtype=np.int64)])
+        qty = sparse.csr_matrix((m.qty.data, m.qty.indices,
+                                 np.concatenate([m.qty.indptr, np.full(len(extra), m.qty.nnz)])),
+                                shape=(n, n))
+
+        demand_weeks = self._bucket(demand["date"])
+        receipt_weeks = self._bucket(receipts["date"])
+        n_weeks = self.horizon_weeks or int(max(demand_weeks.max(initial=0),
+                                                receipt_weeks.max(initial=0))) + 1
+
+        gross = self._grid(index.get_indexer(demand["item_no"]), demand_weeks,
+                           demand["qty"].to_numpy(dtype=float), n, n_weeks)
+        scheduled = self._grid(index.get_indexer(receipts["item_no"]), receipt_weeks,
+                               receipts["qty"].to_numpy(dtype=float), n, n_weeks)
+        stock = np.zeros(n)
+        np.add.at(stock, index.get_indexer(on_hand["item_no"]), on_hand["quantity"].to_numpy(dtype=float))
+        lead = np.zeros(n, dtype=np.int64)
+        if lead_time_weeks is not None:
+            lead_codes = index.get_indexer(lead_time_weeks.index)
+            found = lead_codes >= 0
+            lead[lead_codes[found]] = lead_time_weeks.to_numpy(dtype=np.int64)[found]
+
+        planned = np.zeros((n, n_weeks))
+        qty_t = qty.T.tocsr()
+        for level in range(int(llc.max(initial=0)) + 1):
+            rows = np.flatnonzero(llc == level)
+            shortfall = np.cumsum(gross[rows] - scheduled[rows], axis=1) - stock[rows, None]
+            cum_net = np.maximum.accumulate(np.maximum(shortfall, 0.0), axis=1)
+            planned[rows] = np.diff(cum_net, axis=1, prepend=0.0)
+
+            release = self._release(planned[rows], lead[rows])
+            if qty[rows].nnz:
+                gross += qty_t[:, rows] @ release
+
+        projected = stock[:, None] + np.cumsum(scheduled + planned - gross, axis=1)
+        logger.info("MRP: %d items × %d weeks netted over %d level(s); %d planned order bucket(s).",
+                    n, n_weeks, int(llc.max(initial=0)) + 1, int((planned > 0).sum()))
+        return self._to_frame(items, llc, gross, scheduled, projected, planned)
+
+    @staticmethod
+    def _release(planned: np.ndarray, lead: np.ndarray) -> np.ndarray:
+        """Shifts each row's planned orders `lead` weeks earlier (past-due releases pile into week 0)."""
+        if not lead.any():
+            return planned
+        n_rows, n_weeks = planned.shape
+        release = np.zeros_like(planned)
+        target = np.clip(np.arange(n_weeks)[None, :] - lead[:, None], 0, None)
+        np.add.at(release, (np.repeat(np.arange(n_rows), n_weeks), target.ravel()), planned.ravel())
+        return release
+
+    def _to_frame(self, items, llc, gross, scheduled, projected, planned) -> pd.DataFrame:
+        active = (gross > 0) | (scheduled > 0) | (planned > 0)
+        rows, weeks = np.nonzero(active)
+        frame = pd.DataFrame({
+            "item_no": items[rows],
+            "llc": llc[rows],
+            "week": self.start + weeks * BUCKET,
+            "gross_qty": gross[rows, weeks],
+            "receipt_qty": scheduled[rows, weeks],
+            "projected_qty": projected[rows, weeks],
+            "planned_qty": planned[rows, weeks],
+        }, columns=MRP_COLUMNS)
+        return frame.sort_values(["llc", "item_no", "week"]).reset_index(drop=True)
+
+
+def nav_dates(values) -> pd.Series:
+    """Parses dates, treating NAV's blank-date sentinel (1753-01-01) as missing."""
+    dates = pd.to_datetime(values)
+    return dates.mask(dates <= NAV_BLANK_DATE)
+
+
+def shortages(plan: pd.DataFrame) -> pd.DataFrame:
+    """Planned shortages only, pivoted to item_no × week (planned_qty)."""
+    short = plan[plan["planned_qty"] > 0]
+    return (short.pivot_table(index=["item_no", "llc"], columns="week", values="planned_qty",
+                              aggfunc="sum", fill_value=0.0)
+                 .reset_index()
+                 .rename_axis(columns=None))
+
+
+def run_mrp(start=None, horizon_weeks: Optional[int] = None,
+            sales: Optional[pd.DataFrame] = None, open_po: Optional[pd.DataFrame] = None,
+            on_hand: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Full-plant run: open sales, shared BOM matrix, ledger inventory (MRB excluded) and open
+    PO lines (expected, else promised, else order date – NAV blank dates count as missing).
+
+    Args:
+        sales: item_no | date | qty open sales lines. Defaults to the live open sales.
+        open_po: Open PO lines (item_no | outstanding_quantity | expected_receipt_date |
+                 promised_receipt_date | order_date). Defaults to the live open PO lines.
+        on_hand: item_no | quantity. Defaults to the ledger extract's inventory.
+    """
+    if sales is None:
+        from sales.sales_open_data import get_all_sales_open_data
+        sales = get_all_sales_open_data()
+    if open_po is None:
+        from purchase.open_purchase_data import get_open_purchase_item_data
+        open_po = get_open_purchase_item_data()
+    if on_hand is None:
+        from ledger.ledger_extract import load_ledger_extract, derive_inventory
+        extract = load_ledger_extract()
+        on_hand = derive_inventory(extract) if extract is not None else None
+    if sales is None or open_po is None or on_hand is None:
+        raise ValueError("Could not load open sales, open POs or the ledger extract.")
+
+    on_hand = on_hand.groupby("item_no", as_index=False)["quantity"].sum()
+    receipt_date = (nav_dates(open_po["expected_receipt_date"])
+                      .fillna(nav_dates(open_po["promised_receipt_date"]))
+                      .fillna(nav_dates(open_po["order_date"])))
+    receipts = pd.DataFrame({"item_no": open_po["item_no"], "date": receipt_date,
+                             "qty": open_po["outstanding_quantity"]})
+
+    engine = NetRequirements(get_bom_matrix(), start=start, horizon_weeks=horizon_weeks)
+    return engine.run(sales[["item_no", "date", "qty"]], on_hand, receipts)
+
+
+if __name__ == "__main__":
+    set_pandas_display_options()
+    plan = run_mrp()
+    print(shortages(plan).head(20))
@@ -0,0 +1,131 @@
+# File: bom/where_used.py
+"""
+Multi-level where-used (implosion) index over the cached BOM graph.
+
+"Which finished goods contain component X, and how many per unit?" is answered by
+walking *up* the sparse BOM matrix instead of exploding every Output parent:
+
+    X₁ = A[:, comps]          direct parents (level 1)
+    Xₖ = A @ Xₖ₋₁             parents k levels up
+
+Summing Xₖ gives the cumulative quantity of each component per one unit of every
+ancestor; the first and last k with a non-zero entry give its min / max level.  The walk
+stops after at most height(BOM) sparse products, so single-component look-ups take
+milliseconds.
+
+Example:
+    index = get_where_used_index()
+    index.where_used(["RES-10K"], parents=get_output_parents(item_df))
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+# ─── Project helpers ──────────────────────────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bom.bom_dag_explosion import bom_matrix, get_bom_matrix
+from bom.bom_matrix        import BomMatrix
+
+WHERE_USED_COLUMNS = ["component_item", "parent_item", "total_qty", "min_level", "max_level"]
+
+
+class WhereUsedIndex:
+    """Reverse (child → ancestors) look-ups on a BomMatrix."""
+
+    def __init__(self, matrix: BomMatrix):
+        self.matrix = matrix
+        self._qty_csc = matrix.qty.tocsc()      # fast column slices: direct parents of a child
+
+    @classmethod
+    def from_graph(cls, g: nx.DiGraph) -> "WhereUsedIndex":
+        """Index for `g`, kept on the graph (next to its BomMatrix) so later calls reuse it."""
+        index = g.graph.get("where_used_index")
+        if index is None:
+            index = g.graph["where_used_index"] = cls(bom_matrix(g))
+        return index
+
+    def where_used(self, components: Iterable[str],
+                   parents: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Every ancestor of each component, with cumulative quantity and level range.
+
+        Args:
+            components: Component item numbers; unknown items are skipped.
+            parents: Keep only these ancestors (e.g. Output parents). Defaults to all.
+
+        Returns:
+            DataFrame  component_item | parent_item | total_qty | min_level | max_level
+                       (level 1 = direct parent), sorted by component_item, parent_item
+        """
+        m = self.matrix
+        comp_codes = np.unique(m.codes(components))
+        if not len(comp_codes):
+            return pd.DataFrame(columns=WHERE_USED_COLUMNS)
+
+        rows, cols, levels, qty = [], [], [], []
+        frontier = self._qty_csc[:, comp_codes].tocsr()
+        level = 1
+        while frontier.nnz:
+            coo = frontier.tocoo()
+            rows.append(coo.row)
+            cols.append(coo.col)
+            levels.append(np.full(coo.nnz, level, dtype=np.int64))
+            qty.append(coo.data)
+            frontier = (m.qty @ frontier).tocsr()
+            level += 1
+
+        if not rows:
+            return pd.DataFrame(columns=WHERE_USED_COLUMNS)
+
+        hits = pd.DataFrame({
+            "parent": np.concatenate(rows),
+            "component": comp_codes[np.concatenate(cols)],
+            "level": np.concatenate(levels),
+            "qty": np.concatenate(qty),
+        })
+        if parents is not None:
+            hits = hits[hits["parent"].isin(m.codes(parents))]
+
+        result = (hits.groupby(["component", "parent"], sort=False)
+                      .agg(total_qty=("qty", "sum"),
+                           min_level=("level", "min"),
+                           max_level=("level", "max"))
+                      .reset_index())
+        result.insert(0, "component_item", m.items[result.pop("component").to_numpy()])
+        result.insert(1, "parent_item", m.items[result.pop("parent").to_numpy()])
+        return result.sort_values(["component_item", "parent_item"]).reset_index(drop=True)
+
+    def direct_parents(self, component: str) -> pd.DataFrame:
+        """Single-level where-used: parent_item | qty_per."""
+        code = self.matrix.index.get(component)
+        if code is None:
+            return pd.DataFrame(columns=["parent_item", "qty_per"])
+        column = self._qty_csc[:, [code]].tocoo()
+        return (pd.DataFrame({"parent_item": self.matrix.items[column.row], "qty_per": column.data})
+                  .sort_values("parent_item")
+                  .reset_index(drop=True))
+
+    def top_level_parents(self, components: Iterable[str]) -> pd.DataFrame:
+        """Where-used restricted to ancestors that have no parent themselves (llc 0)."""
+        tops = self.matrix.items[self.matrix.llc == 0]
+        return self.where_used(components, parents=tops)
+
+
+_index_cache: dict = {}
+
+
+def get_where_used_index(refresh: bool = False) -> WhereUsedIndex:
+    """Where-used index on the shared BOM matrix (see `get_bom_matrix`), rebuilt when it changes."""
+    matrix = get_bom_matrix(refresh=refresh)
+    index = _index_cache.get("index")
+    if index is None or index.matrix is not matrix:
+        index = _index_cache["index"] = WhereUsedIndex(matrix)
+    return index
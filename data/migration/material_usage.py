@@ -9,9 +9,12 @@ SQL-Server into MySQL with:
 • Safe executemany inserts (1 000-row batches) → avoids MySQL’s 65 535-parameter limit  
 • Oversize-proof column widths (generous VARCHAR / DECIMAL / DATE)  
 • Ctrl-C friendly; clear surfacing of MySQL DataError messages
+• --from-extract: derive the rows from the cached single-scan ledger extract
+  (ledger/ledger_extract.py) instead of running another pass over the ledger view
 """
 from __future__ import annotations
 
+import argparse
 import logging
 import sys
 from pathlib import Path
@@ -30,6 +33,7 @@ from sqlalchemy.types import (
 )
 
 from data_access.nav_database import get_engine as get_src_engine
+from ledger.ledger_extract import derive_material_usage, load_ledger_extract
 
 
 # ───────────── MySQL connection (edit if required) ───────────────────────
@@ -130,12 +134,68 @@ def stream_and_write_chunks(
     return total_rows
 
 
+def write_frame_chunks(tgt_engine: Engine, frame: pd.DataFrame) -> int:
+    """Insert an in-memory frame into MySQL in the same CHUNK_ROWS windows."""
+    total_rows = 0
+    try:
+        for start in range(0, len(frame), CHUNK_ROWS):
+            chunk = frame.iloc[start:start + CHUNK_ROWS]
+            with tgt_engine.begin() as conn:
+                conn.exec_driver_sql("SET foreign_key_checks = 0;")
+                try:
+                    chunk.to_sql(
+                        name=TARGET_TABLE,
+                        con=conn,
+                        if_exists="replace" if start == 0 else "append",
+                        index=False,
+                        chunksize=WRITE_CHUNK,
+                        dtype=dtype_map,
+                    )
+                except DataError:
+                    logging.exception(
+                        "MySQL DataError while inserting chunk starting at row %s",
+                        f"{total_rows:,}"
+                    )
+                    raise
+                conn.exec_driver_sql("SET foreign_key_checks = 1;")
+
+            total_rows += len(chunk)
+            logging.info("… processed %s rows so far", f"{total_rows:,}")
+
+    except KeyboardInterrupt:
+        logging.warning("Migration aborted by user (%s rows written).", f"{total_rows:,}")
+
+    return total_rows
+
+
 def main() -> None:
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s  %(levelname)-8s %(message)s",
     )
 
+    parser = argparse.ArgumentParser(description="Migrate material usage into MySQL")
+    parser.add_argument("--from-extract", action="store_true",
+                        help="Derive rows from the cached ledger extract instead of SQL-Server")
+    parser.add_argument("--refresh-extract", action="store_true",
+                        help="Re-run the ledger extract query before deriving")
+    args = parser.parse_args()
+
+    tgt_engine = create_engine(MYSQL_URL, pool_pre_ping=True)
+
+    if args.from_extract:
+        extract = load_ledger_extract(refresh=args.refresh_extract)
+        if extract is None:
+            logging.error("Ledger extract unavailable.")
+            sys.exit(1)
+        logging.info("Deriving material usage from the ledger extract…")
+        rows = write_frame_chunks(tgt_engine, derive_material_usage(extract))
+        if rows == 0:
+            logging.error("No rows processed.")
+        else:
+            logging.info("✓ Migration complete (%s rows).", f"{rows:,}")
+        return
+
     if not SQL_FILE.exists():
         logging.error("SQL file not found: %s", SQL_FILE)
         sys.exit(1)
@@ -144,7 +204,6 @@ def main() -> None:
     logging.info("Loaded SQL from %s", SQL_FILE)
 
     src_engine = get_src_engine()
-    tgt_engine = create_engine(MYSQL_URL, pool_pre_ping=True)
 
     logging.info("Starting streaming migration…")
     rows = stream_and_write_chunks(src_engine, tgt_engine, usage_sql)
@@ -0,0 +1,146 @@
+# File: ledger/fifo_layers.py
+"""
+FIFO inventory layers and aging, derived from the item ledger.
+
+Per item/location, entries are classified by the sign of their quantity: positive
+entries are receipts that open a layer, negative entries are issues that consume layers
+oldest first.  A sales return therefore opens a layer, a purchase return consumes one,
+and a TRANSFER (posted as a negative entry at the source location and a positive one at
+the destination) moves stock from the source's oldest layers into a new layer at the
+destination, received on the transfer's posting date.  Because FIFO always
+drains the queue from the front, the layers left at `as_of` are exactly the inbound rows
+whose cumulative receipt quantity exceeds the total issued quantity.  The queue is
+therefore processed with a grouped cumsum and a clip over whole arrays – no per-row Python:
+
+    remaining = clip(cum_in - total_out, 0, receipt_qty)
+
+Returns a layer table: item_no | location_code | entry_no | receipt_date | entry_type |
+                       receipt_qty | remaining_qty | unit_cost | remaining_cost |
+                       age_days | age_bucket
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .ledger_repository import EntryType, LedgerRepository
+
+logger = logging.getLogger(__name__)
+
+# Entry types that move stock in or out of an item/location queue (all of them)
+LAYER_ENTRY_TYPES = tuple(EntryType)
+
+LAYER_KEYS = ("item_no", "location_code")
+
+# Age bucket upper bounds in days (inclusive) and their labels
+AGE_BINS = (30, 60, 90, 180, 365)
+AGE_LABELS = ("0-30", "31-60", "61-90", "91-180", "181-365", "365+")
+
+
+def build_fifo_layers(ledger_df, as_of=None, keys=LAYER_KEYS, cost_col="cost_amount",
+                      entry_types=LAYER_ENTRY_TYPES):
+    """
+    Computes the FIFO layers remaining at `as_of` for every item/location.
+
+    Args:
+        ledger_df (pandas.DataFrame): Ledger rows with keys, 'posting_date', 'entry_type' and 'quantity'.
+        as_of (str or datetime, optional): Valuation date. Defaults to today.
+        keys (tuple, optional): Columns identifying one FIFO queue. Defaults to (item_no, location_code).
+        cost_col (str, optional): Cost amount column used for layer unit costs. Defaults to 'cost_amount'.
+        entry_types (tuple, optional): Entry types taking part in the queues. Defaults to all.
+
+    Returns:
+        pandas.DataFrame: One row per (partially) remaining inbound layer, aged at `as_of`.
+    """
+    as_of = pd.to_datetime(as_of) if as_of is not None else pd.to_datetime("today").normalize()
+    keys = [k for k in keys if k in ledger_df.columns]
+    entry_types = [int(t) for t in entry_types]
+
+    df = ledger_df[
+        (pd.to_datetime(ledger_df["posting_date"]) <= as_of)
+        & ledger_df["entry_type"].isin(entry_types)
+        & (ledger_df["quantity"].fillna(0) != 0)
+    ]
+    order = keys + ["posting_date"] + (["entry_no"] if "entry_no" in df.columns else [])
+    df = df.sort_values(order, kind="mergesort")
+
+    # One integer code per FIFO queue
+    codes = df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    n_groups = codes.max() + 1 if len(codes) else 0
+    signed_qty = df["quantity"].to_numpy(dtype=float)
+    is_in = signed_qty > 0
+    qty = np.abs(signed_qty)
+
+    total_in = np.bincount(codes[is_in], weights=qty[is_in], minlength=n_groups)
+    total_out = np.bincount(codes[~is_in], weights=qty[~is_in], minlength=n_groups)
+
+    short = int((total_out > total_in + 1e-9).sum())
+    if short:
+        logger.warning("%d item/location queue(s) issued more than received; no layers remain.", short)
+
+    inbound = df[is_in]
+    in_codes = codes[is_in]
+    in_qty = qty[is_in]
+    cum_in = pd.Series(in_qty).groupby(in_codes).cumsum().to_numpy()
+    remaining = np.clip(cum_in - total_out[in_codes], 0.0, in_qty)
+
+    keep = remaining > 0
+    layers = inbound.loc[keep, keys + [c for c in ("entry_no",) if c in inbound.columns]].copy()
+    layers["receipt_date"] = inbound.loc[keep, "posting_date"].to_numpy()
+    layers["entry_type"] = inbound.loc[keep, "entry_type"].to_numpy()
+    layers["receipt_qty"] = in_qty[keep]
+    layers["remaining_qty"] = remaining[keep]
+
+    if cost_col in inbound.columns:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            unit_cost = inbound[cost_col].to_numpy(dtype=float) / inbound["quantity"].to_numpy(dtype=float)
+        layers["unit_cost"] = np.abs(unit_cost[keep])
+    else:
+        layers["unit_cost"] = np.nan
+    layers["remaining_cost"] = layers["remaining_qty"] * layers["unit_cost"]
+
+    return age_layers(layers.reset_index(drop=True), as_of)
+
+
+def age_layers(layers, as_of, bins=AGE_BINS, labels=AGE_LABELS):
+    """Adds 'age_days' and an 'age_bucket' category measured from receipt_date to `as_of`."""
+    as_of = pd.to_datetime(as_of)
+    age_days = (as_of - pd.to_datetime(layers["receipt_date"])).dt.days
+    return layers.assign(
+        age_days=age_days,
+        age_bucket=pd.cut(age_days, bins=[-np.inf, *bins, np.inf], labels=list(labels)),
+    )
+
+
+def aging_summary(layers, keys=LAYER_KEYS, value="remaining_cost"):
+    """
+    Pivots layers into one row per item/location with a column per age bucket.
+
+    Returns:
+        pandas.DataFrame: keys | <bucket labels> | total
+    """
+    keys = [k for k in keys if k in layers.columns]
+    summary = layers.pivot_table(index=keys, columns="age_bucket", values=value,
+                                 aggfunc="sum", fill_value=0, observed=False)
+    summary.columns = summary.columns.astype(str).rename(None)
+    summary["total"] = summary.sum(axis=1)
+    return summary.reset_index()
+
+
+def fifo_layers_from_repository(repo=None, as_of=None, **kwargs):
+    """
+    Builds FIFO layers from the LedgerRepository's configured ledger data.
+
+    Args:
+        repo (LedgerRepository, optional): Repository to read from. Defaults to the singleton.
+        as_of (str or datetime, optional): Valuation date. Defaults to today.
+        **kwargs: Passed to build_fifo_layers.
+
+    Returns:
+        pandas.DataFrame: FIFO layers with age buckets.
+    """
+    repo = repo or LedgerRepository.get_instance()
+    ledger = repo.filter_ledger_data(entry_types=list(kwargs.get("entry_types", LAYER_ENTRY_TYPES)),
+                                     end_date=as_of)
+    return build_fifo_layers(ledger, as_of=as_of, **kwargs)
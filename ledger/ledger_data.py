@@ -18,7 +18,7 @@ from utils.config_utils import (
 logger = configure_logging()
 
 # Get the SQL query from the ledger_all.sql file
-ledger_query = read_sql_file('ledger_all.sql')
+ledger_query = read_sql_file('ledger/ledger_all.sql')
 
 def get_all_ledger_data():
     """Returns a DataFrame containing all ledger data."""
@@ -28,6 +28,20 @@ def get_all_ledger_data():
         return None
     return load_and_process_data(query=ledger_query, engine=engine, logger=logger)
 
+def get_item_ledger_data(refresh=False):
+    """
+    Returns the LedgerRepository ledger frame, derived from the cached single-scan extract.
+
+    Args:
+        refresh (bool, optional): Re-run the extract query instead of reading the local cache.
+    """
+    from ledger.ledger_extract import load_ledger_extract, derive_ledger_frame
+
+    extract = load_ledger_extract(refresh=refresh)
+    if extract is None:
+        return None
+    return derive_ledger_frame(extract)
+
 if __name__ == "__main__":
     set_pandas_display_options()
     ledger_df = get_all_ledger_data()
@@ -0,0 +1,235 @@
+# File: ledger/ledger_extract.py
+"""
+Single-scan item ledger extract, cached locally, with every ledger output derived in Python.
+
+`sql/ledger/ledger_extract.sql` reads `item_ledger_entry_all_v` once (US010, Quantity <> 0)
+and the result is cached as Parquet.  From that one frame we derive, in one pass:
+
+• ledger          – the LedgerRepository frame            (was ledger_all.sql)
+• material_usage  – consumption / sale / scrap issues     (was material_usage.sql)
+• inventory       – on-hand qty & LC cost per location    (was inventory/inventory.sql)
+• snapshot_spans  – inv_snapshot balance spans            (was mysql/inventory_snap.sql)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path first
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from utils.config_utils import (
+    PROJECT_ROOT,
+    configure_logging,
+    read_sql_file,
+    get_database_engine,
+    load_and_process_data,
+    set_pandas_display_options
+)
+
+logger = configure_logging()
+
+extract_query = read_sql_file('ledger/ledger_extract.sql')
+
+EXTRACT_CACHE_PATH = Path(PROJECT_ROOT) / "data" / "cache" / "ledger_extract.parquet"
+
+# NAV entry types used by the material-usage classification
+SALE, NEGATIVE_ADJUSTMENT, CONSUMPTION = 1, 3, 5
+
+SNAPSHOT_SLICE_START = "2020-01-01"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. EXTRACT (one SQL scan, cached)
+# ──────────────────────────────────────────────────────────────────────────────
+def load_ledger_extract(refresh=False, cache_path=EXTRACT_CACHE_PATH):
+    """
+    Returns the ledger extract, reading the local Parquet cache unless `refresh` is set.
+
+    Args:
+        refresh (bool, optional): Re-run the SQL scan and rewrite the cache. Defaults to False.
+        cache_path (Path, optional): Parquet cache location.
+
+    Returns:
+        pandas.DataFrame or None: The extract, or None if the query failed.
+    """
+    cache_path = Path(cache_path)
+    if cache_path.exists() and not refresh:
+        logger.info("Reading ledger extract from %s", cache_path)
+        return pd.read_parquet(cache_path)
+
+    engine = get_database_engine()
+    if not engine:
+        logger.error("Could not get database engine.")
+        return None
+    extract = load_and_process_data(query=extract_query, engine=engine, logger=logger)
+    if extract is None:
+        return None
+
+    extract["posting_date"] = pd.to_datetime(extract["posting_date"])
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    extract.to_parquet(cache_path, index=False)
+    logger.info("Cached %d ledger rows → %s", len(extract), cache_path)
+    return extract
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. DERIVED OUTPUTS
+# ──────────────────────────────────────────────────────────────────────────────
+def _with_cost_totals(extract):
+    """Adds the actual + expected cost totals shared by every derived output."""
+    return extract.assign(
+        cost_amount=extract["cost_actual_usd"] + extract["cost_expected_usd"],
+        root_cost_amount=extract["root_cost_actual_usd"] + extract["root_cost_expected_usd"],
+        cost_amount_lc=extract["cost_actual_lc"] + extract["cost_expected_lc"],
+    )
+
+
+def derive_ledger_frame(extract):
+    """
+    Ledger rows in the shape LedgerRepository expects.
+
+    Returns:
+        pandas.DataFrame: entry_no | item_no | posting_date | entry_type | document_no |
+                          location_code | quantity | cost_center | order_no |
+                          cost_amount | root_cost_amount
+    """
+    if "cost_amount" not in extract.columns:
+        extract = _with_cost_totals(extract)
+    return extract.rename(columns={"department": "cost_center"})[[
+        "entry_no", "item_no", "posting_date", "entry_type", "document_no",
+        "location_code", "quantity", "cost_center", "order_no",
+        "cost_amount", "root_cost_amount",
+    ]]
+
+
+def derive_material_usage(extract):
+    """
+    Consumption ('C'), sale ('SALE') and scrap ('S') issues, as material_usage.sql returned them.
+
+    Returns:
+        pandas.DataFrame: subsidiary | entry_no | item_no | posting_date | location_code |
+                          order_no | document_no | issue_type | qty_issued | total_cost_usd |
+                          unit_cost | total_root_cost_usd | unit_cost_root | department
+    """
+    if "cost_amount" not in extract.columns:
+        extract = _with_cost_totals(extract)
+
+    entry_type = extract["entry_type"]
+    issue_type = np.select(
+        [
+            entry_type == CONSUMPTION,
+            entry_type == SALE,
+            (entry_type == NEGATIVE_ADJUSTMENT) & (extract["gen_prod_posting_group"] == "SCRAP"),
+        ],
+        ["C", "SALE", "S"],
+        default="",
+    )
+    keep = issue_type != ""
+    usage = extract.loc[keep]
+
+    qty_issued = usage["quantity"].abs()
+    total_cost = usage["cost_amount"].abs()
+    total_root = usage["root_cost_amount"].abs()
+    usage = pd.DataFrame({
+        "subsidiary": usage["subsidiary"],
+        "entry_no": usage["entry_no"],
+        "item_no": usage["item_no"],
+        "posting_date": usage["posting_date"],
+        "location_code": usage["location_code"],
+        "order_no": usage["order_no"],
+        "document_no": usage["document_no"],
+        "issue_type": issue_type[keep],
+        "qty_issued": qty_issued.round(4),
+        "total_cost_usd": total_cost.round(4),
+        "unit_cost": (total_cost / qty_issued).round(4),
+        "total_root_cost_usd": total_root.round(4),
+        "unit_cost_root": (total_root / qty_issued).round(4),
+        "department": usage["department"],
+    })
+    return (usage
+            .sort_values(["posting_date", "item_no", "department", "entry_no"], kind="mergesort")
+            .reset_index(drop=True))
+
+
+def derive_inventory(extract):
+    """
+    On-hand quantity and LC inventory cost per item/location, excluding MRB locations.
+
+    Returns:
+        pandas.DataFrame: subsidiary | item_no | location_code | inventory_cost_lc | quantity
+    """
+    if "cost_amount_lc" not in extract.columns:
+        extract = _with_cost_totals(extract)
+
+    on_hand = extract[~extract["location_code"].str.contains("MRB", case=False, na=True)]
+    inventory = (on_hand
+                 .groupby(["subsidiary", "item_no", "location_code"], as_index=False)
+                 .agg(inventory_cost_lc=("cost_amount_lc", lambda s: s.sum(min_count=1)),
+                      quantity=("quantity", "sum")))
+    inventory = inventory[inventory["quantity"] != 0]
+    return inventory.sort_values("item_no", kind="mergesort").reset_index(drop=True)
+
+
+def derive_snapshot_spans(extract, slice_start=SNAPSHOT_SLICE_START):
+    """
+    Inventory balance spans per item/location, as inventory_snap.sql builds inv_snapshot.
+
+    History before `slice_start` is folded into one opening balance dated the day before.
+    A new span starts whenever the running quantity, root cost or cost changes.
+
+    Returns:
+        pandas.DataFrame: item_no | location_code | balance_start | balance_end |
+                          qty_on_hand | total_root | total_cost
+    """
+    if "cost_amount" not in extract.columns:
+        extract = _with_cost_totals(extract)
+
+    slice_start = pd.to_datetime(slice_start)
+    keys = ["item_no", "location_code"]
+    snapshot_date = extract["posting_date"].where(
+        extract["posting_date"] >= slice_start, slice_start - pd.Timedelta(days=1))
+
+    daily = (extract.assign(snapshot_date=snapshot_date)
+             .groupby(keys + ["snapshot_date"], as_index=False, dropna=False)
+             .agg(daily_qty=("quantity", "sum"),
+                  daily_root=("root_cost_amount", "sum"),
+                  daily_cost=("cost_amount", "sum")))
+
+    running = daily.groupby(keys, sort=False, dropna=False)[["daily_qty", "daily_root", "daily_cost"]].cumsum().round(6)
+    running.columns = ["qty_on_hand", "total_root", "total_cost"]
+    previous = running.groupby([daily["item_no"], daily["location_code"]], sort=False, dropna=False).shift(1)
+    changed = previous.isna().any(axis=1) | (running != previous).any(axis=1)
+
+    spans = pd.concat([daily.loc[changed, keys + ["snapshot_date"]], running.loc[changed]], axis=1)
+    spans = spans.rename(columns={"snapshot_date": "balance_start"})
+    next_start = spans.groupby(keys, sort=False, dropna=False)["balance_start"].shift(-1)
+    spans.insert(3, "balance_end", next_start - pd.Timedelta(days=1))
+    return spans.reset_index(drop=True)
+
+
+def derive_all(extract, slice_start=SNAPSHOT_SLICE_START):
+    """
+    Derives every ledger output from one extract, computing the shared cost totals once.
+
+    Returns:
+        dict[str, pandas.DataFrame]: ledger | material_usage | inventory | snapshot_spans
+    """
+    extract = _with_cost_totals(extract)
+    return {
+        "ledger": derive_ledger_frame(extract),
+        "material_usage": derive_material_usage(extract),
+        "inventory": derive_inventory(extract),
+        "snapshot_spans": derive_snapshot_spans(extract, slice_start),
+    }
+
+
+if __name__ == "__main__":
+    set_pandas_display_options()
+    extract = load_ledger_extract(refresh="--refresh" in sys.argv)
+    if extract is not None:
+        for name, frame in derive_all(extract).items():
+            print(f"\n{name}: {len(frame)} rows")
+            print(frame.head(5))
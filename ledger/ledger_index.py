@@ -0,0 +1,126 @@
+# File: ledger/ledger_index.py
+"""
+Sorted, position-indexed layout of the configured ledger frame.
+
+The ledger is held sorted by (item_no, posting_date) so that:
+  • an item filter is a contiguous row range   (slice look-up)
+  • a date range inside an item is two `searchsorted` bounds
+  • a date range across items uses a pre-computed posting_date order
+  • an entry-type filter is a pre-computed, ascending array of row positions
+"""
+
+import numpy as np
+import pandas as pd
+
+SORT_COLUMNS = ["item_no", "posting_date"]
+
+
+class LedgerIndex:
+    def __init__(self, ledger_df):
+        """
+        Sorts the ledger by (item_no, posting_date) and builds the look-up structures.
+
+        Args:
+            ledger_df (pandas.DataFrame): Ledger data with 'item_no', 'posting_date' and 'entry_type'.
+        """
+        df = ledger_df.assign(posting_date=pd.to_datetime(ledger_df["posting_date"]))
+        self.df = df.sort_values(SORT_COLUMNS, kind="mergesort").reset_index(drop=True)
+
+        # posting_date is sorted within each item block (NaT last)
+        self._dates = self.df["posting_date"].to_numpy()
+
+        # item → (start, stop) row range
+        codes, _ = pd.factorize(self.df["item_no"])
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.r_[0, boundaries] if len(codes) else np.array([], dtype=int)
+        stops = np.r_[boundaries, len(codes)] if len(codes) else np.array([], dtype=int)
+        items = self.df["item_no"].to_numpy()[starts]
+        self._item_slices = {
+            item: (int(start), int(stop))
+            for item, start, stop, code in zip(items, starts, stops, codes[starts])
+            if code >= 0
+        }
+
+        # posting_date order across all items
+        self._date_order = np.argsort(self._dates, kind="stable")
+        self._sorted_dates = self._dates[self._date_order]
+
+        # entry_type → ascending row positions (offsets into one stable argsort)
+        self._entry_codes = self.df["entry_type"].to_numpy()
+        self._entry_order = np.argsort(self._entry_codes, kind="stable")
+        sorted_codes = self._entry_codes[self._entry_order]
+        type_values, type_starts = np.unique(sorted_codes, return_index=True)
+        type_stops = np.r_[type_starts[1:], len(sorted_codes)]
+        self._entry_offsets = {
+            value: (int(start), int(stop))
+            for value, start, stop in zip(type_values.tolist(), type_starts, type_stops)
+        }
+
+    def __len__(self):
+        return len(self.df)
+
+    # ── Bound helpers ────────────────────────────────────────────────────
+    def _to_datetime64(self, value):
+        return np.datetime64(pd.Timestamp(value)).astype(self._dates.dtype)
+
+    def _bounds(self, dates, start_date, end_date):
+        """Returns [lo, hi) of `dates` (sorted, NaT last) inside the inclusive date range."""
+        lo = 0 if start_date is None else np.searchsorted(dates, self._to_datetime64(start_date), "left")
+        if end_date is not None:
+            hi = np.searchsorted(dates, self._to_datetime64(end_date), "right")
+        else:
+            # Any date bound excludes NaT rows, as the boolean comparisons did
+            hi = np.searchsorted(dates, np.datetime64("NaT"), "left")
+        return int(lo), int(hi)
+
+    def date_bounds(self, start_date=None, end_date=None):
+        """Returns the [lo, hi) bounds of the date range in global posting_date order."""
+        return self._bounds(self._sorted_dates, start_date, end_date)
+
+    # ── Look-ups ─────────────────────────────────────────────────────────
+    def item_positions(self, items, start_date=None, end_date=None):
+        """Returns the ascending row positions of `items`, optionally bounded by posting_date."""
+        ranges = sorted(self._item_slices[i] for i in items if i in self._item_slices)
+        dated = start_date is not None or end_date is not None
+        pieces = []
+        for start, stop in ranges:
+            if dated:
+                lo, hi = self._bounds(self._dates[start:stop], start_date, end_date)
+                start, stop = start + lo, start + hi
+            if stop > start:
+                pieces.append(np.arange(start, stop))
+        return np.concatenate(pieces) if pieces else np.array([], dtype=np.intp)
+
+    def entry_type_positions(self, entry_types):
+        """Returns the ascending row positions whose entry_type is in `entry_types`."""
+        pieces = [
+            self._entry_order[slice(*self._entry_offsets[value])]
+            for value in {int(t) if isinstance(t, (int, np.integer)) else t for t in entry_types}
+            if value in self._entry_offsets
+        ]
+        if not pieces:
+            return np.array([], dtype=np.intp)
+        return pieces[0] if len(pieces) == 1 else np.sort(np.concatenate(pieces))
+
+    def positions(self, entry_types=None, start_date=None, end_date=None, items=None):
+        """
+        Resolves the filters to ascending row positions.
+
+        Returns:
+            numpy.ndarray or None: Row positions, or None when no filter applies.
+        """
+        positions = None
+        if items is not None:
+            positions = self.item_positions(items, start_date, end_date)
+        elif start_date is not None or end_date is not None:
+            lo, hi = self.date_bounds(start_date, end_date)
+            positions = np.sort(self._date_order[lo:hi])
+
+        if entry_types is not None:
+            if positions is None:
+                positions = self.entry_type_positions(entry_types)
+            else:
+                wanted = [int(t) if isinstance(t, (int, np.integer)) else t for t in entry_types]
+                positions = positions[np.isin(self._entry_codes[positions], wanted)]
+
+        return positions
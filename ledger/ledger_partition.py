@@ -0,0 +1,317 @@
+# File: ledger/ledger_partition.py
+"""
+Multi-core, partitioned execution of ledger running balances and roll-ups.
+
+• Rows are hash-partitioned by item_no, so every item lives in exactly one partition
+• Only the columns a computation reads are handed to a process pool, as Arrow IPC files
+  on shared memory (/dev/shm when available) that the workers memory-map – no DataFrame
+  pickling, and no DataFrame conversion in the workers: the per-partition functions run
+  on the mapped Arrow tables with pyarrow.compute (running balances cumsum per group over
+  the value columns only)
+• Worker results come back the same way and are concatenated in partition order,
+  then sorted on the caller's keys so the output is deterministic
+
+Example:
+    ledger = LedgerRepository.get_instance().get_configured_ledger_data()
+    balances = parallel_running_balance(ledger)
+    usage = parallel_usage_rollup(ledger, freq="M")
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+# Below this many rows the pool start-up costs more than it saves
+MIN_PARALLEL_ROWS = 200_000
+
+BALANCE_KEYS = ("item_no", "location_code")
+BALANCE_ORDER = ("posting_date", "entry_no")
+VALUE_COLUMNS = ("quantity", "cost_amount")
+
+# NAV entry types (see ledger_repository.EntryType): SALE, CONSUMPTION
+USAGE_ENTRY_TYPES = (1, 5)
+
+_COMBINE = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+# pandas period aliases → pyarrow floor_temporal units (periods start on the floor)
+_PERIOD_UNITS = {"D": "day", "W": "week", "M": "month", "MS": "month", "Q": "quarter",
+                 "QS": "quarter", "Y": "year", "YS": "year", "A": "year", "AS": "year"}
+
+# Row position of each input row, carried through the workers for running balances
+_ROW = "__row"
+
+
+def _require_columns(df, columns):
+    missing = [col for col in dict.fromkeys(columns) if col not in df.columns]
+    if missing:
+        raise KeyError(f"Missing ledger column(s): {', '.join(missing)}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. PARTITIONING & ARROW HAND-OFF
+# ──────────────────────────────────────────────────────────────────────────────
+def hash_partition(df, n_partitions, key="item_no"):
+    """
+    Splits row positions of `df` into `n_partitions` groups by a stable hash of `key`.
+
+    Returns:
+        list[numpy.ndarray]: Ascending row positions per partition.
+    """
+    buckets = pd.util.hash_pandas_object(df[key], index=False).to_numpy() % np.uint64(n_partitions)
+    order = np.argsort(buckets, kind="stable")
+    bounds = np.searchsorted(buckets[order], np.arange(1, n_partitions, dtype=np.uint64))
+    return np.split(order, bounds)
+
+
+def _write_arrow(table, path):
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_arrow(path):
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _to_arrow(frame):
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def _run_partition(func, in_path, out_path, func_kwargs):
+    """Worker entry point: memory-maps one partition, applies `func`, writes the result."""
+    _write_arrow(func(_read_arrow(in_path), **func_kwargs), out_path)
+    return out_path
+
+
+def _shared_tempdir():
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    return tempfile.mkdtemp(prefix="ledger_partition_", dir=root)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. GENERIC DRIVER
+# ──────────────────────────────────────────────────────────────────────────────
+def partitioned_apply(df, func, *, columns, key="item_no", sort_by=None, max_workers=None,
+                      n_partitions=None, **func_kwargs):
+    """
+    Applies `func` to hash partitions of `df[columns]` in a process pool and concatenates
+    the results.
+
+    `func` must be a module-level function taking a pyarrow.Table (plus `func_kwargs`) and
+    returning a pyarrow.Table, whose result only depends on rows sharing the same `key`.
+
+    Args:
+        df (pandas.DataFrame): Input rows.
+        func (callable): Per-partition function.
+        columns (list): Columns `func` reads; only these are converted and shipped.
+        key (str, optional): Partition column. Defaults to "item_no".
+        sort_by (list, optional): Columns to sort the concatenated result by.
+        max_workers (int, optional): Pool size. Defaults to os.cpu_count().
+        n_partitions (int, optional): Number of partitions. Defaults to 4 × max_workers.
+
+    Returns:
+        pandas.DataFrame: Concatenated result with a fresh RangeIndex.
+    """
+    columns = list(dict.fromkeys(columns))
+    _require_columns(df, columns + [key])
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(df) < MIN_PARALLEL_ROWS:
+        result = func(_to_arrow(df[columns]), **func_kwargs)
+    else:
+        n_partitions = n_partitions or max_workers * 4
+        workdir = _shared_tempdir()
+        try:
+            projected = df[columns]
+            jobs = []
+            for part_no, positions in enumerate(hash_partition(df, n_partitions, key)):
+                if len(positions):
+                    in_path = os.path.join(workdir, f"in_{part_no:04d}.arrow")
+                    _write_arrow(_to_arrow(projected.iloc[positions]), in_path)
+                    jobs.append((in_path, os.path.join(workdir, f"out_{part_no:04d}.arrow")))
+
+            logger.info("Running %s over %d partition(s) on %d worker(s) …",
+                        getattr(func, "__name__", func), len(jobs), max_workers)
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(_run_partition, func, in_path, out_path, func_kwargs)
+                           for in_path, out_path in jobs]
+                out_paths = [future.result() for future in futures]
+
+            result = pa.concat_tables([_read_arrow(path) for path in out_paths])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    result = result.to_pandas()
+    if sort_by:
+        result = result.sort_values(list(sort_by), kind="mergesort")
+    return result.reset_index(drop=True)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. PER-PARTITION FUNCTIONS (module level so the pool can import them)
+# ──────────────────────────────────────────────────────────────────────────────
+def _group_codes(table, keys):
+    """One integer code per distinct key combination (missing keys form their own group)."""
+    codes = np.zeros(table.num_rows, dtype=np.int64)
+    for key in keys:
+        encoded = pc.dictionary_encode(table[key]).combine_chunks()
+        key_codes = pc.fill_null(encoded.indices, -1).to_numpy().astype(np.int64) + 1
+        codes = codes * (len(encoded.dictionary) + 1) + key_codes
+    return codes
+
+
+def running_balance(table, keys=BALANCE_KEYS, order_by=BALANCE_ORDER, value_cols=VALUE_COLUMNS):
+    """
+    '<col>_balance' cumulative sums per `keys`, ordered by `order_by` (missing values are
+    skipped and keep a missing balance, like pandas' cumsum).
+
+    Returns:
+        pyarrow.Table: The input's __row column plus the balances, in (keys, order_by) order.
+    """
+    keys = [k for k in keys if k in table.column_names]
+    order_by = [c for c in order_by if c in table.column_names]
+
+    codes = _group_codes(table, keys)
+    order = pc.sort_indices(
+        table.append_column("__group", pa.array(codes)),
+        sort_keys=[(col, "ascending") for col in ["__group"] + order_by],
+    ).to_numpy()
+    codes = codes[order]
+
+    # The cumsum restarts at every group, so balances don't pick up rounding from
+    # earlier groups in the partition
+    out = {_ROW: table[_ROW].take(order)}
+    for col in value_cols:
+        values = pd.Series(table[col].take(order).to_numpy(zero_copy_only=False).astype(float))
+        running = values.groupby(codes, sort=False).cumsum()
+        out[f"{col}_balance"] = pa.array(running.to_numpy(), from_pandas=True)
+    return pa.table(out)
+
+
+def rollup(table, by, value_cols=VALUE_COLUMNS, agg="sum"):
+    """Aggregates `value_cols` by `by` (sum, count, min or max); missing keys form a group."""
+    if agg == "sum":
+        options = pc.ScalarAggregateOptions(min_count=0)
+    elif agg == "count":
+        options = pc.CountOptions(mode="only_valid")
+    else:
+        options = None
+    by = list(by)
+    sums = table.group_by(by).aggregate([(col, agg, options) for col in value_cols])
+    return pa.table({**{col: sums[col] for col in by},
+                     **{col: sums[f"{col}_{agg}"] for col in value_cols}})
+
+
+def _usage_partition(table, freq, entry_types, value_cols):
+    table = table.filter(pc.is_in(table["entry_type"], pa.array(entry_types, table["entry_type"].type)))
+    period = pc.floor_temporal(table["posting_date"], unit=_PERIOD_UNITS[freq], week_starts_monday=True)
+    usage = pa.table({"item_no": table["item_no"], "period": period,
+                      **{col: pc.abs(table[col]) for col in value_cols}})
+    return rollup(usage, ["item_no", "period"], value_cols)
+
+
+def _valuation_partition(table, as_of, keys, value_cols):
+    if as_of is not None:
+        table = table.filter(pc.less_equal(table["posting_date"], pa.scalar(as_of, table["posting_date"].type)))
+    return rollup(table, [k for k in keys if k in table.column_names], value_cols)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 4. LEDGER ROLL-UPS
+# ──────────────────────────────────────────────────────────────────────────────
+def parallel_running_balance(df, keys=BALANCE_KEYS, order_by=BALANCE_ORDER,
+                             value_cols=VALUE_COLUMNS, max_workers=None):
+    """
+    Running quantity/cost balance per item (and location) for every ledger entry.
+
+    Workers only see the key, order and value columns; the balances are attached to the
+    full rows here.
+
+    Returns:
+        pandas.DataFrame: Ledger rows plus '<col>_balance' columns, sorted by keys and order_by.
+    """
+    if "item_no" not in keys:
+        raise ValueError("Running balances must be keyed by item_no to partition by item.")
+    _require_columns(df, list(value_cols))
+    sort_by = [c for c in list(keys) + list(order_by) if c in df.columns]
+
+    rows = df[[c for c in sort_by + list(value_cols) if c in df.columns]].assign(**{_ROW: np.arange(len(df))})
+    balances = partitioned_apply(rows, running_balance, columns=list(rows.columns),
+                                 max_workers=max_workers,
+                                 keys=keys, order_by=order_by, value_cols=value_cols)
+
+    out = df.copy()
+    positions = balances[_ROW].to_numpy()
+    for col in value_cols:
+        column = np.full(len(df), np.nan)
+        column[positions] = balances[f"{col}_balance"].to_numpy()
+        out[f"{col}_balance"] = column
+    return out.sort_values(sort_by, kind="mergesort").reset_index(drop=True)
+
+
+def parallel_rollup(df, by, value_cols=VALUE_COLUMNS, agg="sum", max_workers=None):
+    """
+    Grouped sum/count/min/max of `value_cols` by `by`.
+
+    Groupings that do not include item_no are combined in a second (small) pass over the
+    per-partition partials.
+
+    Returns:
+        pandas.DataFrame: One row per group, sorted by `by`.
+    """
+    if agg not in _COMBINE:
+        raise ValueError(f"agg must be one of {sorted(_COMBINE)}")
+    by = list(by)
+    _require_columns(df, by + list(value_cols))
+    partials = partitioned_apply(df, rollup, columns=by + list(value_cols), max_workers=max_workers,
+                                 by=by, value_cols=value_cols, agg=agg)
+    if "item_no" not in by:
+        partials = rollup(_to_arrow(partials), by, value_cols, _COMBINE[agg]).to_pandas()
+    return partials.sort_values(by, kind="mergesort").reset_index(drop=True)
+
+
+def parallel_usage_rollup(df, freq="M", entry_types=USAGE_ENTRY_TYPES,
+                          value_cols=VALUE_COLUMNS, max_workers=None):
+    """
+    Issued quantity/cost per item and period (sales and consumption, absolute values).
+
+    `freq` is a pandas period alias (D, W, M, Q, Y); periods are labelled by their start.
+
+    Returns:
+        pandas.DataFrame: item_no | period | quantity | cost_amount
+    """
+    if freq not in _PERIOD_UNITS:
+        raise ValueError(f"freq must be one of {sorted(_PERIOD_UNITS)}")
+    columns = ["item_no", "posting_date", "entry_type"] + list(value_cols)
+    _require_columns(df, columns)
+    return partitioned_apply(df, _usage_partition, columns=columns, sort_by=["item_no", "period"],
+                             max_workers=max_workers, freq=freq,
+                             entry_types=[int(t) for t in entry_types], value_cols=value_cols)
+
+
+def parallel_valuation_rollup(df, as_of=None, keys=BALANCE_KEYS,
+                              value_cols=VALUE_COLUMNS, max_workers=None):
+    """
+    On-hand quantity and cost per item (and location) as of a date.
+
+    Returns:
+        pandas.DataFrame: keys | quantity | cost_amount
+    """
+    as_of = pd.to_datetime(as_of) if as_of is not None else None
+    sort_by = [k for k in keys if k in df.columns]
+    columns = sort_by + list(value_cols) + (["posting_date"] if as_of is not None else [])
+    _require_columns(df, columns)
+    partials = partitioned_apply(df, _valuation_partition, columns=columns, max_workers=max_workers,
+                                 as_of=as_of, keys=keys, value_cols=value_cols)
+    if "item_no" not in sort_by:
+        partials = rollup(_to_arrow(partials), sort_by, value_cols).to_pandas()
+    return partials.sort_values(sort_by, kind="mergesort").reset_index(drop=True)
@@ -1,9 +1,11 @@
+import numpy as np
 import pandas as pd
 from .ledger_data import get_item_ledger_data
-from item.item_repository import ItemRepository
+from .ledger_index import LedgerIndex
 import logging
 from enum import IntEnum
 from utils.time_utils import TimeUtils
+from utils.frame_cache import FrameCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -20,6 +22,9 @@ class EntryType(IntEnum):
 class LedgerRepository:
     _instance = None
 
+    # Memory cap for memoized filter_ledger_data results
+    FILTER_CACHE_MAX_BYTES = 512 * 1024 ** 2
+
     @classmethod
     def get_instance(cls):
         """Returns the singleton instance of LedgerRepository."""
@@ -30,14 +35,21 @@ class LedgerRepository:
     def __init__(self):
         """Initializes the repository with an empty cache."""
         self._configured_ledger_data = None
+        self._index = None
+        self._filter_cache = FrameCache(self.FILTER_CACHE_MAX_BYTES)
 
-    def load_configured_ledger_data(self):
+    def load_configured_ledger_data(self, refresh=False):
         """
         Loads raw ledger data and adds an 'item_index' column by merging with the final item table.
 
+        Args:
+            refresh (bool, optional): Re-query the source instead of reading the local extract cache.
+
         Returns:
             pandas.DataFrame: Ledger data with 'item_index' added.
         """
+        from item.item_repository import ItemRepository
+
         try:
             # Get the ItemRepository instance and final item table
             item_repo = ItemRepository.get_instance()
@@ -45,7 +57,7 @@ class LedgerRepository:
 
             # Load and merge ledger data directly
             merged_df = pd.merge(
-                get_item_ledger_data(),
+                get_item_ledger_data(refresh=refresh),
                 final_item_table[["item_no", "item_index"]],
                 on="item_no",
                 how="left"
@@ -56,35 +68,92 @@ class LedgerRepository:
             logger.error(f"Failed to load configured ledger data: {e}")
             raise
 
+    def _set_configured_ledger_data(self, ledger_df):
+        """Stores the ledger sorted by (item_no, posting_date) together with its index."""
+        self._index = LedgerIndex(ledger_df)
+        self._configured_ledger_data = self._index.df
+        self._filter_cache.clear()
+
     def get_configured_ledger_data(self):
         """
         Returns the cached configured ledger data, loading it if necessary.
 
+        The frame is sorted by (item_no, posting_date) with a fresh RangeIndex.
+
         Returns:
             pandas.DataFrame: The configured ledger data.
         """
         if self._configured_ledger_data is None:
-            self._configured_ledger_data = self.load_configured_ledger_data()
+            self._set_configured_ledger_data(self.load_configured_ledger_data())
         return self._configured_ledger_data
 
+    def get_index(self):
+        """Returns the LedgerIndex over the configured ledger data, loading it if necessary."""
+        self.get_configured_ledger_data()
+        return self._index
+
     def get_configured_data(self):
         """Alias for get_configured_ledger_data to match DataLoader interface."""
         return self.get_configured_ledger_data()
 
     def refresh(self):
         """
-        Forces a reload of the configured ledger data and returns it.
+        Forces a reload of the configured ledger data from the database and returns it.
+
+        The local ledger extract cache is rewritten as well, and the memoized
+        filter_ledger_data results are invalidated.
 
         Returns:
             pandas.DataFrame: Freshly loaded configured ledger data.
         """
-        self._configured_ledger_data = self.load_configured_ledger_data()
+        self._set_configured_ledger_data(self.load_configured_ledger_data(refresh=True))
         return self._configured_ledger_data
 
+    def cache_info(self):
+        """Returns hits, misses, max_bytes, current_bytes and entries of the filter result cache."""
+        return self._filter_cache.info()
+
+    def clear_filter_cache(self):
+        """Drops all memoized filter_ledger_data results."""
+        self._filter_cache.clear()
+
+    def _filter_cache_key(self, entry_types, start_date, end_date, items, kwargs):
+        """
+        Builds a normalized cache key for filter_ledger_data arguments.
+
+        Date bounds are snapped to the [lo, hi) range they select in posting_date order, so
+        relative periods resolved at different times of day share an entry.
+
+        Returns:
+            tuple or None: The key, or None when an argument is not hashable.
+        """
+        def normalize(value):
+            return int(value) if isinstance(value, (int, np.integer)) else value
+
+        try:
+            key = (
+                None if entry_types is None else frozenset(normalize(t) for t in entry_types),
+                None if start_date is None and end_date is None
+                else self._index.date_bounds(start_date, end_date),
+                None if items is None else frozenset(items),
+                frozenset(
+                    (column, frozenset(value) if isinstance(value, list) else value)
+                    for column, value in kwargs.items()
+                ),
+            )
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def filter_ledger_data(self, entry_types=None, start_date=None, end_date=None, days=None, time_period=None, **kwargs):
         """
         Filters ledger data with support for predefined time periods.
 
+        Item and date filters resolve to row ranges of the sorted ledger (slice look-ups and
+        `searchsorted` bounds) and entry types to pre-computed row positions, so no full-frame
+        boolean scan is needed for them.
+
         Args:
             entry_types (list, optional): List of entry types to filter by (e.g., [EntryType.PURCHASE, EntryType.SALE]).
             start_date (str or datetime, optional): Start date for filtering.
@@ -94,34 +163,51 @@ class LedgerRepository:
             **kwargs: Additional column-value filters (e.g., item_no="ABC123").
 
         Returns:
-            pandas.DataFrame: Filtered ledger data.
+            pandas.DataFrame: Filtered ledger data, in (item_no, posting_date) order.
+                Results are memoized; each call gets its own shallow copy, so mutating
+                it never touches the cached frame.
         """
         df = self.get_configured_ledger_data()
+        index = self._index
 
         # Handle predefined time periods
         if time_period:
-            start_date = TimeUtils.get_start_date(time_period)
-
-        # Filter by entry types if provided
-        if entry_types is not None:
-            df = df[df['entry_type'].isin(entry_types)]
+            start_date = TimeUtils.get_period_dates(time_period)[0]
 
         # Handle date filtering
         if days is not None and start_date is None:
             start_date = pd.to_datetime('today') - pd.Timedelta(days=days)
-        if start_date is not None:
-            start_date = pd.to_datetime(start_date)
-            df = df[df['posting_date'] >= start_date]
-        if end_date is not None:
-            end_date = pd.to_datetime(end_date)
-            df = df[df['posting_date'] <= end_date]
-
-        # Apply additional filters from kwargs
-        for key, value in kwargs.items():
-            if key in df.columns:
+
+        # Item filters are slice look-ups; other kwargs only apply to known columns
+        items = kwargs.pop('item_no', None)
+        if items is not None and not isinstance(items, list):
+            items = [items]
+        kwargs = {key: value for key, value in kwargs.items() if key in df.columns}
+
+        if entry_types is None and start_date is None and end_date is None and items is None and not kwargs:
+            return df
+
+        key = self._filter_cache_key(entry_types, start_date, end_date, items, kwargs)
+        if key is not None:
+            cached = self._filter_cache.get(key)
+            if cached is not None:
+                return cached.copy(deep=False)
+
+        positions = index.positions(entry_types, start_date, end_date, items)
+
+        # Apply additional filters from kwargs on the candidate rows only
+        if kwargs:
+            mask = None
+            for column_name, value in kwargs.items():
+                column = df[column_name] if positions is None else df[column_name].iloc[positions]
                 if isinstance(value, list):
-                    df = df[df[key].isin(value)]
+                    key_mask = column.isin(value).to_numpy()
                 else:
-                    df = df[df[key] == value]
-
-        return df
\ No newline at end of file
+                    key_mask = (column == value).to_numpy()
+                mask = key_mask if mask is None else mask & key_mask
+            positions = np.flatnonzero(mask) if positions is None else positions[mask]
+
+        result = df.iloc[positions]
+        if key is not None:
+            self._filter_cache.put(key, result)
+        return result.copy(deep=False)
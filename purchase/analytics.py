@@ -1,18 +1,46 @@
 from __future__ import annotations
 
-from typing import Iterable, Union, Sequence
+from typing import Iterable, Mapping, Union, Sequence
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
+import pyarrow.compute as pc
 
+from . import arrow_backend
 from .repository import PurchaseRepository
+from .spend_cube import CUBE_DIMENSIONS, spend_measures
 
+# Look-back windows (label → days) and grouping grains (label → key columns) for
+# `weighted_avg_cost_table`; columns are named avg_<window>_<grain>.
+COST_WINDOWS: dict[str, int] = {"1y": 365, "2y": 730}
+COST_GROUPINGS: dict[str, tuple[str, ...]] = {
+    "item": ("item_no",),
+    "vendor_item": ("buy_from_vendor_no", "vendor_name", "item_no"),
+}
 
-class PurchaseAnalytics:
-    """Business metrics computed from a PurchaseRepository."""
 
-    def __init__(self, repo: PurchaseRepository):
-        self.df = repo.all()
+class PurchaseAnalytics:
+    """
+    Business metrics computed from a PurchaseRepository.
+
+    `backend="arrow"` runs the line-level filters, grouped sums and weighted averages
+    of `group_value` / `weighted_avg_unit_cost` with pyarrow.compute on a
+    dictionary-encoded Arrow copy of the lines (see `arrow_backend`).  A caller-supplied
+    `frame` is converted on every call, so the win is largest on the repository's own
+    lines (`python purchase/bench_backends.py` compares the two).
+    """
+
+    def __init__(self, repo: PurchaseRepository, backend: str = "pandas"):
+        if backend not in arrow_backend.BACKENDS:
+            raise ValueError(f"backend must be one of {', '.join(arrow_backend.BACKENDS)}")
+        self.repo = repo
+        self.backend = backend
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The repository's current lines (read on every call, so `refresh()` is picked up)."""
+        return self.repo.all()
 
     # ── Internal helpers ─────────────────────────────────────────────────
     @staticmethod
@@ -21,6 +49,15 @@ class PurchaseAnalytics:
         if missing:
             raise KeyError(f"Missing column(s): {', '.join(sorted(missing))}")
 
+    def _arrow_lines(self, start_date=None, end_date=None):
+        """Arrow lines in order_date order, sliced (zero-copy) to the inclusive date range."""
+        index = self.repo.order_date_index()
+        table = self.repo.derived("arrow_by_order_date", lambda _: arrow_backend.to_arrow(index.df))
+        if start_date is None and end_date is None:
+            return table
+        lo, hi = index.bounds(start_date, end_date)
+        return table.slice(lo, hi - lo)
+
     # ── Core value metrics ────────────────────────────────────────────────
     def delivered_value(self, frame: pd.DataFrame | None = None) -> float:
         f = frame if frame is not None else self.df
@@ -56,26 +93,40 @@ class PurchaseAnalytics:
         frame
             Optional pre‑filtered dataframe.
         """
-        f = frame if frame is not None else self.df.copy()
+        if kind not in {"delivered", "open", "total"}:
+            raise ValueError("kind must be 'delivered', 'open', or 'total'")
+
+        # Whole-history roll-ups come straight from the repository's spend cube
+        by_cols = [by] if isinstance(by, str) else list(by)
+        if frame is None and set(by_cols) <= set(CUBE_DIMENSIONS):
+            return self.repo.spend_cube().rollup(by, kind)
+
+        f = frame if frame is not None else self.df
         self._require_cols(
             f,
             ["unit_cost", "quantity_delivered", "outstanding_quantity", "status"],
         )
 
-        f["delivered"] = f["unit_cost"] * f["quantity_delivered"]
-        f["open"] = 0.0
-        mask_open = f["status"] == "OPEN"
-        f.loc[mask_open, "open"] = (
-            f.loc[mask_open, "unit_cost"] * f.loc[mask_open, "outstanding_quantity"]
+        if self.backend == "arrow":
+            inputs = ["unit_cost", "quantity_delivered", "outstanding_quantity", "status"]
+            table = (self._arrow_lines() if frame is None
+                     else arrow_backend.to_arrow(f[list(dict.fromkeys(by_cols + inputs))]))
+            return arrow_backend.group_sum(table, by_cols, {kind: arrow_backend.spend_measure(table, kind)})
+
+        keys = {col: f[col] for col in by_cols}
+        return (
+            spend_measures(f)[[kind]]
+            .assign(**keys)
+            .groupby(by)[kind]
+            .sum()
+            .reset_index()
         )
-        f["total"] = f["delivered"] + f["open"]
-
-        if kind not in {"delivered", "open", "total"}:
-            raise ValueError("kind must be 'delivered', 'open', or 'total'")
-
-        return f.groupby(by)[kind].sum().reset_index()
 
     # ── Weighted-average unit cost metrics ───────────────────────────────
+    @staticmethod
+    def _cost_window_end(end_date: str | None) -> pd.Timestamp:
+        return pd.to_datetime(end_date) if end_date else pd.to_datetime(datetime.utcnow().date())
+
     def weighted_avg_unit_cost(
         self,
         by: Union[str, Sequence[str]] = ("item_no",),
@@ -93,29 +144,91 @@ class PurchaseAnalytics:
         • date window: either `lookback_days` or explicit `start_date` / `end_date`.
         • only considers rows where `type == 'Item'`.
         """
-        f = self.df.query("type == 'Item'").copy()
-
-        # apply date filters
+        # date window → searchsorted slice of the order_date-sorted view
         if lookback_days is not None:
-            end_dt = pd.to_datetime(end_date) if end_date else pd.to_datetime(datetime.utcnow().date())
-            start_dt = end_dt - timedelta(days=lookback_days)
-            f = f[f["order_date"] >= start_dt]
-            f = f[f["order_date"] <= end_dt]
-        else:
-            if start_date:
-                f = f[f["order_date"] >= pd.to_datetime(start_date)]
-            if end_date:
-                f = f[f["order_date"] <= pd.to_datetime(end_date)]
-
+            end_dt = self._cost_window_end(end_date)
+            start_date, end_date = end_dt - timedelta(days=lookback_days), end_dt
+        f = self.repo.order_date_index().slice(start_date or None, end_date or None)
         self._require_cols(f, ["unit_cost", "quantity"])
 
         group_cols = [by] if isinstance(by, str) else list(by)
-        grouped = f.groupby(group_cols, dropna=False)
-        avg = grouped.apply(
-            lambda d: (d["unit_cost"] * d["quantity"]).sum() / d["quantity"].sum()
+        if self.backend == "arrow":
+            table = self._arrow_lines(start_date or None, end_date or None)
+            table = table.filter(pc.field("type") == "Item")
+            sums = arrow_backend.group_sum(
+                table,
+                group_cols,
+                {"value": pc.multiply(table["unit_cost"], table["quantity"]), "quantity": table["quantity"]},
+                dropna=False,
+            )
+            return sums[group_cols].assign(avg_unit_cost=sums["value"] / sums["quantity"])
+
+        f = f.loc[(f["type"] == "Item").to_numpy(), group_cols + ["unit_cost", "quantity"]]
+        sums = (
+            f.assign(value=f["unit_cost"] * f["quantity"])
+             .groupby(group_cols, dropna=False)[["value", "quantity"]]
+             .sum()
         )
+        avg = sums["value"] / sums["quantity"]
         return avg.reset_index(name="avg_unit_cost")
 
+    def weighted_avg_cost_table(
+        self,
+        windows: Mapping[str, int] = COST_WINDOWS,
+        groupings: Mapping[str, Sequence[str]] = COST_GROUPINGS,
+        *,
+        end_date: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Weighted-average unit cost for every (window, grain) pair in one pass.
+
+        Item lines inside the widest window are summed once at the finest grain (the union
+        of all grouping columns), with Σ(unit_cost * quantity) and Σ(quantity) masked per
+        window; coarser grains are rolled up from those sums.
+
+        Returns one row per finest-grain key with columns avg_<window>_<grain>, e.g.
+        avg_1y_item, avg_2y_vendor_item.  NaN = no lines for that group in that window.
+        """
+        f = self.df
+        keys = list(dict.fromkeys(col for cols in groupings.values() for col in cols))
+        self._require_cols(f, keys + ["unit_cost", "quantity", "type", "order_date"])
+
+        end_dt = self._cost_window_end(end_date)
+        widest = max(windows.values())
+        # The widest window is a slice of the order_date-sorted view; every narrower window
+        # is a suffix of that slice, found with one more searchsorted bound
+        index = self.repo.order_date_index()
+        lo, hi = index.bounds(end_dt - timedelta(days=widest), end_dt)
+        scope = index.df.iloc[lo:hi]
+        is_item = (scope["type"] == "Item").to_numpy()
+        offsets = np.flatnonzero(is_item)
+        f = scope.loc[is_item, keys + ["unit_cost", "quantity"]]
+
+        value = f["unit_cost"] * f["quantity"]
+        sums = {}
+        for label, days in windows.items():
+            first = index.bounds(end_dt - timedelta(days=days), end_dt)[0] - lo
+            in_window = offsets >= first
+            sums[f"value_{label}"] = value.where(in_window)
+            sums[f"qty_{label}"] = f["quantity"].where(in_window)
+            sums[f"lines_{label}"] = in_window.astype("int64")
+        fine = (
+            pd.DataFrame(sums, index=f.index)
+              .assign(**{col: f[col] for col in keys})
+              .groupby(keys, dropna=False, sort=False)
+              .sum()
+              .reset_index()
+        )
+
+        table = fine[keys].copy()
+        for grain, cols in groupings.items():
+            cols = list(cols)
+            rolled = fine if cols == keys else fine.groupby(cols, dropna=False)[list(sums)].transform("sum")
+            for label in windows:
+                avg = rolled[f"value_{label}"] / rolled[f"qty_{label}"]
+                table[f"avg_{label}_{grain}"] = avg.where(rolled[f"lines_{label}"] > 0)
+        return table.sort_values(keys).reset_index(drop=True)
+
     def avg_unit_cost_per_item_last_year(self) -> pd.DataFrame:
         """Average unit cost per item over the past 12 months."""
         return self.weighted_avg_unit_cost(
@@ -0,0 +1,97 @@
+# purchase/bench_backends.py
+"""
+Benchmark: pandas vs. pyarrow backends of PurchaseAnalytics.
+
+Times the line-level paths (`group_value` on a pre-filtered frame / non-cube keys and
+`weighted_avg_unit_cost`) on both backends, checks the results agree, and prints a
+table of best-of-N timings and speed-ups.
+
+    python purchase/bench_backends.py                 # synthetic 1M purchase lines
+    python purchase/bench_backends.py --rows 5000000
+    python purchase/bench_backends.py --live          # purchase history in the Parquet dataset
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add project root to path first
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from purchase.analytics import PurchaseAnalytics
+from purchase.parquet_repository import PURCHASE_DATASET_DIR, ParquetPurchaseRepository
+from purchase.repository import PurchaseRepository
+from tests.purchase_data import synthetic_purchases
+from utils.config_utils import set_pandas_display_options
+
+
+def _best_of(func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(purchase_df: pd.DataFrame, repeat: int = 5) -> pd.DataFrame:
+    """
+    Time every case on both backends (derived tables warmed first) and compare results.
+
+    Returns:
+        DataFrame  case | pandas_s | arrow_s | speedup | match
+    """
+    repo = PurchaseRepository(purchase_df)
+    backends = {name: PurchaseAnalytics(repo, backend=name) for name in ("pandas", "arrow")}
+    china = repo.all()[repo.all()["vendor_country"] == "CN"]
+
+    cases = {
+        "group_value vendor×item open (CN lines)":
+            lambda a: a.group_value(["vendor_name", "item_no"], "open", frame=china),
+        "group_value vendor_no total (all lines)":
+            lambda a: a.group_value("buy_from_vendor_no", "total"),
+        "weighted_avg_unit_cost item, 1y":
+            lambda a: a.weighted_avg_unit_cost("item_no", lookback_days=365),
+        "weighted_avg_unit_cost vendor×item, 2y":
+            lambda a: a.weighted_avg_unit_cost(("buy_from_vendor_no", "vendor_name", "item_no"), lookback_days=730),
+    }
+
+    for analytics in backends.values():                 # build the shared derived tables
+        analytics.weighted_avg_unit_cost(lookback_days=1)
+
+    rows = []
+    for case, func in cases.items():
+        pandas_s, expected = _best_of(lambda: func(backends["pandas"]), repeat)
+        arrow_s, got = _best_of(lambda: func(backends["arrow"]), repeat)
+        try:
+            pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-9, check_dtype=False)
+            match = True
+        except AssertionError:
+            match = False
+        rows.append({"case": case, "pandas_s": pandas_s, "arrow_s": arrow_s,
+                     "speedup": pandas_s / arrow_s, "match": match})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic purchase lines")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (best is kept)")
+    parser.add_argument("--live", action="store_true",
+                        help="benchmark the purchase history in the Parquet dataset (see write_purchase_dataset)")
+    parser.add_argument("--dataset", default=str(PURCHASE_DATASET_DIR), help="Parquet dataset root for --live")
+    args = parser.parse_args()
+
+    set_pandas_display_options()
+    if args.live:
+        if not os.path.isdir(args.dataset):
+            sys.exit(f"No purchase dataset at {args.dataset} (write one with write_purchase_dataset).")
+        data = ParquetPurchaseRepository(args.dataset).all()
+    else:
+        data = synthetic_purchases(args.rows)
+
+    print(f"{len(data):,} purchase lines, best of {args.repeat}")
+    print(run(data, args.repeat).to_string(index=False, float_format=lambda x: f"{x:.3f}"))
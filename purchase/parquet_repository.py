@@ -0,0 +1,181 @@
+# purchase/parquet_repository.py
+"""
+Out‑of‑core repository backend – purchase history in a Parquet dataset on disk.
+
+The dataset is hive‑partitioned by subsidiary / year of order_date:
+
+    data/cache/purchase_dataset/subsidiary=US010/year=2024/part-0.parquet
+
+`ParquetPurchaseRepository` keeps the `PurchaseRepository` contract (`all()`, `open()`,
+derived read models) but never holds more than its scope in memory: the column
+projection and the country / type / subsidiary / date predicates are pushed down
+into the `pyarrow.dataset` scan, and date ranges also prune whole year partitions.
+`all()` scans on first use; `open()` scans only OPEN lines until `all()` is loaded.
+"""
+
+from __future__ import annotations
+
+import operator
+from functools import reduce
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .repository import PurchaseRepository
+from utils.config_utils import PROJECT_ROOT
+
+PURCHASE_DATASET_DIR = Path(PROJECT_ROOT) / "data" / "cache" / "purchase_dataset"
+
+# Hive partition keys; `year` is derived from order_date and is not a purchase column
+PARTITIONING = ds.partitioning(
+    pa.schema([("subsidiary", pa.string()), ("year", pa.int32())]), flavor="hive"
+)
+
+
+def write_purchase_dataset(purchase_df: pd.DataFrame, path: str | Path = PURCHASE_DATASET_DIR) -> Path:
+    """
+    Write purchase lines as a subsidiary / year partitioned Parquet dataset.
+
+    Partitions present in `purchase_df` are replaced; other partitions are left alone.
+    """
+    missing = (PurchaseRepository.REQUIRED_COLUMNS | {"subsidiary"}) - set(purchase_df.columns)
+    if missing:
+        raise KeyError(f"Missing required column(s): {', '.join(sorted(missing))}")
+
+    order_date = pd.to_datetime(purchase_df["order_date"])
+    frame = purchase_df.assign(order_date=order_date, year=order_date.dt.year.astype("Int32"))
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    ds.write_dataset(
+        table,
+        str(path),
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+    )
+    return path
+
+
+def _as_list(values) -> list | None:
+    if values is None:
+        return None
+    return [values] if isinstance(values, str) else list(values)
+
+
+class ParquetPurchaseRepository(PurchaseRepository):
+    """
+    PurchaseRepository over a partitioned Parquet dataset.
+
+    Args:
+        path: Dataset root (see `write_purchase_dataset`).
+        columns: Columns to load; the required columns are always added.  Defaults to
+            every purchase column in the dataset.
+        countries / types / subsidiaries: Keep only these vendor_country / type /
+            subsidiary values.
+        start_date / end_date: Inclusive order_date range (also prunes year partitions).
+    """
+
+    def __init__(
+        self,
+        path: str | Path = PURCHASE_DATASET_DIR,
+        *,
+        columns: Sequence[str] | None = None,
+        countries: str | Iterable[str] | None = None,
+        types: str | Iterable[str] | None = None,
+        subsidiaries: str | Iterable[str] | None = None,
+        start_date=None,
+        end_date=None,
+    ):
+        self._derived = {}
+        self._df = None
+        self.dataset = ds.dataset(str(path), format="parquet", partitioning=PARTITIONING)
+
+        available = [name for name in self.dataset.schema.names if name != "year"]
+        missing = self.REQUIRED_COLUMNS - set(available)
+        if missing:
+            raise KeyError(f"Missing required column(s): {', '.join(sorted(missing))}")
+        if columns is None:
+            self.columns = available
+        else:
+            unknown = set(columns) - set(available)
+            if unknown:
+                raise KeyError(f"Unknown column(s): {', '.join(sorted(unknown))}")
+            self.columns = list(columns) + sorted(self.REQUIRED_COLUMNS - set(columns))
+
+        self.filter = self.predicate(
+            countries=countries,
+            types=types,
+            subsidiaries=subsidiaries,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    # ── Scan helpers ─────────────────────────────────────────────────────
+    @staticmethod
+    def predicate(
+        *,
+        countries=None,
+        types=None,
+        subsidiaries=None,
+        statuses=None,
+        start_date=None,
+        end_date=None,
+    ) -> ds.Expression | None:
+        """Dataset filter expression for the given scope (None = no filter)."""
+        parts = []
+        for column, values in (("vendor_country", countries), ("type", types),
+                               ("subsidiary", subsidiaries), ("status", statuses)):
+            values = _as_list(values)
+            if values is not None:
+                parts.append(ds.field(column).isin(values))
+        if start_date is not None:
+            start = pd.Timestamp(start_date)
+            parts += [ds.field("order_date") >= pa.scalar(start.to_pydatetime()),
+                      ds.field("year") >= start.year]
+        if end_date is not None:
+            end = pd.Timestamp(end_date)
+            parts += [ds.field("order_date") <= pa.scalar(end.to_pydatetime()),
+                      ds.field("year") <= end.year]
+        return reduce(operator.and_, parts) if parts else None
+
+    def scan(self, columns: Sequence[str] | None = None, where: ds.Expression | None = None) -> pd.DataFrame:
+        """Read the repository's scope (narrowed by `where`) straight from the dataset."""
+        parts = [e for e in (self.filter, where) if e is not None]
+        expression = reduce(operator.and_, parts) if parts else None
+        table = self.dataset.to_table(columns=list(columns or self.columns), filter=expression)
+        frame = table.to_pandas()
+        frame["order_date"] = pd.to_datetime(frame["order_date"])
+        return frame
+
+    def refresh(self, purchase_df: pd.DataFrame | None = None) -> None:
+        """Re‑scan the dataset on next use (or, given a frame, hold that frame instead)."""
+        if purchase_df is not None:
+            super().refresh(purchase_df)
+            return
+        self._df = None
+        self._derived.clear()
+
+    # ── Public “read” helpers ────────────────────────────────────────────
+    def all(self) -> pd.DataFrame:
+        """Return **all** purchase rows in scope (never mutate this! use .copy())."""
+        if self._df is None:
+            # A scope that matches nothing is an empty frame with the dataset's dtypes
+            self._set_frame(self.scan(), copy=False, allow_empty=True)
+        return self._df
+
+    def open(self) -> pd.DataFrame:
+        """Return only rows with status == 'OPEN'."""
+        if self._df is not None:
+            return super().open()
+        return self.scan(where=self.predicate(statuses="OPEN"))
+
+    def column_names(self) -> list[str]:
+        """Columns of `all()`, from the dataset schema until the rows are loaded."""
+        if self._df is not None:
+            return super().column_names()
+        return list(self.columns)
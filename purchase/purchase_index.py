@@ -0,0 +1,103 @@
+# purchase/purchase_index.py
+"""
+Indexes over the repository frame, built once per repository.
+
+• PurchaseIndex – hash indexes key → ascending row positions (see
+  `PurchaseRepository.purchase_index`), so point look‑ups by item, vendor or
+  (item, vendor) cost O(matches) instead of a full boolean scan.  Positions are
+  ascending, so `frame.iloc[positions]` returns rows in the same order a boolean mask
+  would.
+• OrderDateIndex – a stable order_date‑sorted view of the frame (NaT last), so a date
+  range is two `searchsorted` bounds and a contiguous slice of the view.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+_EMPTY = np.array([], dtype=np.intp)
+
+
+class PurchaseIndex:
+    """item → positions, vendor → positions and (item, vendor) → positions."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self._by_item: Dict[Hashable, np.ndarray] = self._build(frame, ["item_no"])
+        self._by_vendor: Dict[Hashable, np.ndarray] = self._build(frame, ["vendor_name"])
+        self._by_item_vendor: Dict[Hashable, np.ndarray] = self._build(frame, ["item_no", "vendor_name"])
+
+    @staticmethod
+    def _build(frame: pd.DataFrame, keys: list[str]) -> Dict[Hashable, np.ndarray]:
+        """
+        One factorize + stable argsort per key set; each key maps to its slice of the
+        sorted order.  Rows with a missing key are left out – they never match `==`.
+        """
+        codes = np.zeros(len(frame), dtype=np.int64)
+        for key in keys:
+            key_codes, key_uniques = pd.factorize(frame[key])
+            codes = np.where((codes < 0) | (key_codes < 0), -1, codes * len(key_uniques) + key_codes)
+
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else _EMPTY
+        groups = np.split(order, starts[1:])
+
+        first_rows = order[starts]
+        labels = [frame[key].to_numpy(dtype=object)[first_rows] for key in keys]
+        names = labels[0] if len(keys) == 1 else zip(*labels)
+        return dict(zip(names, groups))
+
+    def item_positions(self, item_no) -> np.ndarray:
+        return self._by_item.get(item_no, _EMPTY)
+
+    def vendor_positions(self, vendor_name) -> np.ndarray:
+        return self._by_vendor.get(vendor_name, _EMPTY)
+
+    def item_vendor_positions(self, item_no, vendor_name) -> np.ndarray:
+        return self._by_item_vendor.get((item_no, vendor_name), _EMPTY)
+
+    def positions(self, item_no=None, vendor_name=None) -> np.ndarray | None:
+        """Rows matching the given keys; None when neither key is given."""
+        if item_no is not None and vendor_name is not None:
+            return self.item_vendor_positions(item_no, vendor_name)
+        if item_no is not None:
+            return self.item_positions(item_no)
+        if vendor_name is not None:
+            return self.vendor_positions(vendor_name)
+        return None
+
+
+class OrderDateIndex:
+    """Stable order_date‑sorted view of the frame with its original row positions."""
+
+    def __init__(self, frame: pd.DataFrame):
+        dates = frame["order_date"].to_numpy()
+        self.positions = np.argsort(dates, kind="stable")      # NaT sorts last
+        self.df = frame.iloc[self.positions]
+        self._dates = dates[self.positions]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _to_datetime64(self, value) -> np.datetime64:
+        return np.datetime64(pd.Timestamp(value)).astype(self._dates.dtype)
+
+    def bounds(self, start_date=None, end_date=None) -> tuple[int, int]:
+        """[lo, hi) of the view inside the inclusive date range; any bound drops NaT rows."""
+        lo = 0 if start_date is None else np.searchsorted(self._dates, self._to_datetime64(start_date), "left")
+        if end_date is not None:
+            hi = np.searchsorted(self._dates, self._to_datetime64(end_date), "right")
+        else:
+            hi = np.searchsorted(self._dates, np.datetime64("NaT"), "left")
+        return int(lo), int(max(lo, hi))
+
+    def slice(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """Rows inside the date range as a contiguous slice of the sorted view (no row copy)."""
+        if start_date is None and end_date is None:
+            return self.df
+        lo, hi = self.bounds(start_date, end_date)
+        return self.df.iloc[lo:hi]
@@ -8,37 +8,85 @@ notebooks, dashboards or scheduled jobs without surprises.
 
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Iterable, Sequence
 
+import numpy as np
 import pandas as pd
 
-from .repository import PurchaseRepository
+from .purchase_index import PurchaseIndex
+from .repository import LATEST_GRAINS, PurchaseRepository
 from utils.time_utils import TimeUtils
 
 
 class PurchaseQueries:
     def __init__(self, repo: PurchaseRepository):
-        # One *read‑only* snapshot for all helpers
-        self.df = repo.all()
+        self.repo = repo
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The repository's current lines (read on every call, so `refresh()` is picked up)."""
+        return self.repo.all()
+
+    @property
+    def index(self) -> PurchaseIndex:
+        """Hash indexes on item / vendor, built once per repository."""
+        return self.repo.purchase_index()
+
+    def _rows(self, item_no=None, vendor_name=None) -> pd.DataFrame:
+        """Rows for an item and/or vendor via the hash indexes (all rows if neither)."""
+        positions = self.index.positions(item_no, vendor_name)
+        df = self.df
+        return df if positions is None else df.iloc[positions]
+
+    def _item_rows(self, item_nos: Iterable[str]) -> pd.DataFrame:
+        """Rows of many items at once (frame order), gathered from the item index."""
+        index = self.index
+        pieces = [index.item_positions(item) for item in pd.unique(pd.Series(list(item_nos), dtype=object))]
+        positions = np.sort(np.concatenate(pieces)) if pieces else np.array([], dtype=np.intp)
+        return self.df.iloc[positions]
 
-    # ── Date helpers ────────────────────────────────────────────────────
     @staticmethod
+    def _pairs_frame(pairs) -> pd.DataFrame:
+        """(item_no, vendor_name) pairs from a DataFrame or an iterable of tuples."""
+        if isinstance(pairs, pd.DataFrame):
+            frame = pairs[["item_no", "vendor_name"]]
+        else:
+            frame = pd.DataFrame(list(pairs), columns=["item_no", "vendor_name"])
+        return frame.drop_duplicates()
+
+    # ── Date helpers ────────────────────────────────────────────────────
     def _apply_period(
-        frame: pd.DataFrame,
+        self,
+        frame: pd.DataFrame | None,
         time_period: str | int | None = None,
         start_date: str | None = None,
         end_date: str | None = None,
     ) -> pd.DataFrame:
-        """Filter by explicit dates or by a named period (ytd, 90, etc.)."""
+        """
+        Filter by explicit dates or by a named period (ytd, 90, etc.).
+
+        ``frame=None`` means all of the repository's lines: the window is then a
+        `searchsorted` slice of its order_date-sorted view (rows come back in order_date
+        order).  Index-located subsets are small and are masked directly, keeping their
+        row order.
+        """
         if time_period:
             start_date, end_date = TimeUtils.get_period_dates(time_period)
+        start_date = start_date if start_date else None
+        end_date = end_date if end_date else None
+        if frame is None:
+            if start_date is None and end_date is None:
+                return self.df
+            return self.repo.order_date_index().slice(start_date, end_date)
+        if start_date is None and end_date is None:
+            return frame
 
-        if start_date:
-            frame = frame[frame["order_date"] >= pd.to_datetime(start_date)]
-        if end_date:
-            frame = frame[frame["order_date"] <= pd.to_datetime(end_date)]
-
-        return frame
+        mask = np.ones(len(frame), dtype=bool)
+        if start_date is not None:
+            mask &= (frame["order_date"] >= pd.to_datetime(start_date)).to_numpy()
+        if end_date is not None:
+            mask &= (frame["order_date"] <= pd.to_datetime(end_date)).to_numpy()
+        return frame[mask]
 
     # ── High‑level look‑ups ────────────────────────────────────────────
     def items_last_purchased_from_country(
@@ -52,9 +100,9 @@ class PurchaseQueries:
         """
         One row per item – most recent PO from ``country`` within the window.
         """
-        df = self._apply_period(self.df, time_period, start_date, end_date)
+        df = self._apply_period(None, time_period, start_date, end_date)
         df = df[df["vendor_country"] == country]
-        df = df.sort_values("order_date", ascending=False).drop_duplicates("item_no")
+        df = df.sort_values("order_date", ascending=False, kind="mergesort").drop_duplicates("item_no")
         return df[["item_no", "order_date", "vendor_name"]].reset_index(drop=True)
 
     def identify_items_from_multiple_countries(
@@ -68,7 +116,7 @@ class PurchaseQueries:
         """
         Flag items that have *also* been sourced outside ``country``.
         """
-        df = self._apply_period(self.df, time_period, start_date, end_date)
+        df = self._apply_period(None, time_period, start_date, end_date)
 
         # How many unique countries per item?
         country_counts = (
@@ -97,7 +145,7 @@ class PurchaseQueries:
         All vendors that supplied ``item_no`` in the window, excluding
         any in ``exclude_countries``.
         """
-        df = self.df[self.df["item_no"] == item_no]
+        df = self._rows(item_no=item_no)
         df = self._apply_period(df, None, start_date, end_date)
 
         if exclude_countries:
@@ -112,6 +160,63 @@ class PurchaseQueries:
             .reset_index(drop=True)
         )
 
+    def get_vendors_for_items_excluding_countries(
+        self,
+        item_nos: Iterable[str],
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        exclude_countries: str | Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Batch form of ``get_vendors_for_item_excluding_countries``: one row per
+        (item_no, vendor_name, vendor_country) for every item in ``item_nos``.
+        """
+        df = self._apply_period(self._item_rows(item_nos), None, start_date, end_date)
+
+        if exclude_countries:
+            if isinstance(exclude_countries, str):
+                exclude_countries = [exclude_countries]
+            df = df[~df["vendor_country"].isin(exclude_countries)]
+
+        return (
+            df[["item_no", "vendor_name", "vendor_country"]]
+            .drop_duplicates()
+            .sort_values(["item_no", "vendor_name"])
+            .reset_index(drop=True)
+        )
+
+    def get_most_recent_purchase_data_for_pairs(
+        self,
+        pairs,
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        fields: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Batch form of ``get_most_recent_purchase_data(item_no=…, vendor_name=…)``:
+        the latest line of each (item_no, vendor_name) pair, joined in one merge.
+
+        ``pairs`` is a DataFrame with item_no / vendor_name columns or an iterable of
+        tuples.  Pairs without a purchase in the window are omitted.
+        """
+        wanted = self._pairs_frame(pairs)
+        if start_date is None and end_date is None:
+            latest = self.repo.latest_purchases("both")
+        else:
+            latest = self._apply_period(self._item_rows(wanted["item_no"]), None, start_date, end_date)
+            latest = (latest.sort_values("order_date", ascending=False, kind="mergesort")
+                            .drop_duplicates(LATEST_GRAINS["both"]))
+
+        df = latest.merge(wanted, on=["item_no", "vendor_name"], how="inner")
+        if fields is None:
+            fields = df.columns.tolist()
+
+        core = ["item_no", "vendor_name", "order_date"]
+        extra = [c for c in fields if c not in core]
+        return df[core + extra].reset_index(drop=True)
+
     def get_most_recent_purchase_data(
         self,
         *,
@@ -124,24 +229,32 @@ class PurchaseQueries:
     ) -> pd.DataFrame:
         """
         Latest PO lines for a given item/vendor combo.
-        """
-        df = self._apply_period(self.df, None, start_date, end_date)
-
-        if item_no is not None:
-            df = df[df["item_no"] == item_no]
-        if vendor_name is not None:
-            df = df[df["vendor_name"] == vendor_name]
 
-        df = df.sort_values("order_date", ascending=False)
+        Without a date window the answer is read from the repository's precomputed
+        latest-purchase tables; ties on order_date keep the earlier line in frame order.
+        """
+        if group_by not in LATEST_GRAINS:
+            raise ValueError("group_by must be 'item', 'vendor', or 'both'")
 
-        if group_by == "item":
-            df = df.drop_duplicates("item_no")
-        elif group_by == "vendor":
-            df = df.drop_duplicates("vendor_name")
-        elif group_by == "both":
-            df = df.drop_duplicates(["item_no", "vendor_name"])
+        if start_date is None and end_date is None:
+            # Fixing item or vendor narrows the grain: latest per vendor *of one item*
+            # is the latest per (item, vendor)
+            keys = set(LATEST_GRAINS[group_by])
+            keys |= {key for key, value in (("item_no", item_no), ("vendor_name", vendor_name))
+                     if value is not None}
+            grain = next(g for g, cols in LATEST_GRAINS.items() if set(cols) == keys)
+            df = self.repo.latest_purchases(grain)
+            if item_no is not None:
+                df = df[df["item_no"] == item_no]
+            if vendor_name is not None:
+                df = df[df["vendor_name"] == vendor_name]
         else:
-            raise ValueError("group_by must be 'item', 'vendor', or 'both'")
+            df = None
+            if item_no is not None or vendor_name is not None:
+                df = self._rows(item_no=item_no, vendor_name=vendor_name)
+            df = self._apply_period(df, None, start_date, end_date)
+            df = (df.sort_values("order_date", ascending=False, kind="mergesort")
+                    .drop_duplicates(LATEST_GRAINS[group_by]))
 
         if fields is None:
             fields = df.columns.tolist()
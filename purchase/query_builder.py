@@ -0,0 +1,235 @@
+# purchase/query_builder.py
+"""
+Lazy, composable queries over a PurchaseRepository.
+
+    repo.q().country("CN").type("Item").period("year").group("vendor_name").sum("open")
+
+Each builder call returns a new `PurchaseQuery` that only records the step; nothing
+touches the rows until a terminal call (`sum`, `count`, `frame`).  At that point
+
+• item / vendor filters pick candidate rows from the hash indexes, otherwise a date
+  window is a `searchsorted` slice of the order_date‑sorted view
+• every other predicate is fused into one boolean mask over the candidates only
+• whole‑history spend roll‑ups whose filters and keys are all cube dimensions are
+  answered from the spend cube; anything else (a date window or item / vendor filter
+  already narrows the rows) gathers just the columns it needs from the final rows
+
+so the chain never materializes an intermediate copy of the purchase frame.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .spend_cube import CUBE_DIMENSIONS, CUBE_MEASURES, spend_measures
+from utils.time_utils import TimeUtils
+
+if TYPE_CHECKING:
+    from .repository import PurchaseRepository
+
+# Columns `spend_measures` reads from each line
+_MEASURE_INPUTS = ["unit_cost", "quantity_delivered", "outstanding_quantity", "status"]
+
+
+class PurchaseQuery:
+    """Immutable record of filters and a grouping, executed on a terminal call."""
+
+    def __init__(
+        self,
+        repo: PurchaseRepository,
+        filters: dict | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        by: tuple = (),
+    ):
+        self.repo = repo
+        self._filters: dict[str, list] = filters or {}
+        self._start = start
+        self._end = end
+        self._by = by
+
+    def _with(self, **changes) -> PurchaseQuery:
+        state = dict(filters=self._filters, start=self._start, end=self._end, by=self._by)
+        state.update(changes)
+        return PurchaseQuery(self.repo, **state)
+
+    def __repr__(self) -> str:
+        steps = [f"{col} in {values!r}" for col, values in self._filters.items()]
+        if self._start is not None or self._end is not None:
+            steps.append(f"order_date in [{self._start}, {self._end}]")
+        if self._by:
+            steps.append(f"group by {list(self._by)}")
+        return f"PurchaseQuery({'; '.join(steps) or 'all rows'})"
+
+    # ── Builder steps ────────────────────────────────────────────────────
+    def where(self, column: str, values) -> PurchaseQuery:
+        """Keep rows whose `column` equals `values` (a scalar) or is in it (a list)."""
+        if column not in self.repo.column_names():
+            raise KeyError(f"Missing column(s): {column}")
+        if isinstance(values, (list, tuple, set, frozenset, pd.Index, np.ndarray)):
+            values = list(dict.fromkeys(values))
+        else:
+            values = [values]
+        if column in self._filters:                      # repeated filters intersect
+            values = [v for v in self._filters[column] if v in set(values)]
+        return self._with(filters={**self._filters, column: values})
+
+    def country(self, country) -> PurchaseQuery:
+        return self.where("vendor_country", country)
+
+    def type(self, item_type) -> PurchaseQuery:
+        return self.where("type", item_type)
+
+    def status(self, status) -> PurchaseQuery:
+        return self.where("status", status)
+
+    def vendor(self, vendor_name) -> PurchaseQuery:
+        return self.where("vendor_name", vendor_name)
+
+    def item(self, item_no) -> PurchaseQuery:
+        return self.where("item_no", item_no)
+
+    def period(
+        self,
+        time_period: str | int | None = None,
+        *,
+        start_date=None,
+        end_date=None,
+    ) -> PurchaseQuery:
+        """Inclusive order_date window – a named period (ytd, 90, …) or explicit dates."""
+        if time_period:
+            start_date, end_date = TimeUtils.get_period_dates(time_period)
+        start = pd.to_datetime(start_date) if start_date else None
+        end = pd.to_datetime(end_date) if end_date else None
+        # Repeated windows intersect
+        if self._start is not None:
+            start = self._start if start is None else max(start, self._start)
+        if self._end is not None:
+            end = self._end if end is None else min(end, self._end)
+        return self._with(start=start, end=end)
+
+    def group(self, *by: Union[str, Sequence[str]]) -> PurchaseQuery:
+        cols = []
+        for col in by:
+            cols.extend([col] if isinstance(col, str) else col)
+        return self._with(by=tuple(cols))
+
+    # ── Execution ────────────────────────────────────────────────────────
+    def _has_window(self) -> bool:
+        return self._start is not None or self._end is not None
+
+    def _candidates(self) -> tuple[pd.DataFrame, Union[slice, np.ndarray], np.ndarray | None]:
+        """
+        Rows to test the remaining predicates on, from the cheapest available index:
+        (frame, selector into it, frame positions of the selected rows or None = identity).
+        """
+        df = self.repo.all()
+        keyed = [col for col in ("item_no", "vendor_name") if col in self._filters]
+        if keyed:
+            index = self.repo.purchase_index()
+            lookup = {"item_no": index.item_positions, "vendor_name": index.vendor_positions}
+            positions = None
+            for col in keyed:
+                found = [lookup[col](value) for value in self._filters[col]]
+                found = np.unique(np.concatenate(found)) if found else np.array([], dtype=np.intp)
+                positions = found if positions is None else np.intersect1d(positions, found)
+            return df, positions, positions
+
+        if self._has_window():
+            index = self.repo.order_date_index()
+            lo, hi = index.bounds(self._start, self._end)
+            return index.df, slice(lo, hi), index.positions[lo:hi]
+
+        return df, slice(None), None
+
+    def _positions(self) -> np.ndarray | slice:
+        """Frame positions (ascending) of every row matching the recorded filters."""
+        base, selector, positions = self._candidates()
+        indexed = isinstance(selector, np.ndarray)
+        n = len(selector) if indexed else len(range(*selector.indices(len(base))))
+
+        def column(name: str) -> pd.Series:
+            values = base[name]
+            return values.take(selector) if indexed else values.iloc[selector]
+
+        mask = np.ones(n, dtype=bool)
+        for col, values in self._filters.items():
+            if indexed and col in ("item_no", "vendor_name"):
+                continue                                 # already exact from the index
+            mask &= column(col).isin(values).to_numpy()
+        if indexed and self._has_window():
+            dates = column("order_date")
+            if self._start is not None:
+                mask &= (dates >= self._start).to_numpy()
+            if self._end is not None:
+                mask &= (dates <= self._end).to_numpy()
+
+        if positions is None:
+            return slice(None) if mask.all() else np.flatnonzero(mask)
+        return np.sort(positions[mask])
+
+    def _rows(self, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """Matching rows (only `columns`, if given), taken in one positional look-up."""
+        positions = self._positions()
+        df = self.repo.all()
+        if columns is None:
+            return df.iloc[positions]
+        columns = list(dict.fromkeys(columns))
+        col_positions = df.columns.get_indexer(columns)
+        if (col_positions < 0).any():
+            missing = [col for col, pos in zip(columns, col_positions) if pos < 0]
+            raise KeyError(f"Missing column(s): {', '.join(missing)}")
+        return df.iloc[positions, col_positions]
+
+    def _cube_filters(self) -> dict | None:
+        """The filters as spend‑cube dimension filters, or None if the rows are cheaper."""
+        dims = {"vendor_country", "type"}
+        if self._has_window() or not set(self._filters) <= dims or not set(self._by) <= set(CUBE_DIMENSIONS):
+            return None
+        return dict(self._filters)
+
+    # ── Terminal calls ───────────────────────────────────────────────────
+    def frame(self, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """Matching rows in frame order (never mutate this! use .copy())."""
+        return self._rows(columns)
+
+    def count(self) -> int:
+        positions = self._positions()
+        return len(self.repo.all()) if isinstance(positions, slice) else len(positions)
+
+    def sum(self, measures: Union[str, Sequence[str]] = "total"):
+        """
+        Sum spend measures ('delivered', 'open', 'total', 'delivered_qty', 'open_qty').
+
+        Returns:
+            grouped   DataFrame  <group …> | <measures …>   (rows with a missing key are
+                      dropped, like `PurchaseAnalytics.group_value`)
+            ungrouped float for one measure, Series for several
+        """
+        names = [measures] if isinstance(measures, str) else list(measures)
+        unknown = set(names) - set(CUBE_MEASURES)
+        if unknown:
+            raise KeyError(f"Not a spend measure: {', '.join(sorted(unknown))}")
+        by = list(self._by)
+
+        cube_filters = self._cube_filters()
+        if cube_filters is not None:
+            cube = self.repo.spend_cube()
+            if by:
+                return cube.rollup(by, names, **cube_filters)
+            totals = cube.slice(**cube_filters)[names].sum()
+        else:
+            keys = [col for col in by if col != "order_month"]
+            rows = self._rows(keys + _MEASURE_INPUTS + (["order_date"] if "order_month" in by else []))
+            values = spend_measures(rows)[names]
+            if by:
+                extra = {col: rows[col] for col in keys}
+                if "order_month" in by:
+                    extra["order_month"] = rows["order_date"].dt.to_period("M").dt.to_timestamp()
+                return values.assign(**extra).groupby(by)[names].sum().reset_index()
+            totals = values.sum()
+
+        return float(totals.iloc[0]) if isinstance(measures, str) else totals
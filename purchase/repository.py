@@ -4,12 +4,28 @@ Repository layer – **only** owns and returns raw purchase data.
 
 You can swap the constructor to accept a SQL connection, a CSV path,
 or anything else.  Down‑stream code never touches the storage details.
+
+Derived read models (e.g. the spend cube) are built lazily from the stored frame,
+kept until `refresh` swaps in new data, and shared by every consumer of the repo.
 """
 
 from __future__ import annotations
 
+from typing import Any, Callable, Dict
+
 import pandas as pd
 
+from .purchase_index import OrderDateIndex, PurchaseIndex
+from .query_builder import PurchaseQuery
+from .spend_cube import SpendCube
+
+# Grain of the "latest purchase" tables → de-duplication keys
+LATEST_GRAINS: Dict[str, list] = {
+    "item": ["item_no"],
+    "vendor": ["vendor_name"],
+    "both": ["item_no", "vendor_name"],
+}
+
 
 class PurchaseRepository:
     """Lightweight data‑access wrapper for purchase history."""
@@ -29,7 +45,11 @@ class PurchaseRepository:
     }
 
     def __init__(self, purchase_df: pd.DataFrame):
-        if purchase_df is None or purchase_df.empty:
+        self._derived: Dict[str, Any] = {}
+        self._set_frame(purchase_df)
+
+    def _set_frame(self, purchase_df: pd.DataFrame, copy: bool = True, allow_empty: bool = False) -> None:
+        if purchase_df is None or (purchase_df.empty and not allow_empty):
             raise ValueError("purchase_df cannot be None or empty")
 
         missing = self.REQUIRED_COLUMNS - set(purchase_df.columns)
@@ -38,9 +58,54 @@ class PurchaseRepository:
                 f"Missing required column(s): {', '.join(sorted(missing))}"
             )
 
-        # Store a cleaned copy
-        self._df = purchase_df.copy()
+        # Store a cleaned copy (callers handing over a frame nobody else holds may skip it)
+        self._df = purchase_df.copy() if copy else purchase_df
         self._df["order_date"] = pd.to_datetime(self._df["order_date"])
+        self._derived.clear()
+
+    def refresh(self, purchase_df: pd.DataFrame) -> None:
+        """Replace the stored rows and drop every derived table built from the old ones."""
+        self._set_frame(purchase_df)
+
+    # ── Derived read models ──────────────────────────────────────────────
+    def derived(self, key: str, build: Callable[[pd.DataFrame], Any]) -> Any:
+        """Return the cached `build(self.all())` for `key`, building it on first use."""
+        if key not in self._derived:
+            self._derived[key] = build(self.all())
+        return self._derived[key]
+
+    def spend_cube(self) -> SpendCube:
+        """Delivered / open / total spend by vendor × item × country × type × month."""
+        return self.derived("spend_cube", SpendCube)
+
+    def purchase_index(self) -> PurchaseIndex:
+        """Item / vendor / (item, vendor) → row positions of `all()`."""
+        return self.derived("purchase_index", PurchaseIndex)
+
+    def order_date_index(self) -> OrderDateIndex:
+        """`all()` stably sorted by order_date, for `searchsorted` date slicing."""
+        return self.derived("order_date_index", OrderDateIndex)
+
+    def latest_purchases(self, grain: str = "both") -> pd.DataFrame:
+        """
+        Most recent line per item, vendor or (item, vendor) – all columns, newest first.
+
+        All three grains come from one stable newest-first sort (ties keep frame order).
+        """
+        if grain not in LATEST_GRAINS:
+            raise ValueError("group_by must be 'item', 'vendor', or 'both'")
+        by_date = self.derived(
+            "lines_newest_first",
+            lambda df: df.sort_values("order_date", ascending=False, kind="mergesort"),
+        )
+        return self.derived(
+            f"latest_{grain}",
+            lambda _: by_date.drop_duplicates(LATEST_GRAINS[grain]),
+        )
+
+    def q(self) -> PurchaseQuery:
+        """Start a lazy query, e.g. `repo.q().country("CN").group("vendor_name").sum("open")`."""
+        return PurchaseQuery(self)
 
     # ── Public “read” helpers ────────────────────────────────────────────
     def all(self) -> pd.DataFrame:
@@ -50,3 +115,7 @@ class PurchaseRepository:
     def open(self) -> pd.DataFrame:
         """Return only rows with status == 'OPEN'."""
         return self._df.query("status == 'OPEN'").copy()
+
+    def column_names(self) -> list[str]:
+        """Columns of `all()`, known without loading any rows."""
+        return list(self._df.columns)
@@ -0,0 +1,159 @@
+# purchase/spend_cube.py
+"""
+Materialized spend cube – purchase lines pre‑aggregated once, sliced many times.
+
+Cells are vendor × item × country × type × order month, each holding
+
+    delivered      Σ unit_cost * quantity_delivered
+    open           Σ unit_cost * outstanding_quantity   (status == 'OPEN' only)
+    total          Σ (delivered + open)   (a line missing either value adds nothing)
+    delivered_qty  Σ quantity_delivered
+    open_qty       Σ outstanding_quantity               (status == 'OPEN' only)
+
+`rollup` filters cells on any dimension and re‑groups them to the requested level.
+Date ranges that cut through a month take the whole months from the cube and only
+the lines of the (at most two) partial edge months from the line‑level frame, so the
+result is the same as grouping the filtered lines directly.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ("vendor_name", "item_no", "vendor_country", "type", "order_month")
+CUBE_MEASURES = ("delivered", "open", "total", "delivered_qty", "open_qty")
+
+
+def spend_measures(frame: pd.DataFrame) -> pd.DataFrame:
+    """Per‑line delivered / open / total value and quantities (same index as `frame`)."""
+    is_open = (frame["status"] == "OPEN").to_numpy()
+    delivered = frame["unit_cost"] * frame["quantity_delivered"]
+    open_value = (frame["unit_cost"] * frame["outstanding_quantity"]).where(is_open, 0.0)
+    return pd.DataFrame({
+        "delivered": delivered,
+        "open": open_value,
+        "total": delivered + open_value,
+        "delivered_qty": frame["quantity_delivered"],
+        "open_qty": frame["outstanding_quantity"].where(is_open, 0.0),
+    }, index=frame.index)
+
+
+def _line_cells(frame: pd.DataFrame, months: np.ndarray) -> pd.DataFrame:
+    """Line‑level measures with the cube dimensions attached (positional, any index)."""
+    cells = spend_measures(frame)
+    for dim in CUBE_DIMENSIONS[:-1]:
+        cells[dim] = frame[dim].array
+    cells["order_month"] = months
+    return cells[list(CUBE_DIMENSIONS) + list(CUBE_MEASURES)]
+
+
+class SpendCube:
+    """Spend aggregated by CUBE_DIMENSIONS, with slice / roll‑up look‑ups."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self._lines = frame
+        self._months = frame["order_date"].dt.to_period("M").dt.to_timestamp().to_numpy()
+        self.cells = (
+            _line_cells(frame, self._months)
+                 .groupby(list(CUBE_DIMENSIONS), dropna=False, sort=False, observed=True)
+                 [list(CUBE_MEASURES)]
+                 .sum()
+                 .reset_index()
+        )
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    # ── Slicing ──────────────────────────────────────────────────────────
+    @staticmethod
+    def _dimension_mask(frame: pd.DataFrame, filters: dict) -> np.ndarray:
+        mask = np.ones(len(frame), dtype=bool)
+        for dim, value in filters.items():
+            if dim not in frame.columns:
+                raise KeyError(f"Unknown cube dimension: {dim}")
+            column = frame[dim]
+            if isinstance(value, (list, tuple, set, frozenset, pd.Index, np.ndarray)):
+                mask &= column.isin(list(value)).to_numpy()
+            else:
+                mask &= (column == value).to_numpy()
+        return mask
+
+    def _split_months(self, start: pd.Timestamp | None, end: pd.Timestamp | None):
+        """Full months inside [start, end] as a cell mask, plus the partial edge months."""
+        months = self.cells["order_month"]
+        full = months.notna().to_numpy(copy=True)
+        partial = []
+        if start is not None:
+            first = start.to_period("M").to_timestamp()
+            if start != first:
+                partial.append(first)
+                first += pd.offsets.MonthBegin(1)
+            full &= (months >= first).to_numpy()
+        if end is not None:
+            last = end.to_period("M").to_timestamp()
+            if end < last + pd.offsets.MonthBegin(1) - pd.Timedelta(1, "ns"):
+                partial.append(last)
+                last -= pd.offsets.MonthBegin(1)
+            full &= (months <= last).to_numpy()
+        return full, sorted(set(partial))
+
+    def slice(self, *, start_date=None, end_date=None, **filters) -> pd.DataFrame:
+        """
+        Cells (or partial‑month line aggregates) matching the dimension filters and the
+        inclusive order_date range.  Filter values may be a scalar or a list.
+        """
+        cells = self.cells
+        mask = self._dimension_mask(cells, filters)
+        if start_date is None and end_date is None:
+            return cells[mask]
+
+        start = pd.to_datetime(start_date) if start_date is not None else None
+        end = pd.to_datetime(end_date) if end_date is not None else None
+        full, partial = self._split_months(start, end)
+        parts = [cells[mask & full]]
+
+        if partial:
+            lines = self._lines
+            dates = lines["order_date"]
+            in_edge = np.isin(self._months, np.array(partial, dtype="datetime64[ns]"))
+            if start is not None:
+                in_edge &= (dates >= start).to_numpy()
+            if end is not None:
+                in_edge &= (dates <= end).to_numpy()
+            edge = _line_cells(lines[in_edge], self._months[in_edge])
+            parts.append(edge[self._dimension_mask(edge, filters)])
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+    # ── Roll‑ups ─────────────────────────────────────────────────────────
+    def rollup(
+        self,
+        by: Union[str, Sequence[str]],
+        measures: Union[str, Sequence[str]] = "total",
+        *,
+        start_date=None,
+        end_date=None,
+        **filters,
+    ) -> pd.DataFrame:
+        """
+        Sum `measures` by `by` over the cells matching `filters` and the date range.
+
+        Example:
+            cube.rollup("vendor_name", "open", vendor_country="CN")
+            cube.rollup(["vendor_name", "item_no"], "delivered", type="Item",
+                        start_date="2024-01-15", end_date="2025-01-15")
+
+        Returns:
+            DataFrame  <by …> | <measures …>   (rows with a missing key are dropped,
+                       like a plain groupby)
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        measures = [measures] if isinstance(measures, str) else list(measures)
+        unknown = set(by) - set(CUBE_DIMENSIONS) | set(measures) - set(CUBE_MEASURES)
+        if unknown:
+            raise KeyError(f"Not in the spend cube: {', '.join(sorted(unknown))}")
+
+        cells = self.slice(start_date=start_date, end_date=end_date, **filters)
+        return cells.groupby(by)[measures].sum().reset_index()
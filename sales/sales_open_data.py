@@ -18,7 +18,7 @@ from utils.config_utils import (
 logger = configure_logging()
 
 # Get the SQL query from the sales_open.sql file
-sales_open_query = read_sql_file('sales_open.sql')
+sales_open_query = read_sql_file('sales/sales_open.sql')
 
 def get_all_sales_open_data():
     """Returns a DataFrame containing all open sales data."""
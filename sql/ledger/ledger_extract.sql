@@ -0,0 +1,29 @@
+/*───────────────────────────────────────────────────────────────
+  Single-scan item ledger extract (US010, quantity-moving rows)
+  – superset of the columns needed by ledger_all.sql,
+    material_usage.sql and inventory/inventory.sql
+  – everything else is derived in Python (ledger/ledger_extract.py)
+  ─────────────────────────────────────────────────────────────*/
+SELECT
+    l.[Subsidiary]                          AS subsidiary,
+    l.[Entry No_]                           AS entry_no,
+    l.[Item No_]                            AS item_no,
+    CAST(l.[Posting Date] AS DATE)          AS posting_date,
+    l.[Entry Type]                          AS entry_type,
+    l.[Document No_]                        AS document_no,
+    l.[Location Code]                       AS location_code,
+    l.[Quantity]                            AS quantity,
+    l.[Global Dimension 1 Code]             AS department,
+    l.[Order No_]                           AS order_no,
+    l.[Gen_ Prod_ Posting Group]            AS gen_prod_posting_group,
+    l.[SUM_Cost_Amount_Actual_USD]          AS cost_actual_usd,
+    l.[SUM_Cost_Amount_Expected_USD]        AS cost_expected_usd,
+    l.[SUM_Root_Cost_Actual_USD]            AS root_cost_actual_usd,
+    l.[SUM_Root_Cost_Expected_USD]          AS root_cost_expected_usd,
+    l.[SUM_Cost_Amount_Actual]              AS cost_actual_lc,
+    l.[SUM_Cost_Amount_Expected]            AS cost_expected_lc
+FROM dbo.item_ledger_entry_all_v AS l WITH (NOLOCK)
+WHERE
+    l.[Subsidiary] = 'US010'
+    AND l.[Quantity] <> 0
+OPTION (RECOMPILE);
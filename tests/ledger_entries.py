@@ -0,0 +1,37 @@
+"""Synthetic item ledger entries shared by the ledger tests."""
+
+import numpy as np
+import pandas as pd
+
+from ledger.ledger_repository import EntryType
+
+# Sign of the quantity each entry type is usually posted with (TRANSFER legs take both)
+_SIGNS = {EntryType.PURCHASE: 1, EntryType.SALE: -1, EntryType.POSITIVE_ADJUSTMENT: 1,
+          EntryType.NEGATIVE_ADJUSTMENT: -1, EntryType.TRANSFER: 0, EntryType.CONSUMPTION: -1,
+          EntryType.OUTPUT: 1}
+
+
+def synthetic_ledger(rows: int, seed: int = 0, n_items: int = 20) -> pd.DataFrame:
+    """
+    Random ledger entries over a few items and locations: mostly receipts and issues of
+    the usual sign, some returns posted with the opposite sign, and a few zero / missing
+    quantities.
+    """
+    rng = np.random.default_rng(seed)
+    entry_type = rng.choice(np.array(list(EntryType)), rows, p=[.25, .25, .05, .05, .1, .2, .1]).astype(int)
+    sign = np.array([_SIGNS[EntryType(t)] for t in entry_type])
+    sign = np.where(sign == 0, rng.choice([-1, 1], rows), sign)
+    sign = np.where(rng.random(rows) < .05, -sign, sign)                  # returns
+    quantity = sign * rng.integers(1, 50, rows).astype(float)
+    quantity[rng.random(rows) < .02] = 0.0
+    quantity[rng.random(rows) < .02] = np.nan
+    return pd.DataFrame({
+        "entry_no": rng.permutation(rows) + 1,
+        "item_no": np.char.add("ITEM-", rng.integers(0, n_items, rows).astype(str)),
+        "location_code": rng.choice(np.array(["MAIN", "EAST", "WEST"], dtype=object), rows),
+        "posting_date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), "D"),
+        "entry_type": entry_type,
+        "document_no": np.char.add("DOC", (np.arange(rows) // 3).astype(str)),
+        "quantity": quantity,
+        "cost_amount": np.round(quantity * rng.gamma(2.0, 5.0, rows), 2),
+    })
@@ -0,0 +1,32 @@
+"""Synthetic purchase lines shared by the purchase tests and purchase/bench_backends.py."""
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_purchases(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Random purchase lines with realistic key cardinalities: items ≫ vendors ≫ countries,
+    and each item bought from one of at most three vendors.
+    """
+    rng = np.random.default_rng(seed)
+    n_vendors, n_items = max(rows // 2_000, 10), max(rows // 50, 100)
+    vendors = np.array([f"VENDOR {i:05d}" for i in range(n_vendors)], dtype=object)
+    countries = np.array(["CN", "US", "HK", "MX", "DE", "TW"], dtype=object)[rng.integers(0, 6, n_vendors)]
+    item = rng.integers(0, n_items, rows)
+    vendor = (item * 7 + rng.integers(0, 3, rows)) % n_vendors
+    return pd.DataFrame({
+        "document_no": np.char.add("PO", (np.arange(rows) // 4).astype(str)),
+        "line_no": (np.arange(rows) % 4 + 1) * 10_000,
+        "status": rng.choice(np.array(["OPEN", "CLOSED", "RELEASED"], dtype=object), rows, p=[.2, .6, .2]),
+        "order_date": pd.Timestamp.today().normalize() - pd.to_timedelta(rng.integers(0, 5 * 365, rows), "D"),
+        "unit_cost": np.round(rng.gamma(2.0, 10.0, rows), 2),
+        "quantity": rng.integers(1, 500, rows).astype(float),
+        "quantity_delivered": rng.integers(0, 500, rows).astype(float),
+        "outstanding_quantity": rng.integers(0, 100, rows).astype(float),
+        "item_no": np.char.add("ITEM-", item.astype(str)),
+        "vendor_name": vendors[vendor],
+        "buy_from_vendor_no": np.char.add("V", vendor.astype(str)),
+        "vendor_country": countries[vendor],
+        "type": rng.choice(np.array(["Item", "G/L Account", "Fixed Asset"], dtype=object), rows, p=[.85, .1, .05]),
+    })
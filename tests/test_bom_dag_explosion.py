@@ -0,0 +1,87 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from bom import bom_dag_explosion as dag
+
+BOM = pd.DataFrame([
+    ("FG1", "SA", 2.0), ("FG1", "P1", 1.0),
+    ("FG2", "SA", 1.0), ("FG2", "P2", 3.0),
+    ("SA", "P1", 4.0), ("SA", "P3", 0.5),
+], columns=["production_bom_no", "component_no", "total"])
+
+ITEMS = pd.DataFrame({"item_no": ["FG1", "FG2", "FG3", "SA", "P1"],
+                      "purchase_output": ["Output", "Output", "Output", "Output", "Purchase"]})
+
+
+@pytest.fixture(autouse=True)
+def fresh_graph_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(dag, "BOM_GRAPH_DIR", tmp_path / "bom_graph")
+    dag._graph_cache.clear()
+    yield
+    dag._graph_cache.clear()
+
+
+def test_explosions_share_the_cached_graph_and_matrix():
+    dag.explode_output_totals(BOM, ITEMS)
+    g = dag.get_bom_graph()
+    matrix = dag.bom_matrix(g)
+
+    dag.explode_output_boms(BOM, ITEMS)
+    dag.explode_output_totals(BOM, ITEMS)
+    assert dag.get_bom_graph(BOM) is g
+    assert dag.bom_matrix(g) is matrix
+
+    assert dag.get_bom_graph(BOM.copy()) is not g                  # a different frame rebuilds
+
+
+def test_totals_and_streamed_rows_match_the_explosion(tmp_path):
+    exploded = dag.explode_output_boms(BOM, ITEMS)
+    summed = (exploded.groupby(["parent_item", "component_item"], as_index=False)["total_qty"].sum()
+                      .sort_values(["parent_item", "component_item"]).reset_index(drop=True))
+    pd.testing.assert_frame_equal(dag.explode_output_totals(BOM, ITEMS), summed)
+
+    out_path = tmp_path / "exploded.parquet"
+    assert dag.write_output_boms(BOM, ITEMS, str(out_path), max_workers=1) == len(exploded)
+    pd.testing.assert_frame_equal(pq.read_table(out_path).to_pandas(), exploded, check_dtype=False)
+
+
+def test_fresh_persisted_matrix_is_used_without_rebuilding(tmp_path, monkeypatch):
+    built = dag.get_bom_matrix(BOM, path=tmp_path)
+    expected = built.exploded_totals(["FG1", "FG2"])
+
+    dag._graph_cache.clear()                                       # a new process
+    monkeypatch.setattr(dag, "get_all_bom_data", lambda: pytest.fail("BOM lines re-read"))
+    monkeypatch.setattr(dag, "build_bom_graph", lambda *a, **k: pytest.fail("graph rebuilt"))
+    loaded = dag.get_bom_matrix(path=tmp_path)
+    assert loaded is not built
+    pd.testing.assert_frame_equal(loaded.exploded_totals(["FG1", "FG2"]), expected)
+    assert dag.get_bom_matrix(path=tmp_path) is loaded
+
+
+def test_stale_persisted_matrix_is_synced_from_the_bom_lines(tmp_path, monkeypatch):
+    dag.get_bom_matrix(BOM, path=tmp_path)
+    changed = BOM.assign(total=BOM["total"].where(BOM["component_no"] != "P3", 2.0))
+
+    dag._graph_cache.clear()
+    monkeypatch.setattr(dag, "get_all_bom_data", lambda: changed)
+    matrix = dag.get_bom_matrix(path=tmp_path, max_age=0)
+    totals = matrix.exploded_totals(["FG1"]).set_index("component_item")["total_qty"]
+    assert totals["P3"] == pytest.approx(2.0 * 2.0)
+
+    dag._graph_cache.clear()
+    monkeypatch.setattr(dag, "get_all_bom_data", lambda: pytest.fail("BOM lines re-read"))
+    reloaded = dag.get_bom_matrix(path=tmp_path)
+    pd.testing.assert_frame_equal(reloaded.exploded_totals(["FG1"]), matrix.exploded_totals(["FG1"]))
+
+
+def test_sync_notices_a_leaf_that_becomes_an_assembly():
+    g = dag.build_bom_graph(BOM)
+    cache = dag.explosion_cache(g)
+    assert {row["component_item"] for row in dag.explode_parent(g, "FG1")} == {"P1", "P3"}
+
+    g.add_edge("P3", "X", qty_per=2.0)
+    assert cache.sync() == 2                                       # SA and FG1
+    rows = dag.explode_parent(g, "FG1")
+    assert {row["component_item"] for row in rows} == {"P1", "X"}
+    assert sum(row["total_qty"] for row in rows if row["component_item"] == "X") == 2.0 * 0.5 * 2.0
@@ -0,0 +1,112 @@
+from collections import defaultdict
+
+import pandas as pd
+import pytest
+
+from bom.bom_explosion import BomExplosion
+from bom.explosion_cache import ExplosionCache
+
+COLUMNS = ['order', 'production_index', 'level', 'parent_index', 'child_index', 'qty_per', 'total_quantity']
+
+
+def reference_hierarchy(top_level_indices, bom_data):
+    """Baseline explosion: one stack walk per top-level item, copying the path set per entry."""
+    bom_dict = defaultdict(list)
+    for parent, child, qty in zip(bom_data['parent_index'], bom_data['child_index'],
+                                  pd.to_numeric(bom_data['total'], errors='coerce').fillna(0.0)):
+        bom_dict[parent].append((child, qty))
+
+    rows = []
+    for top in top_level_indices:
+        stack = [(child, top, 0, qty, qty, {top})
+                 for child, qty in reversed(bom_dict.get(top, [])) if qty > 0]
+        while stack:
+            current, parent, level, qty_per, total_qty, path = stack.pop()
+            if current in path:
+                continue
+            rows.append((top, level, parent, current, qty_per, total_qty))
+            stack.extend((child, current, level + 1, child_qty, child_qty * total_qty, path | {current})
+                         for child, child_qty in reversed(bom_dict.get(current, [])) if child_qty > 0)
+    df = pd.DataFrame(rows, columns=COLUMNS[1:])
+    df.insert(0, 'order', range(1, len(df) + 1))
+    return df
+
+
+def _bom(lines):
+    return pd.DataFrame(lines, columns=['parent_index', 'child_index', 'total'])
+
+
+def assert_matches_reference(top_level_indices, bom_data, explosion=None):
+    explosion = explosion or BomExplosion(top_level_indices, bom_data)
+    got = explosion.create_bom_hierarchy()
+    expected = reference_hierarchy(top_level_indices, bom_data)
+    assert list(got.columns) == COLUMNS
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+# 1 and 2 share sub-assembly 10, which shares 20 with 2 directly
+SHARED = _bom([
+    (1, 10, 2), (1, 11, 1),
+    (2, 10, 3), (2, 20, 0.5),
+    (10, 20, 4), (10, 12, 1),
+    (20, 13, 2), (20, 14, 0.25),
+])
+
+
+def test_shared_sub_assemblies():
+    assert_matches_reference([1, 2, 10, 99], SHARED)
+
+
+def test_repeated_calls_reuse_the_cache():
+    explosion = BomExplosion([1, 2], SHARED)
+    first = explosion.create_bom_hierarchy()
+    pd.testing.assert_frame_equal(explosion.create_bom_hierarchy(), first)
+
+
+def test_bounded_cache_evicts_and_rebuilds():
+    explosion = BomExplosion([1, 2, 10], SHARED)
+    explosion.explosion_cache.max_rows = 3
+    assert_matches_reference([1, 2, 10], SHARED, explosion)
+    assert explosion.explosion_cache.rows <= 3
+    assert_matches_reference([1, 2, 10], SHARED, explosion)
+
+
+@pytest.mark.parametrize("lines", [
+    [(1, 2, 1), (2, 3, 2), (3, 2, 1), (3, 4, 5)],                  # 2 ↔ 3
+    [(1, 2, 1), (2, 2, 3), (2, 4, 1)],                             # self loop
+    [(1, 2, 1), (2, 3, 1), (3, 1, 2), (3, 5, 1), (6, 3, 1)],       # back to the top, entered twice
+])
+def test_cycles_are_skipped_like_the_baseline(lines):
+    assert_matches_reference([1, 2, 3, 6], _bom(lines))
+
+
+def test_zero_negative_and_invalid_quantities_are_skipped():
+    bom = _bom([(1, 2, 0), (1, 3, -1), (1, 4, 'n/a'), (1, 5, 2), (5, 2, None), (5, 6, 1.5)])
+    assert_matches_reference([1, 5], bom)
+
+
+def test_set_bom_lines_invalidates_embedding_parents():
+    explosion = BomExplosion([1, 2], SHARED)
+    explosion.create_bom_hierarchy()
+    explosion.set_bom_lines(20, [(13, 3), (15, 1), (16, 0)])
+
+    changed = pd.concat([SHARED[SHARED['parent_index'] != 20],
+                         _bom([(20, 13, 3), (20, 15, 1), (20, 16, 0)])], ignore_index=True)
+    assert_matches_reference([1, 2], changed, explosion)
+
+
+def test_missing_columns_raise():
+    with pytest.raises(ValueError, match="must contain columns"):
+        BomExplosion([1], SHARED.drop(columns='total'))
+
+
+def test_sync_invalidates_ancestors_of_a_leaf_that_gains_lines():
+    lines = {"A": [("L", 2.0)], "L": []}
+    cache = ExplosionCache(lambda node: lines.get(node, []))
+    assert cache.decode(cache.table("A").component).tolist() == ["L"]
+
+    lines["L"] = [("X", 3.0)]
+    assert cache.sync() == 1
+    table = cache.table("A")
+    assert cache.decode(table.component).tolist() == ["L", "X"]
+    assert table.rel_qty.tolist() == [2.0, 6.0]
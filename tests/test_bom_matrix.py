@@ -0,0 +1,124 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bom.bom_matrix import BomMatrix
+
+
+def _edges(lines):
+    return pd.DataFrame(lines, columns=["parent", "child", "qty_per"])
+
+
+def reference_totals(edges, parents):
+    """Recursive per-path explosion, summed per (parent, leaf component)."""
+    children = defaultdict(list)
+    for parent, child, qty in edges.itertuples(index=False):
+        children[parent].append((child, qty))
+
+    def walk(node, qty, out):
+        for child, child_qty in children[node]:
+            if children[child]:
+                walk(child, qty * child_qty, out)
+            else:
+                out[child] += qty * child_qty
+
+    rows = []
+    for parent in parents:
+        out = defaultdict(float)
+        walk(parent, 1.0, out)
+        if not children[parent]:
+            out[parent] = 1.0
+        rows.extend((parent, component, total) for component, total in out.items())
+    return (pd.DataFrame(rows, columns=["parent_item", "component_item", "total_qty"])
+            .sort_values(["parent_item", "component_item"])
+            .reset_index(drop=True))
+
+
+def reference_path_counts(edges, node):
+    children = edges.loc[edges["parent"] == node, "child"]
+    return 1 if children.empty else sum(reference_path_counts(edges, child) for child in children)
+
+
+# A and B share sub-assembly S; A also uses L1 directly; S is two levels deep
+SHARED = _edges([
+    ("A", "S", 2.0), ("A", "L1", 1.0),
+    ("B", "S", 3.0), ("B", "L3", 0.25),
+    ("S", "T", 4.0), ("S", "L2", 0.5),
+    ("T", "L1", 1.5), ("T", "L2", 2.0),
+])
+
+
+def test_exploded_totals_match_recursive_explosion():
+    matrix = BomMatrix.from_edges(SHARED)
+    got = matrix.exploded_totals(["A", "B", "S", "L1"])
+    expected = reference_totals(SHARED, ["A", "B", "S", "L1"])
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_duplicate_lines_are_summed():
+    doubled = pd.concat([SHARED, _edges([("A", "L1", 1.0)])], ignore_index=True)
+    got = BomMatrix.from_edges(doubled).exploded_totals(["A"])
+    a_l1 = got.loc[got["component_item"] == "L1", "total_qty"].item()
+    assert a_l1 == pytest.approx(2.0 + 2 * 4 * 1.5)
+
+
+def test_levels_and_leaf_path_counts():
+    matrix = BomMatrix.from_edges(SHARED)
+    llc = dict(zip(matrix.items, matrix.llc))
+    height = dict(zip(matrix.items, matrix.height))
+    assert (llc["A"], llc["S"], llc["T"], llc["L1"]) == (0, 1, 2, 3)
+    assert (height["A"], height["S"], height["T"], height["L2"]) == (3, 2, 1, 0)
+
+    counts = dict(zip(matrix.items, matrix.leaf_path_counts()))
+    for item in matrix.items:
+        assert counts[item] == reference_path_counts(SHARED, item)
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cyclic"):
+        BomMatrix.from_edges(_edges([("A", "B", 1.0), ("B", "C", 1.0), ("C", "B", 1.0)]))
+
+
+def test_apply_diff_matches_rebuild():
+    matrix = BomMatrix.from_edges(SHARED)
+    matrix.total_quantities()                               # derived cache must be dropped
+    diff = _edges([
+        ("S", "L2", 0.0),                                   # zero qty deletes the line
+        ("B", "L3", -1.0),                                  # negative qty deletes the line
+        ("T", "L1", 3.0),                                   # changed qty
+        ("B", "N", 5.0), ("N", "L4", 2.0),                  # new items
+    ])
+    matrix.apply_diff(diff)
+
+    lines = (pd.concat([SHARED, diff]).drop_duplicates(["parent", "child"], keep="last"))
+    lines = lines[lines["qty_per"] > 0].reset_index(drop=True)
+    rebuilt = BomMatrix.from_edges(lines)
+
+    parents = ["A", "B", "S", "T", "N"]
+    pd.testing.assert_frame_equal(matrix.exploded_totals(parents), rebuilt.exploded_totals(parents))
+    pd.testing.assert_frame_equal(matrix.exploded_totals(parents),
+                                  reference_totals(lines, parents), check_dtype=False)
+    for item in rebuilt.items:
+        assert matrix.llc[matrix.index[item]] == rebuilt.llc[rebuilt.index[item]]
+        assert matrix.height[matrix.index[item]] == rebuilt.height[rebuilt.index[item]]
+
+
+def test_apply_diff_closing_a_cycle_leaves_matrix_unchanged():
+    matrix = BomMatrix.from_edges(SHARED)
+    before = matrix.exploded_totals(["A", "B"])
+    with pytest.raises(ValueError, match="cycle"):
+        matrix.apply_diff(_edges([("L1", "A", 1.0)]))
+    pd.testing.assert_frame_equal(matrix.exploded_totals(["A", "B"]), before)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    matrix = BomMatrix.from_edges(SHARED)
+    matrix.save(str(tmp_path))
+    assert BomMatrix.exists(str(tmp_path))
+
+    loaded = BomMatrix.load(str(tmp_path))
+    np.testing.assert_array_equal(loaded.llc, matrix.llc)
+    np.testing.assert_array_equal(loaded.height, matrix.height)
+    pd.testing.assert_frame_equal(loaded.exploded_totals(["A", "B"]), matrix.exploded_totals(["A", "B"]))
@@ -0,0 +1,64 @@
+import pandas as pd
+
+from analysis.chinese_vendor_spend import get_alternative_vendor_options
+from purchase.queries import PurchaseQueries
+from purchase.repository import PurchaseRepository
+from tests.purchase_data import synthetic_purchases
+
+LINES = synthetic_purchases(5_000, seed=3)
+
+
+def reference_options(item_result, queries):
+    """Baseline: one vendor query per item and one latest-price query per alternative vendor."""
+    rows = []
+    for _, row in item_result[item_result['alternative_vendor'] == 'Yes'].iterrows():
+        alt_vendors = queries.get_vendors_for_item_excluding_countries(row['item_no'], exclude_countries='CN')
+        for _, alt in alt_vendors.iterrows():
+            recent = queries.get_most_recent_purchase_data(
+                item_no=row['item_no'], vendor_name=alt['vendor_name'],
+                fields=['item_no', 'vendor_name', 'order_date', 'unit_cost'], group_by='both')
+            if recent.empty:
+                continue
+            price = recent['unit_cost'].iloc[0]
+            rows.append({
+                'item': row['item_no'], 'description': row['description'],
+                'current_vendor': row['vendor_name'], 'current_vendor_country': 'CN',
+                'open_spend': row['all_open_spend'],
+                'delivered_spend_past_year': row['delivered_spend_past_year'],
+                'last_order_date': row['last_purchase_date'],
+                'most_recent_unit_price': row['last_unit_price'],
+                'alternative_vendor': alt['vendor_name'], 'alternative_vendor_country': alt['vendor_country'],
+                'alternative_last_order_date': recent['order_date'].iloc[0], 'alternative_unit_price': price,
+                'percent_difference': (price - row['last_unit_price']) / row['last_unit_price']
+                                      if row['last_unit_price'] != 0 else None,
+                'assigned_user_id': row['assigned_user_id'], 'cost_center': row['cost_center'],
+            })
+    return pd.DataFrame(rows)
+
+
+def _item_result():
+    china = LINES[LINES['vendor_country'] == 'CN'].drop_duplicates(['vendor_name', 'item_no']).head(60)
+    multi = LINES.groupby('item_no')['vendor_country'].nunique() > 1
+    return pd.DataFrame({
+        'vendor_name': china['vendor_name'].to_numpy(),
+        'item_no': china['item_no'].to_numpy(),
+        'alternative_vendor': china['item_no'].map(multi).map({True: 'Yes', False: 'No'}).to_numpy(),
+        'description': 'part',
+        'all_open_spend': 100.0,
+        'delivered_spend_past_year': 50.0,
+        'last_purchase_date': china['order_date'].to_numpy(),
+        'last_unit_price': china['unit_cost'].to_numpy(),
+        'assigned_user_id': 'BUYER',
+        'cost_center': 'CC1',
+    })
+
+
+def test_batch_options_match_per_item_queries():
+    queries = PurchaseQueries(PurchaseRepository(LINES))
+    item_result = _item_result()
+    assert (item_result['alternative_vendor'] == 'Yes').any()
+
+    keys = ['item', 'current_vendor', 'alternative_vendor']
+    got = get_alternative_vendor_options(item_result, queries).sort_values(keys).reset_index(drop=True)
+    expected = reference_options(item_result, queries).sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
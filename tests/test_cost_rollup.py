@@ -0,0 +1,121 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bom.bom_dag_explosion import bom_edges, bom_matrix, build_bom_graph
+from bom.bom_matrix import BomMatrix
+from bom.cost_rollup import CostRollup
+
+
+def reference_rollup(edges, leaf_costs):
+    """Recursive rollup: a leaf costs its own price (missing = 0), an assembly Σ qty × child."""
+    children = defaultdict(list)
+    for parent, child, qty in edges.itertuples(index=False):
+        children[parent].append((child, qty))
+
+    def cost(node):
+        if not children[node]:
+            price = leaf_costs.get(node, np.nan)
+            return (0.0 if pd.isna(price) else price), pd.isna(price)
+        total, missing = 0.0, False
+        for child, qty in children[node]:
+            child_cost, child_missing = cost(child)
+            total += qty * child_cost
+            missing |= child_missing
+        return total, missing
+
+    nodes = set(edges["parent"]) | set(edges["child"])
+    return {node: cost(node) for node in nodes}
+
+
+def _edges(lines):
+    return pd.DataFrame(lines, columns=["parent", "child", "qty_per"])
+
+
+def _bom_df(lines):
+    return pd.DataFrame(lines, columns=["production_bom_no", "component_no", "total"])
+
+
+def _costs(prices):
+    return pd.DataFrame({"standard": pd.Series(prices, dtype=float)})
+
+
+def assert_matches_reference(rollup, edges, prices):
+    expected = reference_rollup(edges, prices)
+    frame = rollup.rollup().set_index("item_no")
+    for item, (cost, missing) in expected.items():
+        assert frame.at[item, "rolled_standard"] == pytest.approx(cost), item
+        assert frame.at[item, "missing_standard"] == missing, item
+
+
+# FG1 and FG2 share sub-assembly SA, which nests SB; FG2 also uses SB directly
+SHARED = _edges([
+    ("FG1", "SA", 2.0), ("FG1", "P1", 1.0),
+    ("FG2", "SA", 1.0), ("FG2", "SB", 3.0),
+    ("SA", "SB", 4.0), ("SA", "P2", 0.5),
+    ("SB", "P1", 1.5), ("SB", "P3", 2.0),
+])
+PRICES = {"P1": 1.25, "P2": 8.0, "P3": 0.1, "SA": 999.0}     # assembly prices are ignored
+
+
+def test_rolled_costs_match_recursive_rollup():
+    assert_matches_reference(CostRollup(BomMatrix.from_edges(SHARED), _costs(PRICES)), SHARED, PRICES)
+
+
+def test_missing_leaf_costs_are_flagged_up_the_tree():
+    prices = {"P1": 1.25, "P2": 8.0}                          # P3 has no cost
+    rollup = CostRollup(BomMatrix.from_edges(SHARED), _costs(prices))
+    assert_matches_reference(rollup, SHARED, prices)
+    assert rollup.rollup(["FG1"])["missing_standard"].item()
+
+
+def test_zero_and_negative_lines_are_dropped(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    lines = SHARED.itertuples(index=False, name=None)
+    bom_df = _bom_df(list(lines) + [("FG1", "P2", 0.0), ("SA", "P3", -2.0)])
+
+    matrix = bom_matrix(build_bom_graph(bom_df))
+    assert_matches_reference(CostRollup(matrix, _costs(PRICES)), SHARED, PRICES)
+    assert len(bom_edges(bom_df)) == len(SHARED)
+
+
+def test_cycles_are_broken_at_the_smallest_line(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    lines = list(SHARED.itertuples(index=False, name=None)) + [("SB", "SA", 0.01)]
+    g = build_bom_graph(_bom_df(lines))
+    assert g.graph["removed_edges"] == [("SB", "SA")]
+
+    rollup = CostRollup(bom_matrix(g), _costs(PRICES))
+    assert_matches_reference(rollup, SHARED, PRICES)
+
+
+def test_reprice_matches_a_fresh_rollup():
+    matrix = BomMatrix.from_edges(SHARED)
+    rollup = CostRollup(matrix, _costs(PRICES))
+    new_prices = {**PRICES, "P3": 0.4, "P2": np.nan}
+
+    what_if = rollup.reprice({"P3": 0.4, "P2": np.nan}, commit=False)
+    assert_matches_reference(rollup, SHARED, PRICES)           # not committed
+
+    old, new = reference_rollup(SHARED, PRICES), reference_rollup(SHARED, new_prices)
+    assert what_if["item_no"].tolist() == ["FG1", "FG2"]
+    for row in what_if.itertuples():
+        assert row.old_cost == pytest.approx(old[row.item_no][0])
+        assert row.new_cost == pytest.approx(new[row.item_no][0])
+
+    rollup.reprice({"P3": 0.4, "P2": np.nan})
+    fresh = CostRollup(matrix, _costs(new_prices))
+    pd.testing.assert_frame_equal(rollup.rollup(), fresh.rollup())
+
+
+def test_by_level_sums_to_rolled_cost():
+    rollup = CostRollup(BomMatrix.from_edges(SHARED), _costs(PRICES))
+    levels = rollup.by_level("standard").set_index("item_no")
+    frame = rollup.rollup().set_index("item_no")
+    assemblies = frame.index[~frame["is_leaf"]]
+    pd.testing.assert_series_equal(levels.loc[assemblies, "total"],
+                                   frame.loc[assemblies, "rolled_standard"], check_names=False)
+    # Parts under SB enter FG1 at level 3 (FG1 → SA → SB → part)
+    assert levels.at["FG1", "level_3"] == pytest.approx(2.0 * 4.0 * (1.5 * 1.25 + 2.0 * 0.1))
@@ -0,0 +1,77 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ledger.fifo_layers import aging_summary, build_fifo_layers
+from tests.ledger_entries import synthetic_ledger
+
+AS_OF = pd.Timestamp("2024-06-30")
+COLUMNS = ["item_no", "location_code", "entry_no", "receipt_date", "remaining_qty", "unit_cost", "age_days"]
+
+
+def reference_layers(ledger, as_of):
+    """Baseline FIFO: walk each queue row by row; issues beyond stock are owed by later receipts."""
+    rows = ledger[(ledger["posting_date"] <= as_of) & (ledger["quantity"].fillna(0) != 0)]
+    rows = rows.sort_values(["posting_date", "entry_no"])
+    queues, owed = {}, {}
+    for row in rows.itertuples():
+        key = (row.item_no, row.location_code)
+        queue = queues.setdefault(key, deque())
+        if row.quantity > 0:
+            qty = row.quantity - owed.get(key, 0.0)
+            owed[key] = max(-qty, 0.0)
+            if qty > 0:
+                queue.append([row.entry_no, row.posting_date, qty, abs(row.cost_amount / row.quantity)])
+            continue
+        issue = -row.quantity
+        while issue > 0 and queue:
+            taken = min(issue, queue[0][2])
+            queue[0][2] -= taken
+            issue -= taken
+            if queue[0][2] == 0:
+                queue.popleft()
+        owed[key] = owed.get(key, 0.0) + issue
+
+    layers = [(*key, entry_no, date, qty, unit_cost, (as_of - date).days)
+              for key, queue in queues.items() for entry_no, date, qty, unit_cost in queue]
+    return pd.DataFrame(layers, columns=COLUMNS)
+
+
+def _sorted(frame):
+    return frame[COLUMNS].sort_values(["item_no", "location_code", "entry_no"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_layers_match_a_row_by_row_fifo_queue(seed):
+    ledger = synthetic_ledger(3_000, seed=seed)
+    layers = build_fifo_layers(ledger, as_of=AS_OF)
+    assert len(layers)
+    pd.testing.assert_frame_equal(_sorted(layers), _sorted(reference_layers(ledger, AS_OF)),
+                                  check_dtype=False)
+    np.testing.assert_allclose(layers["remaining_cost"], layers["remaining_qty"] * layers["unit_cost"])
+
+
+def test_transfer_moves_the_oldest_stock_to_the_destination():
+    ledger = pd.DataFrame({
+        "entry_no": [1, 2, 3, 4],
+        "item_no": ["A"] * 4,
+        "location_code": ["MAIN", "MAIN", "MAIN", "EAST"],
+        "posting_date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01", "2024-03-01"]),
+        "entry_type": [0, 0, 4, 4],
+        "quantity": [10.0, 5.0, -12.0, 12.0],
+        "cost_amount": [20.0, 15.0, -27.0, 27.0],
+    })
+    layers = build_fifo_layers(ledger, as_of="2024-03-31").set_index("location_code")
+    assert layers.loc["MAIN", "entry_no"] == 2 and layers.loc["MAIN", "remaining_qty"] == 3.0
+    assert layers.loc["EAST", "remaining_qty"] == 12.0
+    assert layers.loc["EAST", "unit_cost"] == pytest.approx(27.0 / 12.0)
+    assert layers.loc["EAST", "age_days"] == 30
+
+
+def test_aging_summary_totals_remaining_cost():
+    layers = build_fifo_layers(synthetic_ledger(3_000), as_of=AS_OF)
+    summary = aging_summary(layers)
+    expected = layers.groupby(["item_no", "location_code"])["remaining_cost"].sum()
+    np.testing.assert_allclose(summary.set_index(["item_no", "location_code"])["total"], expected)
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from ledger import ledger_partition as lp
+from tests.ledger_entries import synthetic_ledger
+
+LEDGER = synthetic_ledger(20_000, n_items=300)
+KEYS = ["item_no", "location_code"]
+
+
+@pytest.fixture(autouse=True, params=[1, 2], ids=["inline", "pool"])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(lp, "MIN_PARALLEL_ROWS", 1_000)
+    return request.param
+
+
+def test_running_balance_matches_a_grouped_cumsum(workers):
+    got = lp.parallel_running_balance(LEDGER, max_workers=workers)
+    expected = LEDGER.sort_values(KEYS + ["posting_date", "entry_no"], kind="mergesort").reset_index(drop=True)
+    for col in lp.VALUE_COLUMNS:
+        expected[f"{col}_balance"] = expected.groupby(KEYS)[col].cumsum()
+    pd.testing.assert_frame_equal(got, expected)
+
+
+@pytest.mark.parametrize("by", [["item_no"], ["location_code"], ["item_no", "entry_type"]])
+@pytest.mark.parametrize("agg", ["sum", "count", "min", "max"])
+def test_rollup_matches_groupby(workers, by, agg):
+    got = lp.parallel_rollup(LEDGER, by, agg=agg, max_workers=workers)
+    expected = LEDGER.groupby(by)[list(lp.VALUE_COLUMNS)].agg(agg).reset_index()
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_usage_rollup_matches_groupby(workers):
+    got = lp.parallel_usage_rollup(LEDGER, freq="M", max_workers=workers)
+    issues = LEDGER[LEDGER["entry_type"].isin(lp.USAGE_ENTRY_TYPES)]
+    expected = (issues.assign(period=issues["posting_date"].dt.to_period("M").dt.to_timestamp(),
+                              quantity=issues["quantity"].abs(), cost_amount=issues["cost_amount"].abs())
+                      .groupby(["item_no", "period"])[["quantity", "cost_amount"]].sum().reset_index())
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_valuation_rollup_matches_groupby(workers):
+    got = lp.parallel_valuation_rollup(LEDGER, as_of="2024-01-01", max_workers=workers)
+    rows = LEDGER[LEDGER["posting_date"] <= "2024-01-01"]
+    expected = rows.groupby(KEYS)[["quantity", "cost_amount"]].sum().reset_index()
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_exact=False)
+
+
+def test_missing_columns_raise():
+    with pytest.raises(KeyError, match="cost_amount"):
+        lp.parallel_rollup(LEDGER.drop(columns="cost_amount"), ["item_no"])
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from ledger.ledger_repository import EntryType, LedgerRepository
+from tests.ledger_entries import synthetic_ledger
+from utils.frame_cache import FrameCache
+
+LEDGER = synthetic_ledger(5_000)
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Refresh flags of every load, with the ledger source replaced by LEDGER."""
+    calls = []
+
+    def load(self, refresh=False):
+        calls.append(refresh)
+        return LEDGER
+
+    monkeypatch.setattr(LedgerRepository, "load_configured_ledger_data", load)
+    return calls
+
+
+@pytest.fixture
+def repo(loads):
+    return LedgerRepository()
+
+
+def reference_filter(df, entry_types=None, start_date=None, end_date=None, **kwargs):
+    """Baseline: one boolean mask over the whole ledger."""
+    mask = pd.Series(True, index=df.index)
+    if entry_types is not None:
+        mask &= df["entry_type"].isin(entry_types)
+    if start_date is not None:
+        mask &= df["posting_date"] >= pd.to_datetime(start_date)
+    if end_date is not None:
+        mask &= df["posting_date"] <= pd.to_datetime(end_date)
+    for column, value in kwargs.items():
+        mask &= df[column].isin(value) if isinstance(value, list) else df[column] == value
+    return df[mask]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"entry_types": [EntryType.SALE, EntryType.CONSUMPTION]},
+    {"start_date": "2023-06-01", "end_date": "2023-12-31"},
+    {"end_date": "2023-03-15"},
+    {"item_no": "ITEM-3"},
+    {"item_no": ["ITEM-3", "ITEM-11", "NOT-AN-ITEM"], "start_date": "2024-01-01"},
+    {"entry_types": [0], "item_no": "ITEM-7", "location_code": ["EAST", "WEST"]},
+    {"location_code": "MAIN", "document_no": "DOC12"},
+])
+def test_indexed_filters_match_a_boolean_mask(repo, kwargs):
+    df = repo.get_configured_ledger_data()
+    assert df["item_no"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(repo.filter_ledger_data(**kwargs), reference_filter(df, **kwargs))
+
+
+def test_repeated_filters_are_served_from_the_cache(repo):
+    first = repo.filter_ledger_data(entry_types=[1], item_no="ITEM-3")
+    first["quantity"] = 0.0                                        # callers may mutate their copy
+    again = repo.filter_ledger_data(entry_types=[EntryType.SALE], item_no=["ITEM-3"])
+
+    info = repo.cache_info()
+    assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+    expected = reference_filter(repo.get_configured_ledger_data(), entry_types=[1], item_no="ITEM-3")
+    pd.testing.assert_frame_equal(again, expected)
+
+
+def test_cache_is_bounded_by_memory(repo):
+    one_item = FrameCache.frame_bytes(repo.filter_ledger_data(item_no="ITEM-0"))
+    repo._filter_cache.max_bytes = 3 * one_item
+    for item in range(20):
+        repo.filter_ledger_data(item_no=f"ITEM-{item}")
+    info = repo.cache_info()
+    assert 0 < info.entries < 20 and info.current_bytes <= 3 * one_item
+
+
+def test_refresh_requeries_the_source_and_drops_cached_filters(repo, loads):
+    repo.filter_ledger_data(entry_types=[0])
+    repo.refresh()
+    assert loads == [False, True]
+    assert repo.cache_info().entries == 0
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from bom import mrp
+from bom.bom_matrix import BomMatrix
+
+START = pd.Timestamp("2024-01-01")          # a Monday
+
+MATRIX = BomMatrix.from_edges(pd.DataFrame(
+    [("FG", "SA", 2.0), ("SA", "P1", 3.0)], columns=["parent", "child", "qty_per"]))
+
+
+@pytest.fixture(autouse=True)
+def bom(monkeypatch):
+    monkeypatch.setattr(mrp, "get_bom_matrix", lambda: MATRIX)
+
+
+def _plan(open_po, on_hand=None):
+    sales = pd.DataFrame({"item_no": ["FG"], "date": [START + pd.Timedelta(weeks=3)], "qty": [10.0]})
+    on_hand = on_hand if on_hand is not None else pd.DataFrame({"item_no": ["SA"], "quantity": [4.0]})
+    return mrp.run_mrp(start=START, horizon_weeks=5, sales=sales, open_po=open_po, on_hand=on_hand)
+
+
+def test_nav_blank_dates_are_missing():
+    dates = mrp.nav_dates(pd.Series(["1753-01-01", "2024-02-01", None]))
+    assert dates.isna().tolist() == [True, False, True]
+
+
+def test_blank_expected_date_falls_back_to_promised_date():
+    open_po = pd.DataFrame({
+        "item_no": ["P1", "P1"],
+        "outstanding_quantity": [5.0, 7.0],
+        "expected_receipt_date": ["1753-01-01", "2024-01-08"],
+        "promised_receipt_date": ["2024-01-22", "1753-01-01"],
+        "order_date": ["2023-12-01", "2023-12-01"],
+    })
+    plan = _plan(open_po).set_index(["item_no", "week"])
+
+    # FG 10 → SA 20 − 4 on hand = 16 → P1 48, less 7 (week 1) and 5 (week 3)
+    assert plan.loc[("P1", START + pd.Timedelta(weeks=1)), "receipt_qty"] == 7.0
+    assert plan.loc[("P1", START + pd.Timedelta(weeks=3)), "receipt_qty"] == 5.0
+    assert plan.loc[("P1", START + pd.Timedelta(weeks=3)), "planned_qty"] == pytest.approx(48.0 - 12.0)
+
+
+def test_on_hand_rows_are_summed_per_item():
+    on_hand = pd.DataFrame({"item_no": ["SA", "SA"], "quantity": [1.0, 3.0]})
+    no_po = pd.DataFrame(columns=["item_no", "outstanding_quantity", "expected_receipt_date",
+                                  "promised_receipt_date", "order_date"])
+    plan = _plan(no_po, on_hand).set_index(["item_no", "week"])
+    assert plan.loc[("SA", START + pd.Timedelta(weeks=3)), "planned_qty"] == pytest.approx(16.0)
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from purchase.parquet_repository import ParquetPurchaseRepository, write_purchase_dataset
+from purchase.repository import PurchaseRepository
+from tests.purchase_data import synthetic_purchases
+
+LINES = synthetic_purchases(3_000, seed=4).assign(subsidiary="US010")
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return write_purchase_dataset(LINES, tmp_path / "purchases")
+
+
+def test_building_a_query_does_not_scan(dataset):
+    repo = ParquetPurchaseRepository(dataset, countries="CN")
+    query = repo.q().country(["CN", "US"]).type("Item").status("OPEN").group("vendor_name")
+    assert repo._df is None
+    with pytest.raises(KeyError):
+        repo.q().where("not_a_column", 1)
+
+    expected = PurchaseRepository(repo.scan()).q().type("Item").status("OPEN").group("vendor_name")
+    pd.testing.assert_frame_equal(query.sum(["open", "total"]), expected.sum(["open", "total"]))
+
+
+def test_empty_scope_is_an_empty_typed_frame(dataset):
+    repo = ParquetPurchaseRepository(dataset, countries="ZZ", start_date="2020-01-01")
+    in_memory = PurchaseRepository(ParquetPurchaseRepository(dataset).all())
+    no_rows = in_memory.q().country("ZZ")
+
+    assert repo.all().empty and repo.open().empty
+    pd.testing.assert_series_equal(repo.all().dtypes, in_memory.all().dtypes)
+    pd.testing.assert_frame_equal(repo.q().frame().reset_index(drop=True),
+                                  no_rows.frame().reset_index(drop=True))
+    pd.testing.assert_frame_equal(repo.q().group("vendor_name").sum("open"),
+                                  no_rows.group("vendor_name").sum("open"), check_index_type=False)
+    assert repo.q().count() == 0 and repo.q().sum("total") == 0.0
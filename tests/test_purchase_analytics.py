@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from purchase.analytics import PurchaseAnalytics
+from purchase.repository import PurchaseRepository
+from tests.purchase_data import synthetic_purchases
+
+BEFORE = synthetic_purchases(2_000, seed=1)
+AFTER = synthetic_purchases(3_000, seed=2)
+
+
+def _answers(analytics):
+    return {
+        "delivered": analytics.delivered_value(),
+        "open": analytics.open_value(),
+        "total": analytics.total_value(),
+        "by_country": analytics.group_value("vendor_country", "total"),
+        "by_vendor_no": analytics.group_value("buy_from_vendor_no", "delivered"),
+        "wavg": analytics.weighted_avg_unit_cost("item_no", lookback_days=365),
+        "table": analytics.weighted_avg_cost_table(),
+    }
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_analytics_follow_repository_refresh(backend):
+    repo = PurchaseRepository(BEFORE)
+    analytics = PurchaseAnalytics(repo, backend=backend)
+    _answers(analytics)                                 # warm the derived tables on the old lines
+
+    repo.refresh(AFTER)
+    expected = _answers(PurchaseAnalytics(PurchaseRepository(AFTER), backend=backend))
+    for name, value in _answers(analytics).items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(value, expected[name], obj=name)
+        else:
+            assert value == pytest.approx(expected[name]), name
+
+
+def _with_missing_values(frame):
+    frame = frame.copy()
+    frame.loc[frame.index[::7], "quantity_delivered"] = np.nan
+    frame.loc[frame.index[::11], "unit_cost"] = np.nan
+    frame.loc[frame.index[::13], "outstanding_quantity"] = np.nan
+    return frame
+
+
+def reference_group_value(frame, by, kind):
+    """Baseline: per-line delivered + open, then a skipna group sum."""
+    delivered = frame["unit_cost"] * frame["quantity_delivered"]
+    open_value = (frame["unit_cost"] * frame["outstanding_quantity"]).where(frame["status"] == "OPEN", 0.0)
+    values = {"delivered": delivered, "open": open_value, "total": delivered + open_value}[kind]
+    return values.groupby([frame[col] for col in by]).sum().rename(kind).reset_index()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+@pytest.mark.parametrize("kind", ["delivered", "open", "total"])
+def test_group_value_keeps_missing_line_values_out_of_totals(backend, kind):
+    lines = _with_missing_values(BEFORE)
+    analytics = PurchaseAnalytics(PurchaseRepository(lines), backend=backend)
+    china = lines[lines["vendor_country"] == "CN"]
+
+    for by, frame in ((["vendor_country"], None), (["buy_from_vendor_no"], None), (["vendor_name"], china)):
+        got = analytics.group_value(by, kind, frame=frame)
+        expected = reference_group_value(lines if frame is None else frame, by, kind)
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), expected, check_dtype=False, obj=str(by))
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from purchase.queries import PurchaseQueries
+from purchase.repository import PurchaseRepository
+from tests.purchase_data import synthetic_purchases
+
+BEFORE = synthetic_purchases(2_000, seed=1)
+AFTER = synthetic_purchases(3_000, seed=2)
+
+START = (pd.Timestamp.today() - pd.Timedelta(days=400)).strftime("%Y-%m-%d")
+
+
+def _answers(queries, item, vendor):
+    return {
+        "country": queries.items_last_purchased_from_country("CN", start_date=START),
+        "multi": queries.identify_items_from_multiple_countries("CN", time_period=365),
+        "vendors": queries.get_vendors_for_item_excluding_countries(item, exclude_countries="US"),
+        "vendors_window": queries.get_vendors_for_items_excluding_countries([item], start_date=START),
+        "latest": queries.get_most_recent_purchase_data(vendor_name=vendor, start_date=START),
+        "latest_all": queries.get_most_recent_purchase_data(start_date=START, group_by="item"),
+        "by_type": queries.filter_by_type("Item"),
+    }
+
+
+def test_queries_follow_repository_refresh():
+    repo = PurchaseRepository(BEFORE)
+    queries = PurchaseQueries(repo)
+    item, vendor = AFTER["item_no"].iloc[0], AFTER["vendor_name"].iloc[0]
+    _answers(queries, item, vendor)                     # warm the indexes on the old lines
+
+    repo.refresh(AFTER)
+    assert len(queries.df) == len(AFTER)
+    expected = _answers(PurchaseQueries(PurchaseRepository(AFTER)), item, vendor)
+    for name, frame in _answers(queries, item, vendor).items():
+        pd.testing.assert_frame_equal(frame, expected[name], obj=name)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"start_date": START}, {"time_period": 90}])
+def test_whole_history_window_matches_a_mask(kwargs):
+    queries = PurchaseQueries(PurchaseRepository(BEFORE))
+    got = queries._apply_period(None, **kwargs)
+    masked = queries._apply_period(queries.df.iloc[::-1], **kwargs)
+    assert sorted(got.index) == sorted(masked.index)
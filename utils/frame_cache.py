@@ -0,0 +1,78 @@
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "max_bytes", "current_bytes", "entries"])
+
+# Assumed size of one object / string value (pointer plus a short Python str)
+OBJECT_VALUE_BYTES = 64
+
+
+class FrameCache:
+    """Least-recently-used cache of DataFrame results, bounded by total memory use."""
+
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        """
+        Args:
+            max_bytes (int, optional): Upper bound on the summed memory use of cached frames.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def frame_bytes(frame):
+        """
+        Estimates the memory use of a frame from its dtypes and row count.
+
+        Fixed-width columns count exactly; object and string values are charged
+        OBJECT_VALUE_BYTES each instead of being measured one by one, which would be
+        O(rows) on every cache miss.
+        """
+        n_rows = len(frame)
+        size = frame.index.memory_usage(deep=False)
+        for dtype in frame.dtypes:
+            itemsize = getattr(dtype, "itemsize", None)
+            if itemsize is None or dtype.kind in "OSU":
+                itemsize = OBJECT_VALUE_BYTES
+            size += itemsize * n_rows
+        return int(size)
+
+    def get(self, key):
+        """
+        Returns the cached frame for `key` and marks it most recently used.
+
+        Returns:
+            pandas.DataFrame or None: The cached frame, or None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, frame):
+        """Caches `frame` under `key`, evicting least recently used entries to stay within max_bytes."""
+        size = self.frame_bytes(frame)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._current_bytes -= self._entries.pop(key)[1]
+        while self._entries and self._current_bytes + size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._current_bytes -= evicted_size
+        self._entries[key] = (frame, size)
+        self._current_bytes += size
+
+    def clear(self):
+        """Drops every cached frame and resets the hit/miss counters."""
+        self._entries.clear()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Returns hit/miss counters and current size, like functools' cache_info()."""
+        return CacheInfo(self.hits, self.misses, self.max_bytes, self._current_bytes, len(self._entries))